@@ -0,0 +1,643 @@
+"""
+Probe backends for Roblox Anti-Leave
+Wraps the window, process, clipboard, launcher and notification APIs the
+monitor depends on, plus in-memory fakes for profiling and regression timing.
+Third-party libraries are imported on first use, so constructing a backend is free.
+"""
+
+import os
+import sys
+import time
+import threading
+import importlib.util
+from collections import namedtuple
+from functools import cached_property
+
+# Lightweight records handed to the monitor instead of library objects
+WindowInfo = namedtuple('WindowInfo', ['handle', 'title', 'pid'], defaults=(None,))
+ProcessInfo = namedtuple('ProcessInfo', ['pid', 'name'])
+
+
+class PyGetWindowBackend:
+    """Window enumeration through pygetwindow"""
+
+    def __init__(self):
+        self._user32 = None
+        if sys.platform == 'win32':
+            import ctypes
+            self._user32 = ctypes.windll.user32
+            self._pid = ctypes.c_ulong()
+            self._pid_ref = ctypes.byref(self._pid)
+
+    @cached_property
+    def _gw(self):
+        import pygetwindow
+        return pygetwindow
+
+    def list_windows(self):
+        """Return every titled top-level window"""
+        windows = []
+        for window in self._gw.getAllWindows():
+            if window.title:
+                handle = getattr(window, '_hWnd', None) or id(window)
+                windows.append(WindowInfo(handle, window.title, self._window_pid(handle)))
+        return windows
+
+    def _window_pid(self, handle):
+        """Return the PID owning a window, when the platform exposes it"""
+        if self._user32 is None:
+            return None
+        self._user32.GetWindowThreadProcessId(handle, self._pid_ref)
+        return self._pid.value or None
+
+
+class X11WindowBackend:
+    """Window index kept current by X11 property events instead of re-listing every window each tick"""
+
+    def __init__(self, display=None):
+        self.display_name = display  # None means $DISPLAY
+        self.version = 0  # bumped whenever a window opens, closes or is retitled
+        self.events = 0
+        self._display = None
+        self._lock = threading.Lock()  # Xlib connections are not thread-safe
+        self._reset()
+
+    @staticmethod
+    def available() -> bool:
+        return (sys.platform.startswith(('linux', 'freebsd', 'openbsd')) and bool(os.environ.get('DISPLAY'))
+                and importlib.util.find_spec('Xlib') is not None)
+
+    def _reset(self):
+        self._clients = {}  # window id -> Xlib window, for every window we listen to
+        self._windows = {}  # window id -> WindowInfo, titled windows only
+        self._listing = []
+        self._listed_version = -1
+        self.ewmh = False  # whether the window manager maintains _NET_CLIENT_LIST
+
+    def _connect(self):
+        from Xlib import X, Xatom, display
+
+        self.X = X
+        self._display = display.Display(self.display_name)
+        # Windows vanish between an event and our request; those errors are expected
+        self._display.set_error_handler(lambda error, request: None)
+        self._root = self._display.screen().root
+        atom = self._display.intern_atom
+        self._client_list = atom('_NET_CLIENT_LIST')
+        self._net_wm_name = atom('_NET_WM_NAME')
+        self._net_wm_pid = atom('_NET_WM_PID')
+        self._utf8 = atom('UTF8_STRING')
+        self._title_atoms = (self._net_wm_name, Xatom.WM_NAME)
+        self._cardinal = Xatom.CARDINAL
+        self._listen_root(ewmh=False)
+        self._sync_clients()
+
+    def _listen_root(self, ewmh):
+        # Root property changes announce client list updates; substructure events cover
+        # a bare X server (e.g. Xvfb) with no window manager to maintain that list
+        mask = self.X.PropertyChangeMask
+        if not ewmh:
+            mask |= self.X.SubstructureNotifyMask
+        self._root.change_attributes(event_mask=mask)
+        self.ewmh = ewmh
+
+    def _sync_clients(self):
+        """Reconcile the index with the current top-level window list"""
+        clients = self._root.get_full_property(self._client_list, self.X.AnyPropertyType)
+        if (clients is not None) != self.ewmh:
+            self._listen_root(ewmh=clients is not None)
+        if self.ewmh:
+            current = set(clients.value)
+        else:
+            current = {window.id for window in self._root.query_tree().children}
+
+        for wid in [wid for wid in self._clients if wid not in current]:
+            self._remove(wid)
+        for wid in current:
+            if wid not in self._clients:
+                self._add(wid)
+
+    def _add(self, wid):
+        window = self._display.create_resource_object('window', wid)
+        window.change_attributes(event_mask=self.X.PropertyChangeMask)
+        self._clients[wid] = window
+        self._refresh(wid)
+
+    def _remove(self, wid):
+        self._clients.pop(wid, None)
+        if self._windows.pop(wid, None) is not None:
+            self.version += 1
+
+    def _refresh(self, wid):
+        """Re-read a window's title and owner, dropping it if it no longer exists"""
+        from Xlib.error import XError
+
+        window = self._clients[wid]
+        try:
+            title = self._property(window, self._net_wm_name, self._utf8) or window.get_wm_name() or ''
+            pid = self._property(window, self._net_wm_pid, self._cardinal)
+        except XError:
+            self._remove(wid)
+            return
+        if isinstance(title, bytes):
+            title = title.decode('utf-8', 'replace')
+
+        previous = self._windows.get(wid)
+        if not title:
+            if previous is not None:
+                del self._windows[wid]
+                self.version += 1
+        elif previous is None or previous.title != title:
+            self._windows[wid] = WindowInfo(wid, title, pid)
+            self.version += 1
+
+    def _property(self, window, atom, kind):
+        value = window.get_full_property(atom, kind)
+        if value is None or not len(value.value):
+            return None
+        return value.value[0] if kind == self._cardinal else value.value
+
+    def _drain(self):
+        """Apply every queued event to the index"""
+        X = self.X
+        display = self._display
+        while display.pending_events():
+            event = display.next_event()
+            self.events += 1
+            if event.type == X.PropertyNotify:
+                wid = event.window.id
+                if wid == self._root.id:
+                    if event.atom == self._client_list:
+                        self._sync_clients()
+                elif event.atom in self._title_atoms and wid in self._clients:
+                    self._refresh(wid)
+            elif not self.ewmh:
+                if (event.type == X.CreateNotify and event.parent.id == self._root.id
+                        and event.window.id not in self._clients):
+                    self._add(event.window.id)
+                elif event.type == X.DestroyNotify:
+                    self._remove(event.window.id)
+
+    def _locked_drain(self):
+        from Xlib.error import ConnectionClosedError
+
+        try:
+            if self._display is None:
+                try:
+                    self._connect()
+                except Exception:
+                    self.close()
+                    raise
+            self._drain()
+        except ConnectionClosedError:
+            # X server restarted or went away; reconnect with a fresh index next time
+            self.close()
+            raise
+
+    def list_windows(self):
+        """Return every titled top-level window from the index"""
+        with self._lock:
+            self._locked_drain()
+            if self._listed_version != self.version:
+                # Unchanged listings are the same list, so WindowTracker can skip diffing them
+                self._listing = list(self._windows.values())
+                self._listed_version = self.version
+            return self._listing
+
+    def fileno(self):
+        """The X connection, readable when events are waiting; None before the first listing"""
+        return self._display.fileno() if self._display is not None else None
+
+    def pending_changes(self) -> bool:
+        """Apply waiting events; True if they opened, closed or retitled a window"""
+        with self._lock:
+            version = self.version
+            self._locked_drain()
+            return self.version != version
+
+    def close(self):
+        display, self._display = self._display, None
+        self._reset()
+        if display is not None:
+            try:
+                display.close()
+            except Exception:
+                pass
+
+
+class PsutilProcessBackend:
+    """Process enumeration through psutil"""
+
+    # PIDs are real host PIDs, so the exit watcher may open pidfds on them
+    supports_pidfd = hasattr(os, 'pidfd_open')
+    # wait_for_exit() really blocks for the timeout
+    blocking_wait = True
+
+    @cached_property
+    def _psutil(self):
+        import psutil
+        return psutil
+
+    def list_processes(self):
+        """Return pid and name for every process on the host"""
+        processes = []
+        for proc in self._psutil.process_iter(['pid', 'name']):
+            processes.append(ProcessInfo(proc.info['pid'], proc.info['name'] or ''))
+        return processes
+
+    def create_time(self, pid):
+        """Return the create time of pid, or None if it no longer exists"""
+        try:
+            return self._psutil.Process(pid).create_time()
+        except self._psutil.Error:
+            return None
+
+    def wait_for_exit(self, pids, timeout):
+        """Block until any of pids exits or timeout elapses; return the exited PIDs"""
+        procs = []
+        gone = []
+        for pid in pids:
+            try:
+                procs.append(self._psutil.Process(pid))
+            except self._psutil.NoSuchProcess:
+                gone.append(pid)
+        if gone or not procs:
+            return gone
+
+        # wait_procs() waits for all of them, so wait in short slices to return on the first exit
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            exited, _ = self._psutil.wait_procs(procs, timeout=max(0, min(0.05, remaining)))
+            if exited or remaining <= 0:
+                return [proc.pid for proc in exited]
+
+
+class ProcfsProcessBackend:
+    """Process enumeration straight from /proc on Linux, reading only what the monitor needs"""
+
+    # comm holds at most TASK_COMM_LEN - 1 characters; longer names are cut off
+    COMM_LEN = 15
+    # wait_for_exit() really blocks for the timeout
+    blocking_wait = True
+
+    def __init__(self, root='/proc'):
+        self.root = root
+        # A synthetic tree (benchmarks) has no real PIDs to open pidfds on
+        self.supports_pidfd = root == '/proc' and hasattr(os, 'pidfd_open')
+        self._names = {}  # pid -> (starttime, comm, name) from the previous listing
+        self._buffer = bytearray(4096)
+        self._view = memoryview(self._buffer)
+        self._boot_time = None
+        self._clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self.reads = 0
+
+    @staticmethod
+    def available(root='/proc') -> bool:
+        return sys.platform.startswith('linux') and os.path.exists(os.path.join(root, 'self', 'comm'))
+
+    def _read(self, path):
+        """Start of a small /proc file as text, read into the shared buffer, or None if gone"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            size = os.preadv(fd, [self._buffer], 0)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        self.reads += 1
+        return str(self._view[:size], 'utf-8', 'replace')
+
+    def list_processes(self):
+        """Return pid and name for every process
+
+        Every listing reads /proc/<pid>/stat for every PID; the cache only saves
+        the cmdline read that resolves a truncated comm. A PID keeps its cached
+        name only while its start time and comm match the previous listing, so
+        reused PIDs and renamed or exec'd processes (Wine launching the client)
+        are picked up on the next call.
+        """
+        known = self._names
+        current = {}
+        for entry in os.listdir(self.root):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            stat = self._read(f"{self.root}/{pid}/stat")
+            if stat is None:
+                continue  # Exited while we were listing
+            end = stat.rfind(')')
+            comm = stat[stat.find('(') + 1:end]
+            fields = stat[end + 2:].split(maxsplit=20)
+            starttime = fields[19] if len(fields) > 19 else None
+            # stat is needed anyway for the start time; a cache hit only skips _name()'s cmdline read
+            cached = known.get(pid)
+            if cached is not None and cached[0] == starttime and cached[1] == comm:
+                current[pid] = cached
+            else:
+                current[pid] = (starttime, comm, self._name(pid, comm))
+
+        self._names = current
+        return [ProcessInfo(pid, name) for pid, (_, _, name) in current.items()]
+
+    def reset(self):
+        """Forget the cached names, so the next listing resolves every name (cmdline reads included) again"""
+        self._names = {}
+
+    def _name(self, pid, comm):
+        if len(comm) >= self.COMM_LEN:
+            # Possibly truncated (e.g. "RobloxPlayerBet"); the command line has the full executable
+            cmdline = self._read(f"{self.root}/{pid}/cmdline")
+            if cmdline:
+                exe = cmdline.split('\0', 1)[0].replace('\\', '/').rsplit('/', 1)[-1]
+                if exe.startswith(comm):
+                    return exe
+        return comm
+
+    def _stat_fields(self, pid):
+        """Fields of /proc/<pid>/stat after the parenthesised name (state first), or None"""
+        stat = self._read(f"{self.root}/{pid}/stat")
+        if stat is None:
+            return None
+        return stat[stat.rfind(')') + 2:].split()
+
+    def _boot(self) -> float:
+        if self._boot_time is None:
+            self._boot_time = 0.0
+            try:
+                # Not through the shared buffer: the interrupt counters make /proc/stat long
+                with open(f"{self.root}/stat", encoding='ascii') as f:
+                    for line in f:
+                        if line.startswith('btime '):
+                            self._boot_time = float(line.split()[1])
+                            break
+            except OSError:
+                pass
+        return self._boot_time
+
+    def create_time(self, pid):
+        """Return the create time of pid, or None if it no longer exists"""
+        fields = self._stat_fields(pid)
+        try:
+            ticks = int(fields[19])  # starttime, field 22 of stat
+        except (TypeError, IndexError, ValueError):
+            return None
+        return self._boot() + ticks / self._clock_ticks
+
+    def _alive(self, pid) -> bool:
+        fields = self._stat_fields(pid)
+        return bool(fields) and fields[0] not in ('Z', 'X')
+
+    def wait_for_exit(self, pids, timeout):
+        """Block until any of pids exits or timeout elapses; return the exited PIDs"""
+        deadline = time.monotonic() + timeout
+        while True:
+            gone = [pid for pid in pids if not self._alive(pid)]
+            remaining = deadline - time.monotonic()
+            if gone or remaining <= 0:
+                return gone
+            time.sleep(min(0.05, remaining))
+
+
+class SelectionOwnerCounter:
+    """Counts X11 CLIPBOARD owner changes through XFixes, so polling never has to run xclip/xsel"""
+
+    def __init__(self, display=None):
+        from Xlib import display as xdisplay
+        from Xlib.ext import xfixes
+
+        self.count = 0
+        self._display = xdisplay.Display(display)
+        try:
+            if not self._display.has_extension('XFIXES'):
+                raise RuntimeError("X server has no XFIXES extension")
+            self._display.xfixes_query_version()
+            root = self._display.screen().root
+            # Every copy makes the copying app (re)claim the selection
+            root.xfixes_select_selection_input(self._display.intern_atom('CLIPBOARD'),
+                                               xfixes.XFixesSetSelectionOwnerNotifyMask)
+            self._display.sync()
+        except Exception:
+            self._display.close()
+            raise
+
+    def __call__(self):
+        # Nothing else is selected on this connection, so every event is an owner change
+        while self._display.pending_events():
+            self._display.next_event()
+            self.count += 1
+        return self.count
+
+
+class PyperclipClipboard:
+    """Clipboard access through pyperclip"""
+
+    def __init__(self):
+        self._sequence = None
+        if sys.platform == 'win32':
+            import ctypes
+            self._sequence = ctypes.windll.user32.GetClipboardSequenceNumber
+        # On X11 the counter comes from XFixes, set up on first use
+        self._x11 = self._sequence is None and X11WindowBackend.available()
+
+    @cached_property
+    def _pyperclip(self):
+        import pyperclip
+        return pyperclip
+
+    def paste(self):
+        return self._pyperclip.paste()
+
+    def change_count(self):
+        """Counter that moves whenever the clipboard changes, or None if unavailable"""
+        if self._x11:
+            self._x11 = False
+            try:
+                self._sequence = SelectionOwnerCounter()
+            except Exception:
+                pass  # No XFixes: the watcher reads the clipboard at a backed-off rate instead
+        return self._sequence() if self._sequence else None
+
+
+class BrowserLauncher:
+    """Opens game URLs in the default browser"""
+
+    def open_url(self, url):
+        import webbrowser
+        webbrowser.open(url)
+
+    def open_roblox(self):
+        """Start Roblox directly, falling back to the website"""
+        import subprocess
+        try:
+            subprocess.Popen(['start', 'roblox:'], shell=True)
+        except:
+            self.open_url('https://www.roblox.com/')
+
+
+class PlyerNotifier:
+    """Desktop notifications through plyer"""
+
+    @cached_property
+    def _notification(self):
+        from plyer import notification
+        return notification
+
+    def notify(self, title, message, timeout):
+        self._notification.notify(
+            title=title,
+            message=message,
+            app_name="Roblox Anti-Leave",
+            timeout=timeout
+        )
+
+
+class SystemClock:
+    """Wall clock and blocking sleep"""
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    async def sleep_async(self, seconds):
+        import asyncio
+        await asyncio.sleep(seconds)
+
+
+# In-memory fakes -----------------------------------------------------------
+
+class FakeWindowBackend:
+    """Window backend serving a mutable in-memory window list"""
+
+    def __init__(self, titles=None):
+        self.windows = []
+        self.calls = 0
+        self._next_handle = 1
+        for title in titles or []:
+            self.open_window(title)
+
+    def open_window(self, title, pid=None):
+        """Add a window and return its handle"""
+        handle = self._next_handle
+        self._next_handle += 1
+        self.windows.append(WindowInfo(handle, title, pid))
+        return handle
+
+    def close_window(self, handle):
+        self.windows = [w for w in self.windows if w.handle != handle]
+
+    def set_title(self, handle, title):
+        self.windows = [w._replace(title=title) if w.handle == handle else w
+                        for w in self.windows]
+
+    def list_windows(self):
+        self.calls += 1
+        return list(self.windows)
+
+
+class FakeProcessBackend:
+    """Process backend serving a mutable in-memory process table"""
+
+    def __init__(self, names=None):
+        self.processes = []
+        self.create_times = {}
+        self.calls = 0
+        self.lookups = 0
+        self._next_pid = 1000
+        self._boot = 0.0
+        for name in names or []:
+            self.spawn(name)
+
+    def spawn(self, name, pid=None):
+        """Add a process and return its pid (pass pid to simulate reuse)"""
+        if pid is None:
+            pid = self._next_pid
+            self._next_pid += 1
+        self._boot += 1.0
+        self.processes.append(ProcessInfo(pid, name))
+        self.create_times[pid] = self._boot
+        return pid
+
+    def kill(self, pid):
+        self.processes = [p for p in self.processes if p.pid != pid]
+        self.create_times.pop(pid, None)
+
+    def list_processes(self):
+        self.calls += 1
+        return list(self.processes)
+
+    def create_time(self, pid):
+        self.lookups += 1
+        return self.create_times.get(pid)
+
+    def wait_for_exit(self, pids, timeout):
+        """Return already-dead PIDs without blocking"""
+        return [pid for pid in pids if pid not in self.create_times]
+
+
+class FakeClipboard:
+    """Clipboard holding a fixed string"""
+
+    def __init__(self, content=''):
+        self.content = content
+        self.reads = 0
+
+    def paste(self):
+        self.reads += 1
+        return self.content
+
+    def change_count(self):
+        return None
+
+
+class FakeLauncher:
+    """Launcher that records URLs instead of opening them"""
+
+    def __init__(self, on_open=None):
+        self.opened = []
+        self.on_open = on_open
+
+    def open_url(self, url):
+        self.opened.append(url)
+        if self.on_open:
+            self.on_open(url)
+
+    def open_roblox(self):
+        self.open_url('roblox:')
+
+
+class FakeNotifier:
+    """Notifier that records (title, message) pairs"""
+
+    def __init__(self):
+        self.sent = []
+
+    def notify(self, title, message, timeout):
+        self.sent.append((title, message))
+
+
+class FakeClock:
+    """Virtual clock where sleep() advances time instantly"""
+
+    def __init__(self, start=0.0, on_sleep=None):
+        self.now = start
+        self.on_sleep = on_sleep
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        if self.on_sleep:
+            self.on_sleep(self)
+
+    async def sleep_async(self, seconds):
+        import asyncio
+        self.sleep(seconds)
+        # Still yield so cancellation is delivered at every wait
+        await asyncio.sleep(0)
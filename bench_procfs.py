@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Process listing benchmark for Roblox Anti-Leave
+Times ProcfsProcessBackend against PsutilProcessBackend on a synthetic
+/proc-like tree (10k processes by default, a few of them replaced between
+listings as on a busy host), or on the real /proc with --real.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from backends import ProcfsProcessBackend, PsutilProcessBackend
+
+# Mostly short names, some long enough for comm to be truncated, and one Roblox client
+SHORT_NAMES = ["bash", "sshd", "python3", "systemd", "kworker/0:1", "nginx", "postgres", "chrome"]
+LONG_NAMES = ["gnome-shell-calendar-server", "xdg-desktop-portal-gtk", "pipewire-media-session"]
+ROBLOX = ("RobloxPlayerBeta.exe", r"C:\Program Files\Roblox\Versions\version-1\RobloxPlayerBeta.exe")
+
+
+class SyntheticProc:
+    """A directory laid out like /proc: <pid>/comm, <pid>/cmdline, <pid>/stat and stat"""
+
+    def __init__(self, root, entries, rng):
+        self.root = root
+        self.rng = rng
+        self.pids = []
+        self.next_pid = 300
+        with open(os.path.join(root, 'stat'), 'w') as f:
+            f.write(f"cpu  1 2 3 4\nbtime {int(time.time()) - 3600}\n")
+        self.spawn(*ROBLOX)
+        for _ in range(entries - 1):
+            self.spawn_random()
+
+    def spawn_random(self):
+        if self.rng.random() < 0.2:
+            name = self.rng.choice(LONG_NAMES)
+            self.spawn(name, f"/usr/libexec/{name}")
+        else:
+            name = self.rng.choice(SHORT_NAMES)
+            self.spawn(name, f"/usr/bin/{name}")
+
+    def spawn(self, name, exe):
+        pid = self.next_pid
+        self.next_pid += 1
+        comm = name.replace('\\', '/').rsplit('/', 1)[-1][:ProcfsProcessBackend.COMM_LEN]
+        path = os.path.join(self.root, str(pid))
+        os.mkdir(path)
+        with open(os.path.join(path, 'comm'), 'w') as f:
+            f.write(comm + '\n')
+        with open(os.path.join(path, 'cmdline'), 'w') as f:
+            f.write(exe + '\0--flag\0')
+        with open(os.path.join(path, 'stat'), 'w') as f:
+            # pid (comm) state ppid ... with starttime as field 22, as the kernel writes it
+            f.write(f"{pid} ({comm}) S 1 {pid} {pid} 0 -1 4194304 " + "0 " * 12 + f"{pid * 10} " + "0 " * 30 + "\n")
+        self.pids.append(pid)
+
+    def kill(self, pid):
+        path = os.path.join(self.root, str(pid))
+        for name in os.listdir(path):
+            os.unlink(os.path.join(path, name))
+        os.rmdir(path)
+        self.pids.remove(pid)
+
+    def churn(self, count):
+        """Replace count random processes (never the Roblox client) with new ones"""
+        for pid in self.rng.sample(self.pids[1:], min(count, len(self.pids) - 1)):
+            self.kill(pid)
+            self.spawn_random()
+
+
+def time_listing(backend, runs, before=None):
+    """Median and min milliseconds for list_processes(), running before() untimed first"""
+    samples = []
+    result = None
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = backend.list_processes()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(samples), 'min_ms': min(samples), 'processes': len(result)}, result
+
+
+def psutil_backend(root):
+    """PsutilProcessBackend reading root, or the reason it can't run here"""
+    try:
+        import psutil
+    except ImportError:
+        return None, "psutil is not installed"
+    if not sys.platform.startswith('linux'):
+        return None, "psutil's procfs path is Linux only"
+    psutil.PROCFS_PATH = root
+    return PsutilProcessBackend(), None
+
+
+def benchmark(root, runs, churn, proc=None) -> dict:
+    results = {}
+    fresh_psutil = None
+
+    # Cold: every name resolved, as on the first tick
+    backend = ProcfsProcessBackend(root)
+    results['procfs cold'], procfs_list = time_listing(backend, runs, backend.reset)
+    results['procfs cold']['reads_per_listing'] = backend.reads / runs
+
+    # Steady state: still one stat read per PID, command lines only for new processes with truncated names
+    backend = ProcfsProcessBackend(root)
+    backend.list_processes()
+    backend.reads = 0
+    step = (lambda: proc.churn(churn)) if proc and churn else None
+    results['procfs steady'], procfs_list = time_listing(backend, runs, step)
+    results['procfs steady']['reads_per_listing'] = backend.reads / runs
+
+    psutil_impl, reason = psutil_backend(root)
+    if psutil_impl is None:
+        results['psutil'] = {'skipped': reason}
+    else:
+        import psutil
+        if hasattr(psutil.process_iter, 'cache_clear'):
+            fresh_psutil = psutil.process_iter.cache_clear
+        results['psutil cold'], _ = time_listing(psutil_impl, runs, fresh_psutil)
+        psutil_impl.list_processes()
+        results['psutil steady'], psutil_list = time_listing(psutil_impl, runs, step)
+        results['psutil steady']['same_result'] = sorted(psutil_list) == sorted(procfs_list)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the /proc and psutil process backends")
+    parser.add_argument('--entries', type=int, default=10000, help="synthetic processes (default: %(default)s)")
+    parser.add_argument('--churn', type=int, default=20,
+                        help="processes replaced between steady-state listings (default: %(default)s)")
+    parser.add_argument('--runs', type=int, default=20, help="listings per measurement (default: %(default)s)")
+    parser.add_argument('--real', action='store_true', help="list the real /proc instead of a synthetic tree")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.real:
+        if not ProcfsProcessBackend.available():
+            print("No /proc here")
+            sys.exit(1)
+        print(f"Real /proc, {args.runs} runs")
+        results = benchmark('/proc', args.runs, 0)
+    else:
+        with tempfile.TemporaryDirectory() as root:
+            started = time.perf_counter()
+            proc = SyntheticProc(root, args.entries, random.Random(args.seed))
+            print(f"Synthetic tree: {args.entries} processes, {args.churn} replaced per listing, {args.runs} runs "
+                  f"(built in {time.perf_counter() - started:.1f}s)")
+            results = benchmark(root, args.runs, args.churn, proc)
+
+    for name, result in results.items():
+        if 'skipped' in result:
+            print(f"{name:<14} skipped: {result['skipped']}")
+            continue
+        extra = ''
+        if 'reads_per_listing' in result:
+            extra += f"   {result['reads_per_listing']:.0f} file reads/listing"
+        if 'same_result' in result:
+            extra += "   same processes as procfs" if result['same_result'] else "   DIFFERENT from procfs"
+        print(f"{name:<14} median {result['median_ms']:8.2f} ms   min {result['min_ms']:8.2f} ms   "
+              f"({result['processes']} processes){extra}")
+
+
+if __name__ == "__main__":
+    main()
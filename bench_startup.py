@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for Roblox Anti-Leave
+Times how long `python main.py` and `python gui.py` take to become ready
+(monitor constructed and about to prompt / first GUI frame drawn), each in a
+fresh interpreter, and optionally appends the results to a history file.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Each entry point's startup path, ending where it would wait for the user
+TARGETS = {
+    'python': "pass",
+    'main.py': (
+        "import main\n"
+        "main.configure_logging()\n"
+        "main.RobloxAntiLeave()\n"
+    ),
+    'gui.py': (
+        "import gui\n"
+        "app = gui.ModernGUI(gui.configure_logging(console=False))\n"
+        "app.root.update()\n"
+        "app.root.destroy()\n"
+    ),
+}
+
+READY = "__ready__"
+SKIPPED = "__skipped__"
+
+
+def run_once(code: str, workdir: str):
+    """Wall time in seconds from spawn to ready, or None if the target can't start here"""
+    script = (
+        "import sys\n"
+        "try:\n" + ''.join(f"    {line}\n" for line in code.splitlines()) +
+        "except Exception as e:\n"
+        f"    print({SKIPPED!r}, type(e).__name__, e, flush=True)\n"
+        "    sys.exit(0)\n"
+        f"print({READY!r}, flush=True)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=HERE, PYTHONDONTWRITEBYTECODE='1')
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', script], cwd=workdir, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    elapsed = None
+    reason = None
+    for line in proc.stdout:
+        if line.startswith(READY):
+            elapsed = time.perf_counter() - start
+            break
+        if line.startswith(SKIPPED):
+            reason = line[len(SKIPPED):].strip()
+            break
+    proc.stdout.close()
+    proc.wait()
+    return elapsed, reason
+
+
+def benchmark(runs: int, targets) -> dict:
+    results = {}
+    # Run from a scratch directory so the log file and journal stay out of the repo
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in targets:
+            samples = []
+            reason = None
+            run_once(TARGETS[name], workdir)  # warm the OS file cache
+            for _ in range(runs):
+                elapsed, reason = run_once(TARGETS[name], workdir)
+                if elapsed is None:
+                    break
+                samples.append(elapsed * 1000)
+            if samples:
+                results[name] = {
+                    'median_ms': statistics.median(samples),
+                    'min_ms': min(samples),
+                    'max_ms': max(samples),
+                    'runs': len(samples),
+                }
+            else:
+                results[name] = {'skipped': reason or 'did not become ready'}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-ready of the Roblox Anti-Leave entry points")
+    parser.add_argument('--runs', type=int, default=10, help="runs per target (default: %(default)s)")
+    parser.add_argument('--target', action='append', choices=list(TARGETS),
+                        help="only benchmark this target (repeatable)")
+    parser.add_argument('--record', metavar='FILE', help="append the results as a JSON line to FILE")
+    args = parser.parse_args()
+
+    results = benchmark(args.runs, args.target or list(TARGETS))
+
+    for name, result in results.items():
+        if 'skipped' in result:
+            print(f"{name:<10} skipped: {result['skipped']}")
+        else:
+            print(f"{name:<10} median {result['median_ms']:7.1f} ms   "
+                  f"min {result['min_ms']:7.1f} ms   max {result['max_ms']:7.1f} ms   ({result['runs']} runs)")
+
+    if args.record:
+        entry = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0],
+                 'platform': sys.platform, 'results': results}
+        with open(args.record, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+if __name__ == "__main__":
+    main()
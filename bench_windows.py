@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+X11 window tracking benchmark for Roblox Anti-Leave
+Opens windows on an X server (a private Xvfb with --xvfb, so it runs headless),
+checks that X11WindowBackend follows them through events, and compares its
+per-check cost and popup latency with listing every window on each check.
+
+    python bench_windows.py --xvfb --windows 200
+"""
+
+import os
+import sys
+import time
+import select
+import argparse
+import importlib.util
+import statistics
+import subprocess
+
+from backends import X11WindowBackend
+
+
+def start_xvfb():
+    """Start a private Xvfb and return (process, display name)"""
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen(['Xvfb', '-displayfd', str(write_fd), '-nolisten', 'tcp', '-screen', '0', '1024x768x24'],
+                              pass_fds=(write_fd,), stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        number = f.readline().strip()
+    if not number:
+        server.kill()
+        raise RuntimeError("Xvfb did not start")
+    return server, f":{number}"
+
+
+class TestClient:
+    """Plays the part of Roblox and other apps: opens, retitles and closes windows"""
+
+    def __init__(self, name):
+        from Xlib import Xatom, display
+
+        self.display = display.Display(name)
+        self.root = self.display.screen().root
+        self.depth = self.display.screen().root_depth
+        self.net_wm_name = self.display.intern_atom('_NET_WM_NAME')
+        self.net_wm_pid = self.display.intern_atom('_NET_WM_PID')
+        self.utf8 = self.display.intern_atom('UTF8_STRING')
+        self.cardinal = Xatom.CARDINAL
+
+    def open(self, title, pid=None):
+        window = self.root.create_window(0, 0, 200, 100, 0, self.depth)
+        if pid:
+            window.change_property(self.net_wm_pid, self.cardinal, 32, [pid])
+        self.set_title(window, title)
+        window.map()
+        self.display.sync()
+        return window
+
+    def set_title(self, window, title):
+        window.set_wm_name(title)
+        window.change_property(self.net_wm_name, self.utf8, 8, title.encode('utf-8'))
+        self.display.sync()
+
+    def close(self, window):
+        window.destroy()
+        self.display.sync()
+
+
+def list_by_polling(client):
+    """What a polling backend does each check: enumerate every window and read its title"""
+    titles = []
+    for window in client.root.query_tree().children:
+        prop = window.get_full_property(client.net_wm_name, client.utf8)
+        title = prop.value if prop is not None else window.get_wm_name()
+        if isinstance(title, bytes):
+            title = title.decode('utf-8', 'replace')
+        if title:
+            titles.append(title)
+    return titles
+
+
+def wait_for(backend, predicate, timeout=2.0) -> float:
+    """Seconds until the backend's index satisfies predicate, woken by its X connection; None on timeout"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        backend.pending_changes()
+        if predicate(backend.list_windows()):
+            return time.perf_counter() - start
+        select.select([backend.fileno()], [], [], 0.05)
+    return None
+
+
+def median_ms(function, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the X11 window backend")
+    parser.add_argument('--xvfb', action='store_true', help="start a private Xvfb instead of using $DISPLAY")
+    parser.add_argument('--windows', type=int, default=200, help="other windows to open (default: %(default)s)")
+    parser.add_argument('--runs', type=int, default=50, help="checks per measurement (default: %(default)s)")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec('Xlib') is None:
+        print("python-xlib is not installed (pip install python-xlib)")
+        sys.exit(1)
+
+    server = None
+    name = os.environ.get('DISPLAY')
+    if args.xvfb:
+        try:
+            server, name = start_xvfb()
+        except FileNotFoundError:
+            print("Xvfb is not installed (e.g. apt install xvfb)")
+            sys.exit(1)
+    if not name:
+        print("No X server: set DISPLAY or pass --xvfb")
+        sys.exit(1)
+
+    failures = []
+
+    def check(ok, message):
+        print(f"{'ok  ' if ok else 'FAIL'} {message}")
+        if not ok:
+            failures.append(message)
+
+    try:
+        client = TestClient(name)
+        others = [client.open(f"Window {i}") for i in range(args.windows)]
+        roblox = client.open("Roblox", pid=os.getpid())
+
+        backend = X11WindowBackend(name)
+        windows = backend.list_windows()
+        check(len(windows) == args.windows + 1, f"initial index has {len(windows)} windows")
+        check(any(w.title == "Roblox" and w.pid == os.getpid() for w in windows), "Roblox window indexed with its PID")
+        mode = "_NET_CLIENT_LIST" if backend.ewmh else "substructure events (no window manager)"
+        print(f"     following {mode}")
+
+        # Per-check cost while nothing changes
+        event_ms = median_ms(backend.list_windows, args.runs)
+        poll_ms = median_ms(lambda: list_by_polling(client), args.runs)
+        check(backend.list_windows() is backend.list_windows(), "unchanged index is returned without rebuilding")
+
+        # A kick popup retitles the Roblox window
+        client.set_title(roblox, "Roblox - Disconnected")
+        latency = wait_for(backend, lambda ws: any(w.title == "Roblox - Disconnected" for w in ws))
+        check(latency is not None, f"title change seen through events"
+              + (f" after {latency * 1000:.1f} ms" if latency is not None else ""))
+
+        window = client.open("Roblox")
+        check(wait_for(backend, lambda ws: any(w.handle == window.id for w in ws)) is not None, "new window indexed")
+        client.close(window)
+        check(wait_for(backend, lambda ws: all(w.handle != window.id for w in ws)) is not None, "closed window dropped")
+
+        client.close(others.pop())
+        check(wait_for(backend, lambda ws: len(ws) == args.windows) is not None, "index matches the server after churn")
+        check(sorted(w.title for w in backend.list_windows()) == sorted(list_by_polling(client)),
+              "index agrees with a full listing")
+
+        print(f"\n{args.windows + 1} windows, median per check: events {event_ms:.3f} ms, "
+              f"full listing {poll_ms:.3f} ms ({backend.events} X events handled)")
+        backend.close()
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Window title classification for Roblox Anti-Leave
+Compiles ROBLOX_PATTERNS and DISCONNECT_INDICATORS into a single regex that
+labels a title in one pass, with an LRU cache keyed on the title string.
+"""
+
+import re
+from functools import lru_cache
+
+from metrics import SUPPRESSIONS
+
+# Title labels
+NON_ROBLOX = 0
+ROBLOX = 1
+DISCONNECT = 2
+
+
+class TitleClassifier:
+    """Labels window titles as non-Roblox, Roblox or disconnect popup"""
+
+    def __init__(self, roblox_patterns, disconnect_indicators, cache_size=1024):
+        self.roblox_patterns = list(roblox_patterns)
+        self.disconnect_indicators = list(disconnect_indicators)
+        self.regex = self.compile(self.roblox_patterns, self.disconnect_indicators)
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    @staticmethod
+    def compile(roblox_patterns, disconnect_indicators):
+        """Build one regex whose optional lookaheads capture both checks"""
+        roblox = '|'.join(f'(?:{pattern})' for pattern in roblox_patterns) or '(?!)'
+        indicators = '|'.join(re.escape(indicator) for indicator in disconnect_indicators) or '(?!)'
+        return re.compile(rf'(?=.*?(?P<roblox>{roblox}))?(?=.*?(?P<indicator>{indicators}))?',
+                          re.IGNORECASE | re.DOTALL)
+
+    def _classify(self, title: str) -> int:
+        match = self.regex.match(title)
+        if match.group('roblox') is None:
+            if match.group('indicator') is not None:
+                # e.g. a browser tab about disconnects; counted once per distinct title
+                SUPPRESSIONS.inc(reason='non_roblox_window')
+            return NON_ROBLOX
+        if match.group('indicator') is not None:
+            return DISCONNECT
+        return ROBLOX
+
+    def matched_indicator(self, title: str) -> str:
+        """Return the disconnect indicator found in a title (uncached, for logging)"""
+        return self.regex.match(title).group('indicator') or ''
+
+    def cache_info(self):
+        return self.classify.cache_info()
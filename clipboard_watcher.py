@@ -0,0 +1,102 @@
+"""
+Clipboard watcher for Roblox Anti-Leave
+Polls the clipboard on a background thread and caches the most recent valid
+private server URL, so reconnecting never waits on a clipboard read. Without a
+change counter every poll is a real read (a new xclip/xsel process on Linux),
+so polling backs off while the clipboard stays the same, and snaps back to the
+base interval when the monitor is about to need the URL (refresh()).
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ClipboardWatcher:
+    """Keeps the last private server URL copied to the clipboard"""
+
+    def __init__(self, clipboard, accept, interval=1.0, max_interval=30.0):
+        self.clipboard = clipboard
+        self.accept = accept
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.delay = interval  # current wait between polls
+        self.url = None
+        self.polls = 0
+        self.reads = 0
+        self.thread = None
+        self._last_change = None
+        self._last_content = None
+        self._lock = threading.Lock()  # guards url; never held across a clipboard read
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def poll(self) -> bool:
+        """Check the clipboard once, reading it only if it may have changed; True if the content changed"""
+        self.polls += 1
+        # Platforms with a clipboard change counter let us skip the read entirely
+        change = self.clipboard.change_count()
+        if change is not None and change == self._last_change:
+            return False
+        self._last_change = change
+
+        self.reads += 1
+        content = self.clipboard.paste()
+        if content == self._last_content:
+            return False
+        self._last_content = content
+
+        content = (content or '').strip()
+        if content and content != self.url and self.accept(content):
+            with self._lock:
+                self.url = content
+            logger.info(f"Private server URL copied: {content}")
+        return True
+
+    def next_delay(self, changed: bool) -> float:
+        """Wait before the next poll: the base interval, doubling while unchanged reads find nothing new"""
+        if changed or self._last_change is not None:
+            self.delay = self.interval
+        else:
+            self.delay = min(self.delay * 2, self.max_interval)
+        return self.delay
+
+    def current_url(self):
+        """The last copied server URL, from the cache only (never reads the clipboard)"""
+        with self._lock:
+            return self.url
+
+    def refresh(self):
+        """Poll again now and drop the backoff, e.g. while a disconnect is being confirmed"""
+        self.delay = self.interval
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            changed = False
+            try:
+                changed = self.poll()
+            except Exception as e:
+                logger.debug(f"Error reading clipboard: {e}")
+            self._wake.wait(self.next_delay(changed))
+            self._wake.clear()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._wake.clear()
+        self.thread = threading.Thread(target=self._run, name="clipboard-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=0.5):
+        self._stop.set()
+        self._wake.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
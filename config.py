@@ -1,13 +1,45 @@
 """
 Configuration file for Roblox Anti-Leave Script
 Modify these settings to customize the behavior of the script.
+Values are checked when loaded (see settings.py), and most edits apply to a
+running monitor within a few seconds; the rest are noted as needing a restart.
 """
 
 # Monitoring settings
 CHECK_INTERVAL = 5  # seconds between disconnection checks
 MAX_RECONNECT_ATTEMPTS = 3  # maximum number of reconnection attempts
-RECONNECT_DELAY = 10  # seconds to wait after a reconnection attempt
+REJOIN_TIMEOUT = 60  # seconds to wait for the relaunched client to come back before giving up on an attempt
+READINESS_POLL_INTERVAL = 0.5  # seconds between readiness checks while waiting for the client
 DISCONNECTION_COOLDOWN = 30  # seconds to wait before detecting disconnection again (prevents spam)
+CONCURRENT_PROBES = False  # run the process and window checks at the same time instead of one after the other
+PROBE_TIMEOUT = 2.0  # seconds a check may take in concurrent mode before it is skipped (e.g. a hung window manager)
+
+# Disconnect confirmation - a disconnect needs DISCONNECT_CONFIRMATIONS votes within the last CONFIRMATION_WINDOW probes
+DISCONNECT_CONFIRMATIONS = 2
+CONFIRMATION_WINDOW = 3
+# Weight of each disconnect signal; a probe casts one vote per SIGNAL_THRESHOLD of total weight,
+# so with the defaults a lone popup or missing window needs a second probe, while the process
+# and window both vanishing confirms straight away
+SIGNAL_WEIGHTS = {
+    "exited": 1.0,  # a tracked Roblox process exited
+    "no_process": 1.0,  # no Roblox process running
+    "no_window": 1.0,  # no Roblox window open
+    "popup": 1.0,  # a Roblox window shows one of DISCONNECT_INDICATORS
+}
+SIGNAL_THRESHOLD = 1.0
+
+# Failover servers - reconnects move to the best of these when the current server keeps failing
+SERVER_POOL = []  # extra private server share URLs, e.g. ["https://www.roblox.com/share?code=CODE&type=Server"]
+SERVER_FAILOVER_AFTER = 2  # consecutive failed rejoins before switching servers
+SERVER_SCORE_WINDOW = 10  # recent rejoins per server used for its score
+
+# Adaptive polling - CHECK_INTERVAL is the starting point
+ADAPTIVE_POLLING = True  # poll fast after a reconnect, back off while the connection is steady
+MIN_CHECK_INTERVAL = 1  # seconds, used right after a reconnect or when something looks suspicious
+MAX_CHECK_INTERVAL = 30  # seconds, ceiling while the connection is steady
+POLL_BACKOFF = 1.5  # interval multiplier after each steady check
+POLL_JITTER = 0.1  # +/- fraction of the interval, spreads out monitors sharing a host
+FAST_POLL_DURATION = 60  # seconds of fast polling after a reconnect
 
 # Detection settings - More conservative to prevent false positives
 DISCONNECT_INDICATORS = [
@@ -23,6 +55,9 @@ DISCONNECT_INDICATORS = [
     "removed from the game"
 ]
 
+# Number of classified window titles to remember between checks
+TITLE_CACHE_SIZE = 1024
+
 # Roblox window patterns to look for
 ROBLOX_PATTERNS = [
     r"Roblox",
@@ -41,16 +76,55 @@ ROBLOX_PROCESS_NAMES = [
 # Notification settings
 ENABLE_NOTIFICATIONS = True
 NOTIFICATION_TIMEOUT = 10  # seconds
+NOTIFICATION_QUEUE_SIZE = 16  # notifications waiting to be shown before the overflow policy kicks in
+NOTIFICATION_COALESCE_WINDOW = 120  # seconds during which repeats of the same notification are folded into one
+NOTIFICATION_OVERFLOW = "drop_oldest"  # "drop_oldest" or "drop_newest" when the queue is full
 
 # Logging settings
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR
 LOG_FILE = "roblox_antileave.log"
 ENABLE_CONSOLE_LOGGING = True
+LOG_MAX_BYTES = 5 * 1024 * 1024  # rotate the log file once it reaches this size
+LOG_ROTATE_INTERVAL = 0  # also rotate after this many seconds (0 = size only)
+LOG_MAX_TOTAL_BYTES = 50 * 1024 * 1024  # hard cap on the log file plus rotated copies
+LOG_QUEUE_SIZE = 10000  # records waiting to be written before new ones are dropped
+LOG_FLUSH_INTERVAL = 1.0  # seconds between disk flushes (errors are flushed right away)
+GUI_LOG_MAX_LINES = 1000  # lines kept in the GUI activity log
+
+# Metrics
+METRICS_PORT = 0  # serve Prometheus metrics on http://127.0.0.1:PORT/metrics (0 = disabled)
 
-# Browser settings
-BROWSER_WAIT_TIME = 3  # seconds to wait for browser to open
+# Headless daemon (python daemon.py) - the GUI and console attach to it when it is running
+DAEMON_SOCKET = "roblox_antileave.sock"  # Unix socket serving the control API (next to config.py unless absolute)
+DAEMON_PORT = 47642  # localhost TCP port used instead where Unix sockets are unavailable (Windows)
+DAEMON_EVENT_BUFFER = 1000  # events kept per streaming client before the oldest are dropped
+
+# Probe trace recording (replay with: python probe_trace.py FILE)
+TRACE_FILE = None  # e.g. "probe_trace.jsonl.gz" to record every process/window change the monitor sees (one file per session)
+
+# Session journal (summarize with: python journal.py)
+ENABLE_JOURNAL = True
+JOURNAL_FILE = "roblox_antileave.journal"  # one JSON event per line, appended across sessions (relative to this folder)
+
+# Settings reload - edits to this file apply without restarting, except notification, logging, metrics,
+# daemon, journal, trace, clipboard and monitoring on/off settings (and INSTANCES), which need a restart
+CONFIG_HOT_RELOAD = True
+CONFIG_RELOAD_INTERVAL = 2.0  # seconds between checks for changes to this file
 
 # Advanced settings
 ENABLE_CLIPBOARD_DETECTION = True  # try to get game URL from clipboard
+CLIPBOARD_WATCHER = True  # watch the clipboard in the background instead of reading it on reconnect
+CLIPBOARD_POLL_INTERVAL = 1.0  # seconds between clipboard checks
+CLIPBOARD_MAX_POLL_INTERVAL = 30.0  # where the clipboard can't report changes, checks slow down to this while it stays the same
 ENABLE_PROCESS_MONITORING = True  # monitor Roblox processes
+PROCESS_BACKEND = "auto"  # "procfs" reads /proc directly (Linux), "psutil" everywhere; "auto" prefers procfs
 ENABLE_WINDOW_MONITORING = True   # monitor Roblox windows
+WINDOW_BACKEND = "pygetwindow"  # lists windows each check; "x11" follows window events from the X server instead (Linux, needs python-xlib)
+ENABLE_EXIT_EVENTS = True  # wake immediately when a tracked Roblox process exits instead of waiting for the next check
+ENABLE_WINDOW_EVENTS = True  # with the x11 backend, check immediately when a Roblox or disconnect window appears, closes or is retitled
+
+# Multi-instance supervisor (python supervisor.py)
+# One entry per Roblox client, e.g.
+# {"name": "alt1", "url": "https://www.roblox.com/share?code=CODE&type=Server", "title_pattern": r"Roblox", "pid": None}
+# "title_pattern" and "pid" are optional; clients are otherwise matched to instances in launch order.
+INSTANCES = []
@@ -0,0 +1,127 @@
+"""
+Connection state machine for Roblox Anti-Leave
+Weighs the disconnect signals seen by each probe and only declares a
+disconnection once N of the last M probes confirm it, so one missed probe or
+one odd window title never costs a relaunch.
+"""
+
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# States
+CONNECTED = 'connected'
+SUSPECT = 'suspect'
+DISCONNECTED = 'disconnected'
+RECONNECTING = 'reconnecting'
+COOLDOWN = 'cooldown'
+
+# Disconnect signals a probe can report
+EXITED = 'exited'  # a tracked client process exited (event from the exit watcher)
+NO_PROCESS = 'no_process'  # no Roblox process running
+NO_WINDOW = 'no_window'  # no Roblox window open
+POPUP = 'popup'  # a Roblox window shows a disconnection message
+
+DEFAULT_WEIGHTS = {EXITED: 1.0, NO_PROCESS: 1.0, NO_WINDOW: 1.0, POPUP: 1.0}
+
+
+class ConnectionStateMachine:
+    """connected -> suspect -> disconnected -> reconnecting -> cooldown -> connected"""
+
+    def __init__(self, clock, confirmations=2, window=3, weights=None, threshold=1.0,
+                 cooldown=30, on_transition=None):
+        self.clock = clock
+        self.on_transition = on_transition
+
+        self.state = CONNECTED
+        self.votes = deque()  # confirming votes cast by each recent probe
+        self.signals = set()  # every signal seen since the last clean window
+        self.cooldown_until = 0
+        self.configure(confirmations, window, weights, threshold, cooldown)
+
+    def configure(self, confirmations, window, weights=None, threshold=1.0, cooldown=30):
+        """Set the confirmation rule; recent votes are kept"""
+        self.confirmations = max(1, confirmations)
+        self.window = max(self.confirmations, window)
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.votes = deque(self.votes, maxlen=self.window)
+
+    def votes_for(self, signals) -> int:
+        """Confirming votes a single probe casts: one per threshold of signal weight"""
+        score = sum(self.weights.get(signal, 0) for signal in signals)
+        if score < self.threshold:
+            return 0
+        # Overwhelming evidence (e.g. process and window both gone) confirms on its own
+        return min(int(score / self.threshold + 1e-9), self.confirmations)
+
+    def cooling_down(self) -> bool:
+        """Whether probes are still being ignored after a reconnect"""
+        if self.state == COOLDOWN and self.clock.time() >= self.cooldown_until:
+            self._enter(CONNECTED)
+        return self.state == COOLDOWN
+
+    def observe(self, signals) -> bool:
+        """Feed one probe's disconnect signals; True when a disconnection is confirmed"""
+        signals = set(signals)
+        if self.state in (DISCONNECTED, RECONNECTING):
+            return False
+        if self.cooling_down():
+            # A tracked client exiting means the relaunched client died, cooldown or not
+            if EXITED not in signals:
+                return False
+            self.state = CONNECTED  # silently: this probe decides where we go next
+
+        self.votes.append(self.votes_for(signals))
+        if self.votes[-1]:
+            self.signals |= signals
+
+        total = sum(self.votes)
+        if total >= self.confirmations:
+            self._enter(DISCONNECTED)
+            return True
+        if total:
+            if self.state != SUSPECT:
+                self._enter(SUSPECT)
+        elif self.state == SUSPECT:
+            # Evidence aged out of the window without being confirmed
+            self._enter(CONNECTED, confirmed=False)
+        return False
+
+    @property
+    def reason(self) -> str:
+        """Strongest signal behind the current evidence, for logs and metrics"""
+        for signal in (POPUP, EXITED, NO_PROCESS, NO_WINDOW):
+            if signal in self.signals:
+                return signal
+        return NO_PROCESS
+
+    def reconnecting(self):
+        """A client was relaunched; the cooldown runs from the launch"""
+        self.cooldown_until = self.clock.time() + self.cooldown
+        self._enter(RECONNECTING)
+
+    def rejoined(self):
+        """The reconnect finished, successfully or not; probes resume after the cooldown"""
+        self._enter(COOLDOWN)
+
+    def reset(self):
+        """Start over as connected, e.g. when monitoring starts"""
+        self.state = CONNECTED
+        self.votes.clear()
+        self.signals.clear()
+        self.cooldown_until = 0
+
+    def _enter(self, state, **info):
+        previous, self.state = self.state, state
+        if state in (DISCONNECTED, CONNECTED):
+            self.votes.clear()
+        if state in (CONNECTED, RECONNECTING):
+            self.signals.clear()
+        if previous == state:
+            return
+        logger.debug(f"Connection state: {previous} -> {state}")
+        if self.on_transition:
+            self.on_transition(previous, state, **info)
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Headless daemon for Roblox Anti-Leave
+Runs the monitor without a terminal or window and serves a JSON-RPC style
+control API on a local socket: start, stop, status, events and metrics.
+The GUI and the console attach to it as clients when it is running.
+
+    python daemon.py                     # run the daemon
+    python daemon.py start URL           # control a running daemon
+    python daemon.py stop | status | metrics | events
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+from collections import deque
+
+from main import (RobloxAntiLeave, configure_logging, missing_dependencies, current_settings, SETTINGS,
+                  ENABLE_CONSOLE_LOGGING, METRICS_PORT, DAEMON_PORT, DAEMON_EVENT_BUFFER)
+from settings import SettingsError
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class RpcError(Exception):
+    """An error reply from the control API"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class MonitorService:
+    """Owns the monitor and its engine thread; what the control API drives"""
+
+    def __init__(self, factory=RobloxAntiLeave, log_pipeline=None):
+        self.factory = factory
+        self.log_pipeline = log_pipeline  # reported in status() when the daemon owns the logging pipeline
+        self.anti_leave = None
+        self.engine = None
+        self.started = None
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.engine is not None and self.engine.running
+
+    def start(self, url=None) -> dict:
+        with self._lock:
+            if self.running:
+                raise RpcError(SERVER_ERROR, "Monitoring is already running")
+            anti_leave = self.factory()
+            if url:
+                if not anti_leave.is_valid_roblox_url(url):
+                    raise RpcError(INVALID_PARAMS, "Invalid private server URL")
+                url = anti_leave.normalize_roblox_url(url)
+            anti_leave.journal.subscribe(self.publish)
+
+            from engine import MonitorEngine
+            self.engine = MonitorEngine(anti_leave)
+            anti_leave.engine = self.engine
+            self.anti_leave = anti_leave
+            self.started = time.time()
+            self.engine.start(url)
+        return self.status()
+
+    def stop(self) -> dict:
+        with self._lock:
+            if self.engine:
+                self.anti_leave.stop_monitoring()
+                self.engine.stop()
+        return self.status()
+
+    def status(self) -> dict:
+        """Snapshot of the monitor's state, read without probing anything"""
+        anti_leave = self.anti_leave
+        queues = {'logging': self.log_pipeline.stats()} if self.log_pipeline else {}
+        if anti_leave is None:
+            return {'running': False, **queues}
+        last = anti_leave.rejoin_history[-1] if anti_leave.rejoin_history else None
+        return {
+            'running': self.running,
+            'url': anti_leave.server_url,
+            'state': anti_leave.connection.state,
+            'started': self.started,
+            'reconnect_attempts': anti_leave.reconnect_attempts,
+            'reconnect_budget': anti_leave.reconnect_budget,
+            'consecutive_disconnects': anti_leave.consecutive_disconnects,
+            'tracked_pids': sorted(list(anti_leave.process_tracker.tracked)),
+            'check_interval': anti_leave.scheduler.effective_interval,
+            'last_rejoin': last._asdict() if last else None,
+            'servers': anti_leave.server_pool.stats(),
+            'notifications': anti_leave.notifications.stats(),
+            **queues,
+        }
+
+    def metrics(self, format='summary'):
+        if format == 'prometheus':
+            return metrics.registry.render()
+        if format != 'summary':
+            raise RpcError(INVALID_PARAMS, f"Unknown metrics format: {format}")
+        return metrics.summary()
+
+    def subscribe(self, listener):
+        self.listeners = self.listeners + [listener]
+
+    def unsubscribe(self, listener):
+        self.listeners = [l for l in self.listeners if l is not listener]
+
+    def publish(self, event: dict):
+        """Hand an event to every subscriber (called from any thread)"""
+        for listener in self.listeners:
+            listener(event)
+
+
+class EventLogHandler(logging.Handler):
+    """Log pipeline sink that turns log records into 'log' events"""
+
+    def __init__(self, service, level=logging.INFO):
+        super().__init__(level)
+        self.service = service
+
+    def emit(self, record):
+        if self.service.listeners:
+            self.service.publish({'t': round(record.created, 3), 'ev': 'log',
+                                  'level': record.levelname, 'msg': record.getMessage()})
+
+
+class ControlServer:
+    """Serves the control API as newline-delimited JSON on a Unix socket"""
+
+    def __init__(self, service, path=SETTINGS.daemon_socket, port=DAEMON_PORT, event_buffer=DAEMON_EVENT_BUFFER):
+        self.service = service
+        self.path = path
+        self.port = port  # used where Unix sockets are unavailable (Windows), on localhost only
+        self.event_buffer = event_buffer
+        self.server = None
+        self.loop = None
+        self.clients = 0
+        self.requests = 0
+
+    async def listen(self):
+        """Claim the socket and start accepting clients; fails if another daemon holds it"""
+        import asyncio
+        self.loop = asyncio.get_running_loop()
+        if hasattr(socket, 'AF_UNIX'):
+            self._remove_stale_socket()
+            self.server = await asyncio.start_unix_server(self.handle, self.path)
+            os.chmod(self.path, 0o600)
+            logger.info(f"Control socket listening on {self.path}")
+        else:
+            self.server = await asyncio.start_server(self.handle, '127.0.0.1', self.port)
+            logger.info(f"Control API listening on 127.0.0.1:{self.port}")
+
+    async def serve(self, ready=None):
+        """Run until cancelled"""
+        try:
+            if self.server is None:
+                await self.listen()
+            if ready is not None:
+                ready.set()
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop listening and remove the socket file"""
+        if self.server is None:
+            return
+        self.server.close()
+        self.server = None
+        if hasattr(socket, 'AF_UNIX') and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.path):
+            return
+        if DaemonClient(self.path).available():
+            raise RuntimeError(f"Another daemon is already listening on {self.path}")
+        os.unlink(self.path)
+
+    async def handle(self, reader, writer):
+        """One client connection: a request per line, answered in order"""
+        self.clients += 1
+        result = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.requests += 1
+                request_id, method, params, error = self._parse(line)
+                if error is None and method == 'events':
+                    await self._reply(writer, request_id, {'subscribed': True})
+                    await self._stream_events(reader, writer)
+                    break
+                if error is None:
+                    result, error = await self._dispatch(method, params)
+                await self._reply(writer, request_id, result, error)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    def _parse(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return None, None, None, RpcError(PARSE_ERROR, "Invalid JSON")
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return None, None, None, RpcError(INVALID_REQUEST, "Expected an object with a method")
+        params = request.get('params') or {}
+        if not isinstance(params, dict):
+            return request.get('id'), None, None, RpcError(INVALID_PARAMS, "params must be an object")
+        return request.get('id'), request['method'], params, None
+
+    async def _dispatch(self, method, params):
+        import asyncio
+        service = self.service
+        try:
+            if method == 'status':
+                return service.status(), None
+            if method == 'metrics':
+                return service.metrics(**params), None
+            if method == 'start':
+                # Building the monitor and joining its thread happen off the loop
+                return await asyncio.to_thread(service.start, params.get('url')), None
+            if method == 'stop':
+                return await asyncio.to_thread(service.stop), None
+            return None, RpcError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+        except RpcError as e:
+            return None, e
+        except TypeError as e:
+            return None, RpcError(INVALID_PARAMS, str(e))
+        except Exception as e:
+            logger.error(f"Error handling {method}: {e}")
+            return None, RpcError(SERVER_ERROR, str(e))
+
+    async def _reply(self, writer, request_id, result=None, error=None):
+        reply = {'jsonrpc': '2.0', 'id': request_id}
+        if error is not None:
+            reply['error'] = {'code': error.code, 'message': error.message}
+        else:
+            reply['result'] = result
+        writer.write(json.dumps(reply, default=str).encode('utf-8') + b'\n')
+        await writer.drain()
+
+    async def _stream_events(self, reader, writer):
+        """Push events to this client until it disconnects; a slow client loses the oldest"""
+        import asyncio
+        pending = deque(maxlen=self.event_buffer)
+        wakeup = asyncio.Event()
+        loop = self.loop
+
+        def listener(event):
+            loop.call_soon_threadsafe(on_event, event)
+
+        def on_event(event):
+            pending.append(event)
+            wakeup.set()
+
+        closed = asyncio.ensure_future(reader.read())  # EOF from the client ends the stream
+        self.service.subscribe(listener)
+        try:
+            while not closed.done():
+                waiter = asyncio.ensure_future(wakeup.wait())
+                await asyncio.wait({waiter, closed}, return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                wakeup.clear()
+                while pending:
+                    event = pending.popleft()
+                    writer.write(json.dumps({'jsonrpc': '2.0', 'method': 'event', 'params': event},
+                                            default=str).encode('utf-8') + b'\n')
+                await writer.drain()
+        finally:
+            self.service.unsubscribe(listener)
+            closed.cancel()
+
+
+class DaemonClient:
+    """Blocking client for the control API; one short-lived connection per call"""
+
+    def __init__(self, path=SETTINGS.daemon_socket, port=DAEMON_PORT, timeout=2.0):
+        self.path = path
+        self.port = port
+        self.timeout = timeout
+        self._ids = 0
+
+    def _connect(self, timeout):
+        if hasattr(socket, 'AF_UNIX'):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = self.path
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            address = ('127.0.0.1', self.port)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _send(self, sock, method, params):
+        self._ids += 1
+        request = {'jsonrpc': '2.0', 'id': self._ids, 'method': method, 'params': params}
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+
+    @staticmethod
+    def _result(reply):
+        if 'error' in reply:
+            raise RpcError(reply['error'].get('code', SERVER_ERROR), reply['error'].get('message', ''))
+        return reply.get('result')
+
+    def call(self, method, **params):
+        # start/stop wait for the monitor thread, so give them longer than a status query
+        with self._connect(self.timeout if method not in ('start', 'stop') else self.timeout + 10) as sock:
+            self._send(sock, method, params)
+            with sock.makefile('rb') as stream:
+                line = stream.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+        return self._result(json.loads(line))
+
+    def available(self) -> bool:
+        """Whether a daemon is answering on the socket"""
+        try:
+            self.call('status')
+            return True
+        except (OSError, ValueError, RpcError):
+            return False
+
+    def start(self, url=None) -> dict:
+        return self.call('start', url=url)
+
+    def stop(self) -> dict:
+        return self.call('stop')
+
+    def status(self) -> dict:
+        return self.call('status')
+
+    def metrics(self, format='summary'):
+        return self.call('metrics', format=format)
+
+    def events(self, stop=None):
+        """Yield events as the daemon publishes them, until the connection closes or stop is set"""
+        with self._connect(self.timeout) as sock:
+            self._send(sock, 'events', {})
+            subscribed = False
+            buffer = b''
+            while not (stop and stop.is_set()):
+                sock.settimeout(0.5 if stop is not None or not subscribed else None)
+                try:
+                    chunk = sock.recv(65536)
+                except socket.timeout:
+                    if not subscribed:
+                        raise
+                    continue
+                if not chunk:
+                    return
+                *lines, buffer = (buffer + chunk).split(b'\n')
+                for line in lines:
+                    message = json.loads(line)
+                    if not subscribed:
+                        self._result(message)
+                        subscribed = True
+                    elif message.get('method') == 'event':
+                        yield message['params']
+
+
+def connect_monitor():
+    """A client for the running daemon, or an in-process monitor when there is none"""
+    client = DaemonClient()
+    if client.available():
+        logger.info(f"Attached to the monitor daemon on {client.path}")
+        return client
+    return MonitorService()
+
+
+def format_event(event: dict) -> str:
+    """One event as a log-style line"""
+    stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event.get('t', time.time())))
+    if event.get('ev') == 'log':
+        return f"{stamp} - {event.get('level')} - {event.get('msg')}"
+    fields = ' '.join(f"{key}={value}" for key, value in event.items() if key not in ('t', 'ev'))
+    return f"{stamp} - EVENT - {event.get('ev')} {fields}".rstrip()
+
+
+def serve(url=None):
+    """Run the daemon until interrupted"""
+    import asyncio
+    try:
+        current_settings()
+    except SettingsError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    missing = missing_dependencies()
+    if missing:
+        print(f"Missing required library: {', '.join(missing)}")
+        print("Please install required packages:")
+        print("pip install -r requirements.txt")
+        sys.exit(1)
+
+    pipeline = configure_logging(console=ENABLE_CONSOLE_LOGGING)
+    service = MonitorService(log_pipeline=pipeline)
+    pipeline.add_sink(EventLogHandler(service))
+    metrics.start_server(METRICS_PORT)
+
+    async def run():
+        control = ControlServer(service)
+        try:
+            # Claim the socket first, so a second daemon fails before it starts monitoring too
+            await control.listen()
+            if url:
+                await asyncio.to_thread(service.start, url)
+            await control.serve()
+        finally:
+            control.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("Daemon stopped by user")
+    except (RuntimeError, RpcError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+    finally:
+        service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Roblox Anti-Leave headless, or control a running daemon")
+    parser.add_argument('command', nargs='?', default='serve',
+                        choices=['serve', 'start', 'stop', 'status', 'metrics', 'events'])
+    parser.add_argument('url', nargs='?', help="private server URL (serve, start)")
+    parser.add_argument('--prometheus', action='store_true', help="metrics in Prometheus text format")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.url)
+        return
+
+    client = DaemonClient()
+    try:
+        if args.command == 'events':
+            for event in client.events():
+                print(format_event(event), flush=True)
+            return
+        if args.command == 'start':
+            result = client.start(args.url)
+        elif args.command == 'metrics':
+            result = client.metrics('prometheus' if args.prometheus else 'summary')
+        else:
+            result = client.call(args.command)
+    except KeyboardInterrupt:
+        return
+    except OSError as e:
+        print(f"Could not reach the daemon on {client.path}: {e}")
+        sys.exit(1)
+    except RpcError as e:
+        print(f"Error: {e.message}")
+        sys.exit(1)
+
+    print(result if isinstance(result, str) else json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+asyncio monitoring engine for Roblox Anti-Leave
+Runs the detection loop as a cancellable task: probes and reconnects are
+awaitable and notifications are queued, so stopping takes effect immediately.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+from metrics import RECONNECTS
+from journal import STOP
+
+logger = logging.getLogger(__name__)
+
+
+class MonitorEngine:
+    """Drives a RobloxAntiLeave instance from an asyncio event loop"""
+
+    def __init__(self, anti_leave):
+        self.anti_leave = anti_leave
+        self.loop = None
+        self.task = None
+        self.thread = None
+        self._cancelled = False
+
+    async def monitor(self, game_url: Optional[str] = None):
+        """Monitoring loop; cancel the task to stop it"""
+        anti_leave = self.anti_leave
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        if self._cancelled:
+            return  # Stopped before the loop came up
+
+        anti_leave.begin_monitoring(game_url)
+        anti_leave.send_notification("Roblox Anti-Leave", "Monitoring started")
+
+        try:
+            while anti_leave.monitoring:
+                if await asyncio.to_thread(anti_leave.detect_disconnection):
+                    logger.warning("Disconnection detected!")
+                    anti_leave.send_notification("Roblox Anti-Leave", "Disconnection detected! Attempting to reconnect...")
+
+                    if anti_leave.reconnect_attempts < anti_leave.reconnect_budget:
+                        if await asyncio.to_thread(anti_leave.reconnect_to_game, False):
+                            # Done as soon as the client is back, rather than after fixed sleeps
+                            await anti_leave.wait_for_rejoin_async()
+                            logger.info("Reconnection attempt completed")
+                        else:
+                            logger.error("Reconnection attempt failed")
+                    else:
+                        logger.error(f"Max reconnection attempts ({anti_leave.reconnect_budget}) reached")
+                        RECONNECTS.inc(outcome='gave_up')
+                        anti_leave.send_notification("Roblox Anti-Leave",
+                                                     "Max reconnection attempts reached. Stopping monitoring.")
+                        break
+
+                await anti_leave.wait_for_next_check_async()
+
+        except asyncio.CancelledError:
+            self._cancelled = True
+            logger.info("Monitoring cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Error during monitoring: {e}")
+        finally:
+            anti_leave.monitoring = False
+            if anti_leave.clipboard_watcher:
+                anti_leave.clipboard_watcher.stop()
+            anti_leave.journal.record(STOP, anti_leave.server_url)
+            anti_leave.journal.close()
+            if anti_leave.trace_recorder:
+                anti_leave.trace_recorder.close()
+            anti_leave.exit_watcher.close()
+            anti_leave.probe_runner.close()
+            # Let queued notifications go out unless we were cancelled
+            anti_leave.notifications.close(0 if self._cancelled else 1.0)
+            logger.info("Monitoring stopped")
+
+    def run(self, game_url: Optional[str] = None):
+        """Run the loop on the calling thread until it ends or is cancelled"""
+        try:
+            asyncio.run(self.monitor(game_url))
+        except KeyboardInterrupt:
+            logger.info("Monitoring stopped by user")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop = None
+            self.task = None
+
+    def start(self, game_url: Optional[str] = None):
+        """Run the loop on a background thread"""
+        self._cancelled = False
+        self.thread = threading.Thread(target=self.run, args=(game_url,), daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Cancel the running loop from any thread"""
+        self._cancelled = True
+        self.anti_leave.monitoring = False
+        loop, task = self.loop, self.task
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def stop(self, timeout: float = 2.0):
+        """Cancel the loop and wait for the background thread to finish"""
+        self.cancel()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
@@ -0,0 +1,161 @@
+"""
+Event-driven process exit detection for Roblox Anti-Leave
+Blocks until a tracked Roblox PID exits or the check interval elapses, using
+pidfds on Linux and the process backend's wait_for_exit() elsewhere.
+"""
+
+import os
+import time
+import select
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessExitWatcher:
+    """Waits on process exit for a set of PIDs"""
+
+    def __init__(self, backend, clock):
+        self.backend = backend
+        self.clock = clock
+
+        # pidfds only make sense when the backend reports real host PIDs
+        self.use_pidfd = (getattr(backend, 'supports_pidfd', False) and
+                          hasattr(os, 'pidfd_open') and hasattr(select, 'poll'))
+        self._fds = {}  # pid -> pidfd
+        self._pids = {}  # pidfd -> pid
+        self._poll = select.poll() if self.use_pidfd else None
+
+    def wait(self, pids, timeout) -> list:
+        """Return the PIDs that exited, blocking for at most timeout seconds"""
+        start = self.clock.time()
+        exited = []
+
+        if pids:
+            if self.use_pidfd:
+                exited = self._wait_pidfd(pids, timeout)
+            else:
+                exited = self.backend.wait_for_exit(list(pids), timeout)
+
+        # Backends that cannot block (e.g. in-memory fakes) still consume the interval
+        if not exited:
+            remaining = timeout - (self.clock.time() - start)
+            if remaining > 0:
+                self.clock.sleep(remaining)
+
+        return exited
+
+    async def wait_async(self, pids, timeout) -> list:
+        """Awaitable wait() that returns as soon as it is cancelled"""
+        start = self.clock.time()
+        exited = []
+
+        if pids:
+            if self.use_pidfd:
+                exited = await self._wait_pidfd_async(pids, timeout)
+            elif getattr(self.backend, 'blocking_wait', False):
+                exited = await self._wait_sliced(pids, timeout)
+            elif getattr(self.backend, 'virtual_wait', False):
+                # Trace replay: the backend moves the virtual clock to the next exit itself
+                exited = self.backend.wait_for_exit(list(pids), timeout)
+            else:
+                exited = self.backend.wait_for_exit(list(pids), 0)
+
+        if not exited:
+            remaining = timeout - (self.clock.time() - start)
+            if remaining > 0:
+                await self.clock.sleep_async(remaining)
+
+        return exited
+
+    async def _wait_pidfd_async(self, pids, timeout) -> list:
+        exited = self._sync(pids)
+        if exited or not self.use_pidfd:
+            return exited
+
+        import asyncio
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def on_exit(pid):
+            if not ready.done():
+                ready.set_result(pid)
+
+        fds = dict(self._fds)
+        for pid, fd in fds.items():
+            loop.add_reader(fd, on_exit, pid)
+        try:
+            pid = await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            for fd in fds.values():
+                loop.remove_reader(fd)
+
+        self._close(pid)
+        return [pid]
+
+    async def _wait_sliced(self, pids, timeout) -> list:
+        """Blocking backend waits in short slices so cancellation is never held up"""
+        import asyncio
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            exited = await asyncio.to_thread(self.backend.wait_for_exit, list(pids), min(0.25, remaining))
+            if exited:
+                return exited
+
+    def _wait_pidfd(self, pids, timeout) -> list:
+        exited = self._sync(pids)
+        if exited or not self.use_pidfd:
+            return exited or self.backend.wait_for_exit(list(pids), timeout)
+
+        for fd, _ in self._poll.poll(timeout * 1000):
+            pid = self._pids.get(fd)
+            if pid is not None:
+                exited.append(pid)
+                self._close(pid)
+        return exited
+
+    def _sync(self, pids) -> list:
+        """Open pidfds for new PIDs and close the ones no longer tracked"""
+        for pid in [pid for pid in self._fds if pid not in pids]:
+            self._close(pid)
+
+        exited = []
+        for pid in pids:
+            if pid in self._fds:
+                continue
+            try:
+                fd = os.pidfd_open(pid)
+            except ProcessLookupError:
+                exited.append(pid)
+                continue
+            except OSError as e:
+                # Kernel without pidfd support or a sandbox blocking it
+                logger.debug(f"pidfd_open unavailable, falling back to polling waits: {e}")
+                self.close()
+                self.use_pidfd = False
+                return exited
+            self._fds[pid] = fd
+            self._pids[fd] = pid
+            self._poll.register(fd, select.POLLIN)
+        return exited
+
+    def _close(self, pid):
+        fd = self._fds.pop(pid, None)
+        if fd is None:
+            return
+        self._pids.pop(fd, None)
+        try:
+            self._poll.unregister(fd)
+        except KeyError:
+            pass
+        os.close(fd)
+
+    def close(self):
+        """Release every open pidfd"""
+        for pid in list(self._fds):
+            self._close(pid)
@@ -6,16 +6,20 @@ A simple and clean interface to control the anti-leave functionality
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import threading
-import queue
 import logging
-from main import RobloxAntiLeave
+from collections import deque
+from main import (RobloxAntiLeave, configure_logging, missing_dependencies, current_settings,
+                  LOG_LEVEL, GUI_LOG_MAX_LINES, METRICS_PORT)
+from settings import SettingsError
+import metrics
 import webbrowser
+import threading
 import sys
 import os
 
 class ModernGUI:
-    def __init__(self):
+    def __init__(self, log_pipeline):
+        self.log_pipeline = log_pipeline
         self.root = tk.Tk()
         self.root.title("Roblox AFK")
         self.root.geometry("600x900")
@@ -37,12 +41,12 @@ class ModernGUI:
         self.root.configure(bg=self.colors['bg'])
         
         # Anti-leave instance
-        self.anti_leave = None
-        self.monitoring_thread = None
+        self.monitor = None  # in-process MonitorService, or a DaemonClient when a daemon is running
+        self.event_stop = None
         self.is_monitoring = False
         
-        # Queue for thread communication
-        self.log_queue = queue.Queue()
+        # Bounded buffer for thread communication (oldest lines fall off if Tk falls behind)
+        self.log_queue = deque(maxlen=GUI_LOG_MAX_LINES)
         
         # Setup GUI
         self.setup_styles()
@@ -52,6 +56,8 @@ class ModernGUI:
         
         # Start log processing
         self.process_log_queue()
+        self.update_stats()
+        metrics.start_server(METRICS_PORT)
         
     def setup_styles(self):
         """Configure modern ttk styles"""
@@ -251,6 +257,15 @@ class ModernGUI:
                                     fg=self.colors['success'],
                                     bg=self.colors['card'])
         self.status_label.pack(anchor='w')
+
+        # Live stats fed from the metrics registry
+        self.stats_label = tk.Label(status_inner,
+                                   text="",
+                                   font=('Consolas', 9),
+                                   fg='#888888',
+                                   bg=self.colors['card'],
+                                   justify='left')
+        self.stats_label.pack(anchor='w', pady=(8, 0))
         
         # Log Section with beveled corners
         log_frame = tk.Frame(main_frame, bg=self.colors['card'], relief='raised', bd=2)
@@ -347,40 +362,61 @@ class ModernGUI:
                 self.log_queue = log_queue
                 
             def emit(self, record):
-                self.log_queue.put(self.format(record))
-        
-        # Configure logging
-        logger = logging.getLogger()
-        logger.setLevel(logging.INFO)
+                self.log_queue.append(self.format(record))
         
-        # Remove existing handlers
-        for handler in logger.handlers[:]:
-            logger.removeHandler(handler)
-            
-        # Add queue handler
+        # Level filtering happens on the log writer thread, before records reach Tk
         queue_handler = QueueHandler(self.log_queue)
+        queue_handler.setLevel(max(logging.INFO, getattr(logging, LOG_LEVEL.upper(), logging.INFO)))
         queue_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logger.addHandler(queue_handler)
+        self.log_pipeline.add_sink(queue_handler)
         
     def process_log_queue(self):
-        """Process log messages from queue and display in GUI"""
+        """Drain queued log messages into the display with a single insert"""
+        messages = []
         try:
             while True:
-                message = self.log_queue.get_nowait()
-                self.add_log_message(message)
-        except queue.Empty:
+                messages.append(self.log_queue.popleft())
+        except IndexError:
             pass
-        
+
+        if messages:
+            self.add_log_messages(messages)
+
         # Schedule next check
         self.root.after(100, self.process_log_queue)
-        
+
     def add_log_message(self, message):
         """Add message to log display"""
+        self.add_log_messages([message])
+
+    def add_log_messages(self, messages):
+        """Append lines to the log display, trimming it to GUI_LOG_MAX_LINES"""
+        # Lines that would be trimmed straight away are never inserted
+        messages = messages[-GUI_LOG_MAX_LINES:]
         self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, message + '\n')
+        self.log_text.insert(tk.END, '\n'.join(messages) + '\n')
+        excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - GUI_LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete('1.0', f'{excess + 1}.0')
         self.log_text.see(tk.END)
         self.log_text.config(state='disabled')
         
+    def update_stats(self):
+        """Refresh the stats panel from the metrics registry"""
+        try:
+            stats = self.monitor.metrics() if self.monitor else metrics.summary()
+        except OSError:
+            self.stats_label.config(text="Monitor daemon not reachable")
+            self.root.after(1000, self.update_stats)
+            return
+        self.stats_label.config(text=(
+            f"Checks: {stats['ticks']}   avg {stats['tick_ms']:.1f} ms "
+            f"(windows {stats['window_probe_ms']:.1f} ms, processes {stats['process_probe_ms']:.1f} ms)\n"
+            f"Detections: {stats['detections']}   suppressed: {stats['suppressions']}   "
+            f"reconnects: {stats['reconnects']} ({stats['rejoined']} rejoined)   "
+            f"tracked clients: {stats['tracked']}"))
+        self.root.after(1000, self.update_stats)
+
     def validate_url(self):
         """Validate the entered URL"""
         url = self.url_entry.get().strip()
@@ -412,19 +448,17 @@ class ModernGUI:
             messagebox.showerror("Error", "Invalid private server URL format!")
             return
             
-        # Start monitoring in separate thread
+        # Monitor on a thread of this process, or in the daemon if one is running
+        from daemon import connect_monitor, DaemonClient, RpcError
+        self.monitor = connect_monitor()
+        try:
+            self.monitor.start(url)
+        except (RpcError, OSError) as e:
+            messagebox.showerror("Error", f"Could not start monitoring: {e}")
+            return
         self.is_monitoring = True
-        self.anti_leave = RobloxAntiLeave()
-        
-        def monitor():
-            try:
-                self.anti_leave.start_monitoring(url)
-            except Exception as e:
-                self.log_queue.put(f"ERROR - Monitoring failed: {e}")
-                self.is_monitoring = False
-                
-        self.monitoring_thread = threading.Thread(target=monitor, daemon=True)
-        self.monitoring_thread.start()
+        if isinstance(self.monitor, DaemonClient):
+            self.follow_daemon_events(self.monitor)
         
         # Update UI
         self.start_button.config(state='disabled', bg='#666666')
@@ -436,8 +470,15 @@ class ModernGUI:
         
     def stop_monitoring(self):
         """Stop the anti-leave monitoring"""
-        if self.anti_leave:
-            self.anti_leave.stop_monitoring()
+        if self.event_stop:
+            self.event_stop.set()
+            self.event_stop = None
+        if self.monitor:
+            # Cancellation is immediate, so this is short
+            try:
+                self.monitor.stop()
+            except OSError as e:
+                self.add_log_message(f"Could not reach the monitor daemon: {e}")
             
         self.is_monitoring = False
         
@@ -449,6 +490,21 @@ class ModernGUI:
         
         self.add_log_message("Monitoring stopped")
         
+    def follow_daemon_events(self, client):
+        """Feed the daemon's event stream into the activity log"""
+        from daemon import format_event
+        self.event_stop = stop = threading.Event()
+
+        def run():
+            try:
+                for event in client.events(stop):
+                    self.log_queue.append(format_event(event))
+            except (OSError, ValueError) as e:
+                if not stop.is_set():
+                    self.log_queue.append(f"Lost connection to the monitor daemon: {e}")
+
+        threading.Thread(target=run, name="daemon-events", daemon=True).start()
+
     def show_help(self):
         """Show help information"""
         help_text = """
@@ -515,7 +571,20 @@ Tips:
 def main():
     """Main function to start GUI"""
     try:
-        app = ModernGUI()
+        current_settings()
+    except SettingsError as e:
+        messagebox.showerror("Error", f"Invalid config.py:\n\n{e}")
+        sys.exit(1)
+
+    missing = missing_dependencies()
+    if missing:
+        messagebox.showerror("Error", f"Missing required library: {', '.join(missing)}\n\n"
+                                      "Please install required packages:\npip install -r requirements.txt")
+        sys.exit(1)
+
+    try:
+        # The activity log takes the console's place as a sink of the logging pipeline
+        app = ModernGUI(configure_logging(console=False))
         app.run()
     except Exception as e:
         messagebox.showerror("Error", f"Failed to start GUI: {e}")
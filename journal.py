@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Session journal for Roblox Anti-Leave
+Appends compact structured events (one JSON object per line) and analyzes
+them offline: uptime, mean time between disconnects and reconnect latency
+percentiles per private server, streamed in constant memory.
+"""
+
+import sys
+import json
+import math
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+
+# Event types
+START = "start"
+DETECT = "detect"
+RECONNECT_START = "reconnect_start"
+RECONNECT_FINISH = "reconnect_finish"
+CONNECTED = "connected"
+STOP = "stop"
+
+
+def server_key(url) -> str:
+    """Short stable key for a private server URL (its share code when present)"""
+    if not url:
+        return "-"
+    code = parse_qs(urlparse(url).query).get('code')
+    return code[0] if code else url
+
+
+class SessionJournal:
+    """Append-only JSON-lines event log (path None disables it)"""
+
+    def __init__(self, path, clock):
+        self.path = path
+        self.clock = clock
+        self._file = None
+        self._lock = threading.Lock()
+        self.listeners = []  # callables fed every event, e.g. the daemon's event stream
+
+    def subscribe(self, listener):
+        self.listeners = self.listeners + [listener]
+
+    def record(self, event: str, server=None, **fields):
+        """Append one event; never raises into the monitor"""
+        if not (self.path or self.listeners):
+            return
+        entry = {'t': round(self.clock.time(), 3), 'ev': event, 'srv': server_key(server)}
+        entry.update({key: value for key, value in fields.items() if value is not None})
+        for listener in self.listeners:
+            try:
+                listener(entry)
+            except Exception:
+                pass
+        if not self.path:
+            return
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        try:
+            with self._lock:
+                if self._file is None:
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(line)
+                self._file.flush()
+        except OSError:
+            pass
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class LatencyHistogram:
+    """Log-spaced buckets giving percentile estimates in constant memory"""
+
+    PER_DECADE = 20
+    LOW = 0.01  # seconds
+
+    def __init__(self):
+        self.counts = {}
+        self.n = 0
+
+    def add(self, seconds: float):
+        index = 0 if seconds <= self.LOW else math.ceil(math.log10(seconds / self.LOW) * self.PER_DECADE)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.n += 1
+
+    def percentile(self, q: float):
+        if not self.n:
+            return None
+        target = q * self.n
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return self.LOW * 10 ** (index / self.PER_DECADE)
+        return None
+
+
+class ServerStats:
+    """Running totals for one private server"""
+
+    def __init__(self, key):
+        self.key = key
+        self.sessions = 0
+        self.monitored = 0.0
+        self.connected_time = 0.0
+        self.disconnects = 0
+        self.reconnects = 0
+        self.rejoined = 0
+        self.latency = LatencyHistogram()
+
+        # Open session state
+        self.session_start = None
+        self.connected_since = None
+        self.last_time = None
+
+    def feed(self, t: float, event: str, entry: dict):
+        if event == START:
+            self.close_session(self.last_time)
+            self.sessions += 1
+            self.session_start = t
+            self.connected_since = t
+        elif self.session_start is None:
+            # Events from a session whose start fell outside the journal
+            self.session_start = t
+        if event == DETECT:
+            self.disconnects += 1
+            self._disconnect(t)
+        elif event == RECONNECT_START:
+            self.reconnects += 1
+        elif event == RECONNECT_FINISH:
+            if entry.get('ok'):
+                self.rejoined += 1
+                if entry.get('secs') is not None:
+                    self.latency.add(entry['secs'])
+                self._connect(t)
+        elif event == CONNECTED:
+            self._connect(t)
+        elif event == STOP:
+            self.close_session(t)
+        self.last_time = t
+
+    def _connect(self, t):
+        if self.connected_since is None:
+            self.connected_since = t
+
+    def _disconnect(self, t):
+        if self.connected_since is not None:
+            self.connected_time += max(0.0, t - self.connected_since)
+            self.connected_since = None
+
+    def close_session(self, t):
+        """End the open session at t (a crash leaves the last event as the end)"""
+        if self.session_start is None or t is None:
+            return
+        self._disconnect(t)
+        self.monitored += max(0.0, t - self.session_start)
+        self.session_start = None
+
+    def report(self) -> dict:
+        return {
+            'server': self.key,
+            'sessions': self.sessions,
+            'monitored_hours': self.monitored / 3600,
+            'uptime_pct': 100 * self.connected_time / self.monitored if self.monitored else None,
+            'disconnects': self.disconnects,
+            'mtbd_minutes': self.connected_time / self.disconnects / 60 if self.disconnects else None,
+            'reconnects': self.reconnects,
+            'rejoined': self.rejoined,
+            'rejoin_p50': self.latency.percentile(0.5),
+            'rejoin_p90': self.latency.percentile(0.9),
+            'rejoin_p99': self.latency.percentile(0.99),
+        }
+
+
+def analyze(lines, since=None) -> list:
+    """Stream journal lines and return one report per server"""
+    servers = {}
+    for line in lines:
+        try:
+            entry = json.loads(line)
+            t = float(entry['t'])
+            event = entry['ev']
+        except (ValueError, KeyError, TypeError):
+            continue  # Torn or foreign line
+        if since is not None and t < since:
+            continue
+        key = entry.get('srv', '-')
+        stats = servers.get(key)
+        if stats is None:
+            stats = servers[key] = ServerStats(key)
+        stats.feed(t, event, entry)
+
+    for stats in servers.values():
+        stats.close_session(stats.last_time)
+    return [stats.report() for stats in servers.values()]
+
+
+def _fmt(value, spec, suffix=''):
+    return '-' if value is None else f"{value:{spec}}{suffix}"
+
+
+def main():
+    """Command line analyzer"""
+    from settings import FIELDS, app_path, load_settings
+    try:
+        journal_file = load_settings().journal_file
+    except Exception:
+        journal_file = app_path(FIELDS['JOURNAL_FILE'].default)
+
+    parser = argparse.ArgumentParser(description="Summarize a Roblox Anti-Leave session journal")
+    parser.add_argument('journal', nargs='?', default=journal_file, help="journal file (default: %(default)s)")
+    parser.add_argument('--since', type=float, help="only count events after this Unix timestamp")
+    parser.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    try:
+        with open(args.journal, encoding='utf-8') as f:
+            reports = analyze(f, args.since)
+    except OSError as e:
+        print(f"Could not read journal: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    print(f"{'server':<34} {'hours':>7} {'uptime':>7} {'disc':>5} {'MTBD':>9} {'rejoin':>9} "
+          f"{'p50':>7} {'p90':>7} {'p99':>7}")
+    for r in reports:
+        print(f"{r['server'][:34]:<34} {r['monitored_hours']:>7.1f} {_fmt(r['uptime_pct'], '.1f', '%'):>7} "
+              f"{r['disconnects']:>5} {_fmt(r['mtbd_minutes'], '.1f', 'm'):>9} "
+              f"{r['rejoined']:>4}/{r['reconnects']:<4} "
+              f"{_fmt(r['rejoin_p50'], '.1f', 's'):>7} {_fmt(r['rejoin_p90'], '.1f', 's'):>7} "
+              f"{_fmt(r['rejoin_p99'], '.1f', 's'):>7}")
+
+
+if __name__ == "__main__":
+    main()
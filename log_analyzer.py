@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Log analyzer for Roblox Anti-Leave
+Streams roblox_antileave.log files through a memory map, pairs each detected
+disconnection with the reconnect that followed, and prints per-session
+timelines plus aggregate stats. Understands the messages of older releases.
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import argparse
+from collections import Counter
+
+from journal import LatencyHistogram
+
+# Message prefixes, current and older variants
+START_MESSAGES = ("Starting Roblox disconnection monitoring",)
+URL_PREFIXES = ("Monitoring private server: ", "Monitoring game: ")
+REASON_PREFIXES = (
+    ("Disconnection detected: ", 'closed'),
+    ("Roblox process not found - possible disconnection", 'process_missing'),
+    ("Disconnection message in Roblox window: ", 'popup'),
+    ("Disconnection detected in window: ", 'popup'),
+    ("Roblox disconnection popup: ", 'popup'),
+)
+EXIT_PREFIX = "Roblox process exited (PID"
+DETECTED = "Disconnection detected!"
+ATTEMPT_PREFIX = "Attempting reconnection (attempt "
+TARGET_PREFIX = "Reconnecting to: "
+PLAY_PREFIXES = ("Clicked play button", "Attempting alternative: pressing Enter key",
+                 "Could not find play button", "Play button image")
+COMPLETED = "Reconnection attempt completed"
+REJOINED_PREFIX = "Rejoined in "
+TIMEOUT_PREFIX = "Roblox did not come back within"
+FAILED_PREFIXES = ("Reconnection attempt failed", "Error during reconnection: ")
+MAX_PREFIX = "Max reconnection attempts"
+USER_STOP_MESSAGES = ("Monitoring stopped by user", "Monitoring cancelled")
+STOP_MESSAGE = "Monitoring stopped"
+
+
+def iter_lines(path):
+    """Yield raw lines of a file through a read-only memory map"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            pos = 0
+            end = len(mm)
+            while pos < end:
+                newline = mm.find(b'\n', pos)
+                if newline < 0:
+                    newline = end
+                yield mm[pos:newline]
+                pos = newline + 1
+
+
+def _number(text, cast):
+    try:
+        return cast(text)
+    except ValueError:
+        return None
+
+
+class LineParser:
+    """Splits '%(asctime)s - %(levelname)s - %(message)s' lines"""
+
+    def __init__(self):
+        self._day = None
+        self._day_start = 0.0
+        self._second = None
+        self._second_start = 0.0
+
+    def parse(self, raw: bytes):
+        """(timestamp, level, message), or None for continuation/foreign lines"""
+        if len(raw) < 30 or raw[23:26] != b' - ' or raw[4:5] != b'-':
+            return None
+        try:
+            # Consecutive lines mostly share a second, and nearly always a day
+            second = raw[:19]
+            if second != self._second:
+                day = raw[:10]
+                if day != self._day:
+                    self._day_start = time.mktime(time.strptime(day.decode('ascii'), '%Y-%m-%d'))
+                    self._day = day
+                self._second_start = (self._day_start + int(raw[11:13]) * 3600 +
+                                      int(raw[14:16]) * 60 + int(raw[17:19]))
+                self._second = second
+            timestamp = self._second_start + int(raw[20:23]) / 1000
+        except ValueError:
+            return None
+        rest = raw[26:].decode('utf-8', 'replace').rstrip('\r')
+        level, sep, message = rest.partition(' - ')
+        if not sep:
+            return None
+        return timestamp, level, message
+
+
+class Incident:
+    """One detected disconnection and the reconnect that answered it"""
+
+    def __init__(self, detected_at, reason):
+        self.detected_at = detected_at
+        self.reason = reason
+        self.detail = None
+        self.attempt = None
+        self.reconnect_at = None
+        self.target = None
+        self.play = None
+        self.finished_at = None
+        self.outcome = None
+        self.rejoin_seconds = None
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class Session:
+    """A monitoring run from 'Starting' to 'Monitoring stopped'"""
+
+    def __init__(self, number, started_at, url=None):
+        self.number = number
+        self.started_at = started_at
+        self.ended_at = None
+        self.url = url
+        self.end_reason = None
+        self.incidents = []
+
+    @property
+    def duration(self):
+        if self.started_at is None or self.ended_at is None:
+            return None
+        return self.ended_at - self.started_at
+
+    def to_dict(self) -> dict:
+        data = {key: value for key, value in vars(self).items() if key != 'incidents'}
+        data['incidents'] = [incident.to_dict() for incident in self.incidents]
+        return data
+
+
+class LogAnalyzer:
+    """Feeds parsed log lines through the session state machine"""
+
+    def __init__(self):
+        self.parser = LineParser()
+        self.session = None
+        self.pending_reason = None
+        self.pending_detail = None
+        self.last_time = None
+        self.sessions_seen = 0
+
+        # Aggregates, updated as each session closes
+        self.totals = Counter()
+        self.reasons = Counter()
+        self.outcomes = Counter()
+        self.end_reasons = Counter()
+        self.monitored = 0.0
+        self.response = LatencyHistogram()  # detection -> reconnect launched
+        self.reconnect = LatencyHistogram()  # reconnect launched -> finished
+
+    def feed_file(self, path):
+        """Yield sessions from one log file as they close"""
+        for raw in iter_lines(path):
+            parsed = self.parser.parse(raw)
+            if parsed is not None:
+                yield from self.feed(*parsed)
+
+    def feed(self, timestamp, level, message):
+        """Process one line; yields a session when one is complete"""
+        previous, self.last_time = self.last_time, timestamp
+
+        if message.startswith(START_MESSAGES):
+            if self.session is not None:
+                # No 'Monitoring stopped' line: the previous run crashed or was killed
+                yield self._close('interrupted', previous)
+            self.sessions_seen += 1
+            self.session = Session(self.sessions_seen, timestamp)
+            return
+
+        session = self._current()
+
+        if message.startswith(URL_PREFIXES):
+            session.url = message.split(': ', 1)[1]
+        elif message == DETECTED:
+            incident = Incident(timestamp, self.pending_reason or 'unknown')
+            incident.detail = self.pending_detail
+            session.incidents.append(incident)
+            self.pending_reason = self.pending_detail = None
+        elif message.startswith(ATTEMPT_PREFIX):
+            incident = session.incidents[-1] if session.incidents else None
+            if incident is None or incident.attempt is not None:
+                # Reconnect without a detection (manual test, or a tool run)
+                incident = Incident(None, 'manual')
+                session.incidents.append(incident)
+            incident.attempt = _number(message[len(ATTEMPT_PREFIX):].rstrip(')'), int)
+            incident.reconnect_at = timestamp
+        elif message.startswith(TARGET_PREFIX):
+            incident = self._open_incident(session)
+            if incident is not None:
+                incident.target = message[len(TARGET_PREFIX):]
+        elif message.startswith(REJOINED_PREFIX):
+            self._finish(session, timestamp, 'rejoined',
+                         _number(message[len(REJOINED_PREFIX):].rstrip('s'), float))
+        elif message.startswith(TIMEOUT_PREFIX):
+            self._finish(session, timestamp, 'timeout')
+        elif message == COMPLETED:
+            self._finish(session, timestamp, 'completed')
+        elif message.startswith(FAILED_PREFIXES):
+            self._finish(session, timestamp, 'failed')
+        elif message.startswith(PLAY_PREFIXES):
+            incident = self._open_incident(session)
+            if incident is not None:
+                incident.play = message
+        elif message.startswith(MAX_PREFIX):
+            session.end_reason = 'gave_up'
+        elif message.startswith(USER_STOP_MESSAGES):
+            session.end_reason = session.end_reason or 'user'
+        elif message == STOP_MESSAGE:
+            if session.started_at is not None:
+                yield self._close('stopped', timestamp)
+        elif message.startswith(EXIT_PREFIX):
+            self.pending_reason = 'process_exited'
+        else:
+            for prefix, reason in REASON_PREFIXES:
+                if message.startswith(prefix):
+                    # An exit event is the more specific cause of a 'closed' detection
+                    if not (reason == 'closed' and self.pending_reason == 'process_exited'):
+                        self.pending_reason = reason
+                    self.pending_detail = message[len(prefix):] or None
+                    break
+
+    def finish(self):
+        """Flush the session still open at the end of the input"""
+        if self.session is not None:
+            yield self._close('truncated', self.last_time)
+
+    def _current(self) -> Session:
+        # Lines logged outside any monitoring run collect in an unnumbered session
+        if self.session is None:
+            self.session = Session(0, None)
+        return self.session
+
+    @staticmethod
+    def _open_incident(session):
+        if session.incidents and session.incidents[-1].outcome is None:
+            return session.incidents[-1]
+        return None
+
+    def _finish(self, session, timestamp, outcome, rejoin_seconds=None):
+        incident = self._open_incident(session)
+        if incident is None:
+            return
+        incident.finished_at = timestamp
+        incident.outcome = outcome
+        incident.rejoin_seconds = rejoin_seconds
+
+    def _close(self, end_reason, ended_at) -> Session:
+        session = self.session
+        self.session = None
+        self.pending_reason = self.pending_detail = None
+        session.ended_at = ended_at if ended_at is not None else self.last_time
+        session.end_reason = session.end_reason or end_reason
+
+        if session.started_at is not None:
+            self.totals['sessions'] += 1
+            self.monitored += session.duration or 0.0
+            self.end_reasons[session.end_reason] += 1
+        for incident in session.incidents:
+            if incident.detected_at is not None:
+                self.totals['detections'] += 1
+                self.reasons[incident.reason] += 1
+            if incident.reconnect_at is None:
+                self.outcomes['no_reconnect'] += 1
+                continue
+            self.totals['reconnects'] += 1
+            self.outcomes[incident.outcome or 'unfinished'] += 1
+            if incident.detected_at is not None:
+                self.response.add(incident.reconnect_at - incident.detected_at)
+            if incident.finished_at is not None:
+                self.reconnect.add(incident.rejoin_seconds if incident.rejoin_seconds is not None
+                                   else incident.finished_at - incident.reconnect_at)
+        return session
+
+    def summary(self) -> dict:
+        return {
+            'sessions': self.totals['sessions'],
+            'monitored_hours': self.monitored / 3600,
+            'detections': self.totals['detections'],
+            'reconnects': self.totals['reconnects'],
+            'mtbd_minutes': (self.monitored / self.totals['detections'] / 60
+                             if self.totals['detections'] else None),
+            'detection_reasons': dict(self.reasons),
+            'reconnect_outcomes': dict(self.outcomes),
+            'session_endings': dict(self.end_reasons),
+            'response_p50': self.response.percentile(0.5),
+            'response_p99': self.response.percentile(0.99),
+            'reconnect_p50': self.reconnect.percentile(0.5),
+            'reconnect_p90': self.reconnect.percentile(0.9),
+            'reconnect_p99': self.reconnect.percentile(0.99),
+        }
+
+
+def _clock(timestamp, with_date=False):
+    if timestamp is None:
+        return '?'
+    text = time.strftime('%Y-%m-%d %H:%M:%S' if with_date else '%H:%M:%S', time.localtime(timestamp))
+    return text if with_date else f"{text}.{int(round(timestamp * 1000)) % 1000:03d}"
+
+
+def _span(seconds):
+    if seconds is None:
+        return '?'
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+def print_session(session: Session):
+    """Human-readable timeline of one session"""
+    if session.number:
+        print(f"Session {session.number}: {_clock(session.started_at, True)} -> "
+              f"{_clock(session.ended_at, True)} ({_span(session.duration)}, {session.end_reason})")
+    else:
+        print("Outside monitoring:")
+    if session.url:
+        print(f"  server: {session.url}")
+    for incident in session.incidents:
+        parts = [f"  {_clock(incident.detected_at or incident.reconnect_at)}"]
+        if incident.detected_at is not None:
+            detail = f": {incident.detail}" if incident.detail else ''
+            parts.append(f"disconnected ({incident.reason}{detail})")
+        if incident.reconnect_at is not None:
+            manual = "manual " if incident.detected_at is None else ""
+            parts.append(f"{manual}reconnect #{incident.attempt}")
+            if incident.finished_at is not None:
+                took = incident.rejoin_seconds
+                if took is None:
+                    took = incident.finished_at - incident.reconnect_at
+                parts.append(f"{incident.outcome} after {took:.1f}s")
+            else:
+                parts.append("unfinished")
+        print(' -> '.join(parts))
+
+
+def _fmt(value, spec='.1f', suffix='s'):
+    return '-' if value is None else f"{value:{spec}}{suffix}"
+
+
+def print_summary(stats: dict):
+    print("Summary")
+    print(f"  sessions: {stats['sessions']} ({stats['monitored_hours']:.1f}h monitored)")
+    print(f"  detections: {stats['detections']}  reconnects: {stats['reconnects']}  "
+          f"mean time between disconnects: {_fmt(stats['mtbd_minutes'], suffix='m')}")
+    for label, key in (("detections by reason", 'detection_reasons'),
+                       ("reconnect outcomes", 'reconnect_outcomes'),
+                       ("session endings", 'session_endings')):
+        counts = ', '.join(f"{name} {count}" for name, count in sorted(stats[key].items()))
+        print(f"  {label}: {counts or '-'}")
+    print(f"  detection -> reconnect: p50 {_fmt(stats['response_p50'], '.3f')}, "
+          f"p99 {_fmt(stats['response_p99'], '.3f')}")
+    print(f"  reconnect duration: p50 {_fmt(stats['reconnect_p50'])}, p90 {_fmt(stats['reconnect_p90'])}, "
+          f"p99 {_fmt(stats['reconnect_p99'])}")
+
+
+def main():
+    """Command line analyzer"""
+    try:
+        from config import LOG_FILE
+    except ImportError:
+        LOG_FILE = "roblox_antileave.log"
+
+    parser = argparse.ArgumentParser(description="Timelines and stats from Roblox Anti-Leave log files")
+    parser.add_argument('logs', nargs='*', default=[LOG_FILE],
+                        help="log files, oldest first (default: %(default)s)")
+    parser.add_argument('--summary', action='store_true', help="only print the aggregate stats")
+    parser.add_argument('--json', action='store_true', help="print JSON lines instead of text")
+    args = parser.parse_args()
+
+    analyzer = LogAnalyzer()
+
+    def sessions():
+        for path in args.logs:
+            yield from analyzer.feed_file(path)
+        yield from analyzer.finish()
+
+    try:
+        for session in sessions():
+            if args.summary:
+                continue
+            if args.json:
+                print(json.dumps(session.to_dict()))
+            else:
+                print_session(session)
+    except OSError as e:
+        print(f"Could not read log: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps({'summary': analyzer.summary()}))
+    else:
+        print_summary(analyzer.summary())
+
+
+if __name__ == "__main__":
+    main()
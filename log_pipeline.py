@@ -0,0 +1,229 @@
+"""
+Logging pipeline for Roblox Anti-Leave
+Log calls only enqueue the record; a background writer batches flushes to
+the console, GUI and a size/time-rotated log file with a hard cap on disk use.
+"""
+
+import os
+import glob
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_STOP = object()
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RotatingFileSink(logging.Handler):
+    """Buffered log file rotated by size or age, keeping total disk use under a cap"""
+
+    def __init__(self, filename, max_bytes, rotate_interval, max_total_bytes):
+        super().__init__()
+        self.filename = os.path.abspath(filename)
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.max_total_bytes = max(max_total_bytes, max_bytes)
+        self.rotations = 0
+        self.stream = None
+        self._open()
+        self._enforce_cap()
+
+    def _open(self):
+        self.stream = open(self.filename, 'a', encoding='utf-8')
+        self.size = self.stream.tell()
+        self.opened_at = time.time()
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + '\n'
+            if self._should_rotate(len(line)):
+                self.rotate()
+            self.stream.write(line)
+            self.size += len(line)
+        except Exception:
+            self.handleError(record)
+
+    def _should_rotate(self, incoming):
+        if not self.size:
+            return False
+        if self.max_bytes and self.size + incoming > self.max_bytes:
+            return True
+        return bool(self.rotate_interval and time.time() - self.opened_at >= self.rotate_interval)
+
+    def rotate(self):
+        """Move the current file aside and start a new one"""
+        self.stream.close()
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        target = f"{self.filename}.{stamp}"
+        suffix = 1
+        while os.path.exists(target):
+            target = f"{self.filename}.{stamp}-{suffix}"
+            suffix += 1
+        os.replace(self.filename, target)
+        self.rotations += 1
+        self._open()
+        self._enforce_cap()
+
+    def backups(self):
+        """Rotated files, oldest first"""
+        return sorted(glob.glob(glob.escape(self.filename) + '.*'), key=os.path.getmtime)
+
+    def _enforce_cap(self):
+        # Leave room for the current file to grow to max_bytes
+        budget = self.max_total_bytes - max(self.max_bytes, self.size)
+        backups = self.backups()
+        sizes = {path: os.path.getsize(path) for path in backups}
+        total = sum(sizes.values())
+        for path in backups:
+            if total <= budget:
+                break
+            try:
+                os.remove(path)
+                total -= sizes[path]
+            except OSError:
+                pass
+
+    def flush(self):
+        if self.stream:
+            self.stream.flush()
+
+    def close(self):
+        if self.stream:
+            self.stream.flush()
+            self.stream.close()
+            self.stream = None
+        super().close()
+
+
+class LogPipeline:
+    """Owns the log queue, its writer thread and the sinks it feeds"""
+
+    def __init__(self, level, queue_size=10000, flush_interval=1.0, batch_size=256):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handler = BoundedQueueHandler(self.queue)
+        self.handler.setLevel(level)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.sinks = []
+        self.file_sink = None
+        self.console_sink = None
+        self.written = 0
+        self._lock = threading.Lock()
+        self.writer = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.writer.start()
+
+    def add_sink(self, sink: logging.Handler):
+        if sink.formatter is None:
+            sink.setFormatter(logging.Formatter(LOG_FORMAT))
+        with self._lock:
+            self.sinks = self.sinks + [sink]
+
+    def remove_sink(self, sink: logging.Handler):
+        with self._lock:
+            self.sinks = [s for s in self.sinks if s is not sink]
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush()
+                last_flush = time.monotonic()
+                continue
+
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            urgent = False
+            sinks = self.sinks
+            for record in batch:
+                if record is _STOP:
+                    stop = True
+                    continue
+                urgent = urgent or record.levelno >= logging.ERROR
+                for sink in sinks:
+                    if record.levelno >= sink.level:
+                        sink.handle(record)
+                self.written += 1
+
+            # One flush per batch, and only once per interval unless something went wrong
+            if stop or urgent or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush()
+                last_flush = time.monotonic()
+            if stop:
+                return
+
+    def _flush(self):
+        for sink in self.sinks:
+            try:
+                sink.flush()
+            except Exception:
+                pass
+
+    def close(self, timeout=2.0):
+        """Write out everything still queued"""
+        if not self.writer.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.writer.join(timeout)
+        for sink in self.sinks:
+            sink.close()
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self.queue.qsize(),
+            'dropped': self.handler.dropped,
+            'written': self.written,
+            'rotations': self.file_sink.rotations if self.file_sink else 0,
+        }
+
+
+def setup_logging(level="INFO", log_file=None, console=True, max_bytes=5 * 1024 * 1024,
+                  rotate_interval=0, max_total_bytes=50 * 1024 * 1024, queue_size=10000,
+                  flush_interval=1.0) -> LogPipeline:
+    """Route the root logger through a LogPipeline and return it"""
+    level = getattr(logging, str(level).upper(), logging.INFO)
+    pipeline = LogPipeline(level, queue_size, flush_interval)
+
+    if console:
+        pipeline.console_sink = logging.StreamHandler()
+        pipeline.add_sink(pipeline.console_sink)
+    if log_file:
+        pipeline.file_sink = RotatingFileSink(log_file, max_bytes, rotate_interval, max_total_bytes)
+        pipeline.add_sink(pipeline.file_sink)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(pipeline.handler)
+    root.setLevel(level)
+
+    atexit.register(pipeline.close)
+    return pipeline
@@ -5,193 +5,366 @@ Automatically detects when you've been disconnected from a Roblox game
 and attempts to reconnect you.
 """
 
-import time
 import logging
-import subprocess
-import webbrowser
+import importlib.util
+from collections import deque, namedtuple
 from typing import List, Optional
-import re
 import sys
 
-# Import configuration
+from backends import (PyGetWindowBackend, X11WindowBackend, PsutilProcessBackend, ProcfsProcessBackend,
+                      PyperclipClipboard, BrowserLauncher, PlyerNotifier, SystemClock)
+from window_tracker import WindowTracker, WindowSnapshot
+from process_tracker import ProcessTracker
+from exit_watcher import ProcessExitWatcher
+from probe_runner import ProbeRunner
+from scheduler import AdaptiveScheduler
+from notifications import NotificationDispatcher
+from clipboard_watcher import ClipboardWatcher
+from server_pool import ServerPool, parse_server_url
+from connection_state import ConnectionStateMachine, CONNECTED as STATE_CONNECTED, \
+    DISCONNECTED as STATE_DISCONNECTED, SUSPECT, EXITED, NO_PROCESS, NO_WINDOW, POPUP
+from log_pipeline import setup_logging
+from settings import Settings, load_settings, SettingsWatcher, SettingsError
+from journal import SessionJournal, START, DETECT, RECONNECT_START, RECONNECT_FINISH, CONNECTED
+from metrics import (PROBE_SECONDS, TICK_SECONDS, DETECTIONS, SUPPRESSIONS, RECONNECTS, TRACKED_INSTANCES,
+                     start_server)
+
+# Validated settings from config.py; the values are also module-level names, as `from config import *` gave.
+# An invalid config.py leaves the defaults here, and current_settings() raises its SettingsError
 try:
-    from config import *
-except ImportError:
+    SETTINGS, SETTINGS_ERROR = load_settings(), None
+except SettingsError as e:
+    SETTINGS, SETTINGS_ERROR = Settings(), e
+if SETTINGS.path is None and SETTINGS_ERROR is None:
     print("Warning: config.py not found, using default settings")
-    # Default settings if config.py is missing
-    CHECK_INTERVAL = 5
-    MAX_RECONNECT_ATTEMPTS = 3
-    RECONNECT_DELAY = 10
-    DISCONNECTION_COOLDOWN = 30
-    DISCONNECT_INDICATORS = ["disconnected", "connection lost", "unable to connect", "kicked", "error", "reconnect", "lost connection"]
-    ROBLOX_PATTERNS = [r"Roblox", r".*- Roblox", r"Roblox Player"]
-    ROBLOX_PROCESS_NAMES = ["robloxplayerbeta.exe", "roblox.exe", "robloxplayer.exe"]
-    ENABLE_NOTIFICATIONS = True
-    NOTIFICATION_TIMEOUT = 10
-    LOG_LEVEL = "INFO"
-    LOG_FILE = "roblox_antileave.log"
-    ENABLE_CONSOLE_LOGGING = True
-    BROWSER_WAIT_TIME = 3
-    PLAY_BUTTON_IMAGE = "play_button.png"
-    PLAY_BUTTON_CONFIDENCE = 0.8
-    ENABLE_CLIPBOARD_DETECTION = True
-    ENABLE_PROCESS_MONITORING = True
-    ENABLE_WINDOW_MONITORING = True
+globals().update(SETTINGS.as_dict())
 
-try:
-    import pygetwindow as gw
-    import psutil
-    from plyer import notification
-    if ENABLE_CLIPBOARD_DETECTION:
-        import pyperclip
-except ImportError as e:
-    print(f"Missing required library: {e}")
-    print("Please install required packages:")
-    print("pip install -r requirements.txt")
-    sys.exit(1)
-
-# Configure logging
-log_handlers = []
-if ENABLE_CONSOLE_LOGGING:
-    log_handlers.append(logging.StreamHandler())
-log_handlers.append(logging.FileHandler(LOG_FILE))
-
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL.upper()),
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=log_handlers
-)
 logger = logging.getLogger(__name__)
 
+
+def current_settings() -> Settings:
+    """config.py's settings; raises SettingsError if it failed validation"""
+    if SETTINGS_ERROR is not None:
+        raise SETTINGS_ERROR
+    return SETTINGS
+
+
+def configure_logging(console: bool = ENABLE_CONSOLE_LOGGING):
+    """Route logging through the background pipeline (entry points only, never at import)"""
+    return setup_logging(LOG_LEVEL, LOG_FILE, console, LOG_MAX_BYTES, LOG_ROTATE_INTERVAL,
+                         LOG_MAX_TOTAL_BYTES, LOG_QUEUE_SIZE, LOG_FLUSH_INTERVAL)
+
+
+def use_procfs(settings=SETTINGS) -> bool:
+    """Whether processes are read straight from /proc instead of through psutil"""
+    if settings.PROCESS_BACKEND == 'auto':
+        return ProcfsProcessBackend.available()
+    return settings.PROCESS_BACKEND == 'procfs'
+
+
+def use_x11(settings=SETTINGS) -> bool:
+    """Whether windows are tracked from X11 events (opt-in) instead of listed through pygetwindow"""
+    return settings.WINDOW_BACKEND == 'x11'
+
+
+def missing_dependencies() -> List[str]:
+    """Libraries needed by the enabled features that are not installed"""
+    required = []
+    if ENABLE_WINDOW_MONITORING:
+        required.append('Xlib' if use_x11() else 'pygetwindow')
+    if ENABLE_PROCESS_MONITORING and not use_procfs():
+        required.append('psutil')
+    if ENABLE_CLIPBOARD_DETECTION:
+        required.append('pyperclip')
+    if ENABLE_NOTIFICATIONS:
+        required.append('plyer')
+    return [name for name in required if importlib.util.find_spec(name) is None]
+
+# One reconnect attempt and how long the client took to come back
+RejoinAttempt = namedtuple('RejoinAttempt', ['attempt', 'url', 'started', 'time_to_rejoin', 'ready'])
+
 class RobloxAntiLeave:
-    def __init__(self):
+    def __init__(self, window_backend=None, process_backend=None, clipboard=None,
+                 launcher=None, notifier=None, clock=None, settings=None):
+        # Settings passed in are used as given; the shared ones follow edits to config.py
+        hot_reload = settings is None
+        self.settings = settings = settings or current_settings()
+        # Runs driven by injected fakes must not write their sessions into the real journal
+        injected = any(arg is not None for arg in (window_backend, process_backend, clipboard, launcher, notifier,
+                                                    clock))
+
+        # Probe backends (pass fakes from backends.py to run without a desktop)
+        if window_backend is None and settings.ENABLE_WINDOW_MONITORING:
+            window_backend = X11WindowBackend() if use_x11(settings) else PyGetWindowBackend()
+        self.window_backend = window_backend
+        if process_backend is None and settings.ENABLE_PROCESS_MONITORING:
+            process_backend = ProcfsProcessBackend() if use_procfs(settings) else PsutilProcessBackend()
+        self.process_backend = process_backend
+        self.clipboard = clipboard or (PyperclipClipboard() if settings.ENABLE_CLIPBOARD_DETECTION else None)
+        self.launcher = launcher or BrowserLauncher()
+        self.notifier = notifier or (PlyerNotifier() if settings.ENABLE_NOTIFICATIONS else None)
+        self.clock = clock or SystemClock()
+
+        # Optionally record what the probes see, for offline replay with probe_trace.py
+        self.trace_recorder = None
+        if settings.TRACE_FILE:
+            from probe_trace import TraceRecorder, RecordingWindowBackend, RecordingProcessBackend
+            self.trace_recorder = TraceRecorder(settings.TRACE_FILE, self.clock, settings.ROBLOX_PROCESS_NAMES)
+            if self.window_backend:
+                self.window_backend = RecordingWindowBackend(self.window_backend, self.trace_recorder)
+            if self.process_backend:
+                self.process_backend = RecordingProcessBackend(self.process_backend, self.trace_recorder)
+
+        # Notifications go out on a worker thread so the monitor never waits on them
+        self.notifications = NotificationDispatcher(self.notifier, self.clock, settings.NOTIFICATION_TIMEOUT,
+                                                    settings.NOTIFICATION_QUEUE_SIZE,
+                                                    settings.NOTIFICATION_COALESCE_WINDOW,
+                                                    settings.NOTIFICATION_OVERFLOW)
+
         self.last_game_url = None
         self.monitoring = False
         self.reconnect_attempts = 0
-        self.max_reconnect_attempts = MAX_RECONNECT_ATTEMPTS
-        self.check_interval = CHECK_INTERVAL
-        self.reconnect_delay = RECONNECT_DELAY
+        self.max_reconnect_attempts = settings.MAX_RECONNECT_ATTEMPTS
+        self.check_interval = settings.CHECK_INTERVAL
+        self.rejoin_timeout = settings.REJOIN_TIMEOUT
+        self.readiness_poll_interval = settings.READINESS_POLL_INTERVAL
+        self.engine = None
+
+        # Copied private server URLs are picked up in the background, off the reconnect path
+        self.clipboard_watcher = None
+        if settings.ENABLE_CLIPBOARD_DETECTION and settings.CLIPBOARD_WATCHER and self.clipboard is not None:
+            self.clipboard_watcher = ClipboardWatcher(self.clipboard, self.is_valid_roblox_url,
+                                                      settings.CLIPBOARD_POLL_INTERVAL,
+                                                      settings.CLIPBOARD_MAX_POLL_INTERVAL)
+
+        # Structured record of state changes for offline uptime analysis
+        self.journal = SessionJournal(settings.journal_file if settings.ENABLE_JOURNAL and not injected else None,
+                                      self.clock)
 
         # Use configuration settings
-        self.disconnect_indicators = DISCONNECT_INDICATORS
-        self.roblox_patterns = ROBLOX_PATTERNS
-        self.roblox_process_names = ROBLOX_PROCESS_NAMES
-
-        # State tracking to prevent spam detection
-        self.last_disconnection_time = 0
-        self.disconnection_cooldown = DISCONNECTION_COOLDOWN
-        self.was_connected = False
+        self.disconnect_indicators = settings.DISCONNECT_INDICATORS
+        self.roblox_patterns = settings.ROBLOX_PATTERNS
+        self.roblox_process_names = settings.ROBLOX_PROCESS_NAMES
+
+        # Disconnects need N-of-M confirming probes, and are ignored for a cooldown after a reconnect
+        self.disconnection_cooldown = settings.DISCONNECTION_COOLDOWN
+        self.connection = ConnectionStateMachine(self.clock, settings.DISCONNECT_CONFIRMATIONS,
+                                                 settings.CONFIRMATION_WINDOW, settings.SIGNAL_WEIGHTS,
+                                                 settings.SIGNAL_THRESHOLD, self.disconnection_cooldown,
+                                                 self.on_connection_state)
         self.consecutive_disconnects = 0
 
-    def get_roblox_windows(self) -> List:
-        """Get all Roblox-related windows"""
-        roblox_windows = []
+        # Readiness tracking for the current reconnect attempt
+        self.launch_time = None
+        self.launch_url = None
+        self.launch_pids = set()
+        self.launch_server = None
+        self.rejoin_failed = False
+        self.rejoin_history = deque(maxlen=100)
+
+        # Private servers to reconnect to, scored by how well rejoining them goes
+        self.server_pool = ServerPool(settings.SERVER_POOL, settings.SERVER_SCORE_WINDOW,
+                                      settings.SERVER_FAILOVER_AFTER, self.rejoin_timeout)
+
+        # Precompiled title matcher (built once per settings load) and the classified window index built on it
+        self.title_classifier = settings.title_classifier
+        self.window_tracker = WindowTracker(self.window_backend, self.title_classifier.classify)
+
+        # Roblox PIDs pinned between ticks
+        self.process_tracker = ProcessTracker(self.process_backend, settings.process_names)
+        self.exit_watcher = ProcessExitWatcher(self.process_backend, self.clock)
+        self.process_exited = False
+
+        # Worker threads for CONCURRENT_PROBES, started on first use
+        self.probe_runner = ProbeRunner()
+
+        # Wait between checks adapts to how steady the connection is
+        self.scheduler = AdaptiveScheduler(self.clock, *self.polling_bounds(settings))
+
+        if settings.unknown:
+            logger.warning(f"Unknown settings in {settings.path} ignored: {', '.join(settings.unknown)}")
+
+        # Edits to config.py are picked up between ticks
+        self.settings_watcher = None
+        if hot_reload and settings.CONFIG_HOT_RELOAD:
+            self.settings_watcher = SettingsWatcher(settings, self.clock, settings.CONFIG_RELOAD_INTERVAL)
+
+    @staticmethod
+    def polling_bounds(settings) -> tuple:
+        """Scheduler arguments for the settings: adaptive, or fixed at CHECK_INTERVAL"""
+        if settings.ADAPTIVE_POLLING:
+            return (settings.CHECK_INTERVAL, settings.MIN_CHECK_INTERVAL, settings.MAX_CHECK_INTERVAL,
+                    settings.POLL_BACKOFF, settings.POLL_JITTER, settings.FAST_POLL_DURATION)
+        return (settings.CHECK_INTERVAL, settings.CHECK_INTERVAL, settings.CHECK_INTERVAL, 1.0, settings.POLL_JITTER)
+
+    def reload_settings(self):
+        """Switch to config.py's new contents if it changed since the last look"""
+        if self.settings_watcher is None:
+            return
+        settings = self.settings_watcher.poll()
+        if settings is None:
+            return
+        changed = settings.diff(self.settings)
+        self.apply_settings(settings)
+        logger.info(f"Settings reloaded: {', '.join(changed) if changed else 'no changes'}")
+
+    def apply_settings(self, settings):
+        """Point the running monitor at new settings, keeping its state"""
+        previous, self.settings = self.settings, settings
+        self.max_reconnect_attempts = settings.MAX_RECONNECT_ATTEMPTS
+        self.check_interval = settings.CHECK_INTERVAL
+        self.rejoin_timeout = settings.REJOIN_TIMEOUT
+        self.readiness_poll_interval = settings.READINESS_POLL_INTERVAL
+        self.disconnection_cooldown = settings.DISCONNECTION_COOLDOWN
+        self.connection.configure(settings.DISCONNECT_CONFIRMATIONS, settings.CONFIRMATION_WINDOW,
+                                  settings.SIGNAL_WEIGHTS, settings.SIGNAL_THRESHOLD, self.disconnection_cooldown)
+        self.scheduler.configure(*self.polling_bounds(settings))
+        self.server_pool.configure(settings.SERVER_SCORE_WINDOW, settings.SERVER_FAILOVER_AFTER, self.rejoin_timeout)
+        for url in settings.SERVER_POOL:
+            self.server_pool.add(url)
+
+        if (settings.ROBLOX_PATTERNS, settings.DISCONNECT_INDICATORS, settings.TITLE_CACHE_SIZE) != \
+                (previous.ROBLOX_PATTERNS, previous.DISCONNECT_INDICATORS, previous.TITLE_CACHE_SIZE):
+            self.disconnect_indicators = settings.DISCONNECT_INDICATORS
+            self.roblox_patterns = settings.ROBLOX_PATTERNS
+            self.title_classifier = settings.title_classifier
+            # Every window gets classified again with the new patterns
+            self.window_tracker.classify = self.title_classifier.classify
+            self.window_tracker.reset()
+        if settings.process_names != previous.process_names:
+            self.roblox_process_names = settings.ROBLOX_PROCESS_NAMES
+            self.process_tracker.process_names = list(settings.process_names)
+            self.process_tracker.expect_new_instance()
+
+    def get_window_snapshot(self) -> WindowSnapshot:
+        """Take this tick's window snapshot"""
         try:
-            all_windows = gw.getAllWindows()
-            for window in all_windows:
-                if window.title and any(re.search(pattern, window.title, re.IGNORECASE)
-                                      for pattern in self.roblox_patterns):
-                    roblox_windows.append(window)
+            with PROBE_SECONDS.time(probe='windows'):
+                return self.window_tracker.snapshot()
         except Exception as e:
             logger.error(f"Error getting Roblox windows: {e}")
-        return roblox_windows
+            return WindowSnapshot([], [], 0)
+
+    def get_roblox_windows(self) -> List:
+        """Get all Roblox-related windows"""
+        return self.get_window_snapshot().roblox_windows
 
     def is_roblox_running(self) -> bool:
         """Check if Roblox process is running"""
-        if not ENABLE_PROCESS_MONITORING:
+        if not self.settings.ENABLE_PROCESS_MONITORING:
             return True  # Skip process monitoring if disabled
 
         try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                proc_name = proc.info['name'].lower()
-                if any(roblox_name.lower() in proc_name for roblox_name in self.roblox_process_names):
-                    return True
+            with PROBE_SECONDS.time(probe='processes'):
+                running = self.process_tracker.is_running()
+            TRACKED_INSTANCES.set(len(self.process_tracker.tracked))
+            return running
         except Exception as e:
             logger.error(f"Error checking Roblox process: {e}")
+            self.process_tracker.expect_new_instance()
         return False
 
     def detect_disconnection(self) -> bool:
         """Detect if user has been disconnected from Roblox"""
         try:
-            import time
-            current_time = time.time()
+            self.reload_settings()
 
-            # Cooldown period to prevent spam detection
-            if current_time - self.last_disconnection_time < self.disconnection_cooldown:
+            # Cooldown period to prevent spam detection (a tracked client exiting bypasses it)
+            process_exited = self.process_exited
+            self.process_exited = False
+            if not process_exited and self.connection.cooling_down():
                 return False
 
-            # Check if Roblox is running first
-            roblox_running = True
-            if ENABLE_PROCESS_MONITORING:
-                roblox_running = self.is_roblox_running()
-
-            # Check for Roblox windows
-            roblox_windows = []
-            if ENABLE_WINDOW_MONITORING:
-                roblox_windows = self.get_roblox_windows()
-
-            # Determine current connection state
-            currently_connected = roblox_running and (not ENABLE_WINDOW_MONITORING or len(roblox_windows) > 0)
-
-            # If we were connected and now we're not, that's a disconnection
-            if self.was_connected and not currently_connected:
-                logger.info("Disconnection detected: Roblox was running but now stopped/closed")
-                self.last_disconnection_time = current_time
-                self.was_connected = False
-                self.consecutive_disconnects += 1
-                return True
-
-            # Update connection state
-            if currently_connected:
-                self.was_connected = True
-                self.consecutive_disconnects = 0
-
-            # Only check for specific disconnection popups if we think we're connected
-            if currently_connected and ENABLE_WINDOW_MONITORING:
-                # Check Roblox windows for disconnection messages
-                for window in roblox_windows:
-                    title = window.title.lower()
-                    # Only check for very specific disconnection indicators
-                    specific_indicators = ['disconnected', 'kicked', 'connection lost', 'session expired']
-                    if any(indicator in title for indicator in specific_indicators):
-                        logger.info(f"Disconnection message in Roblox window: {window.title}")
-                        self.last_disconnection_time = current_time
-                        self.was_connected = False
-                        self.consecutive_disconnects += 1
-                        return True
-
-                # Check for Roblox-specific popup windows (very conservative)
-                try:
-                    all_windows = gw.getAllWindows()
-                    for window in all_windows:
-                        if window.title and 'roblox' in window.title.lower():
-                            title = window.title.lower()
-                            # Only check for very specific and strong disconnection indicators
-                            if ('disconnected' in title or
-                                ('kicked' in title and 'afk' in title) or
-                                'session expired' in title):
-                                logger.info(f"Roblox disconnection popup: {window.title}")
-                                self.last_disconnection_time = current_time
-                                self.was_connected = False
-                                self.consecutive_disconnects += 1
-                                return True
-                except Exception as e:
-                    logger.debug(f"Error checking popup windows: {e}")
-
-            return False
+            with TICK_SECONDS.time():
+                return self.check_connection(process_exited)
 
         except Exception as e:
             logger.error(f"Error detecting disconnection: {e}")
             return False
 
+    def check_connection(self, process_exited: bool = False) -> bool:
+        """Probe once and feed the disconnect signals to the state machine"""
+        signals = set()
+        if process_exited:
+            signals.add(EXITED)
+
+        running, snapshot, complete = self.run_probes()
+        if running is False:
+            signals.add(NO_PROCESS)
+        if snapshot is not None:
+            if not snapshot.roblox_windows:
+                signals.add(NO_WINDOW)
+            elif snapshot.disconnect_windows:
+                signals.add(POPUP)
+
+        # Anything moving on the Roblox side (or an unconfirmed signal) keeps the poll rate up
+        self.scheduler.observe(bool(signals) or self.connection.state == SUSPECT or
+                               bool(snapshot and snapshot.roblox_changed))
+
+        if not signals and complete:
+            if self.rejoin_failed and self.launch_time is None:
+                self.journal.record(CONNECTED, self.server_url)
+            self.rejoin_failed = False
+            self.consecutive_disconnects = 0
+
+        if not self.connection.observe(signals):
+            return False
+
+        if self.connection.reason == POPUP:
+            window = snapshot.disconnect_windows[0] if snapshot and snapshot.disconnect_windows else None
+            title = window.title if window else ''
+            indicator = self.title_classifier.matched_indicator(title) if window else None
+            logger.info(f"Disconnection message in Roblox window: {title} ({indicator})")
+            DETECTIONS.inc(reason='popup')
+            self.journal.record(DETECT, self.server_url, reason='popup', indicator=indicator)
+        else:
+            logger.info("Disconnection detected: Roblox was running but now stopped/closed")
+            DETECTIONS.inc(reason='closed')
+            self.journal.record(DETECT, self.server_url, reason='closed',
+                                exited=(EXITED in self.connection.signals) or None)
+        self.consecutive_disconnects += 1
+        return True
+
+    def run_probes(self) -> tuple:
+        """Process and window probes for one tick: (running, snapshot, complete)
+
+        A probe that is disabled, or timed out in concurrent mode, gives None.
+        """
+        probes = {}
+        if self.settings.ENABLE_PROCESS_MONITORING:
+            probes['processes'] = self.is_roblox_running
+        if self.settings.ENABLE_WINDOW_MONITORING:
+            probes['windows'] = self.get_window_snapshot  # one enumeration per tick, popups included
+
+        if self.settings.CONCURRENT_PROBES and len(probes) > 1:
+            results = self.probe_runner.run(probes, self.settings.PROBE_TIMEOUT)
+        else:
+            results = {name: probe() for name, probe in probes.items()}
+        return results.get('processes'), results.get('windows'), len(results) == len(probes)
+
+    def on_connection_state(self, previous: str, state: str, confirmed: bool = True):
+        """Log state machine transitions worth knowing about"""
+        if state in (SUSPECT, STATE_DISCONNECTED) and self.clipboard_watcher:
+            # A reconnect may need the copied URL soon; have the watcher catch up off this thread
+            self.clipboard_watcher.refresh()
+        if state == SUSPECT:
+            logger.info(f"Possible disconnection ({', '.join(sorted(self.connection.signals))}), "
+                        f"waiting for {self.connection.confirmations} of {self.connection.window} probes to confirm")
+        elif state == STATE_CONNECTED and not confirmed:
+            logger.info("Disconnect signals were not confirmed, still connected")
+            SUPPRESSIONS.inc(reason='unconfirmed')
+
     def get_last_game_url(self) -> Optional[str]:
         """Try to get the last game URL from browser history or clipboard"""
         # This is a simplified approach - in practice, you might want to
         # store the game URL when the script starts or use browser automation
-        if ENABLE_CLIPBOARD_DETECTION:
+        if self.clipboard_watcher and self.clipboard_watcher.running:
+            return self.clipboard_watcher.current_url()
+
+        if self.settings.ENABLE_CLIPBOARD_DETECTION:
             try:
                 # Try to get from clipboard (user might have copied the game URL)
-                clipboard_content = pyperclip.paste()
+                clipboard_content = self.clipboard.paste()
                 # Only support private server share URLs
                 if ("roblox.com/share" in clipboard_content and "type=Server" in clipboard_content and "code=" in clipboard_content):
                     return clipboard_content
@@ -202,21 +375,18 @@ class RobloxAntiLeave:
 
     def is_valid_roblox_url(self, url: str) -> bool:
         """Check if the URL is a valid private server URL in the required format"""
-        if not url:
-            return False
-
-        url_lower = url.lower()
         # Only accept private server share URLs in the specific format
-        if "roblox.com/share" in url_lower and "type=server" in url_lower and "code=" in url_lower:
-            return True
-
-        return False
+        return parse_server_url(url) is not None
 
     def normalize_roblox_url(self, url: str) -> str:
         """Normalize Roblox URL to ensure it works properly"""
         if not url:
             return url
 
+        server = parse_server_url(url)
+        if server is not None:
+            return server.url
+
         # Ensure URL has proper protocol
         if url.startswith("www.roblox.com"):
             url = "https://" + url
@@ -229,13 +399,23 @@ class RobloxAntiLeave:
 
         return url
 
-    def reconnect_to_game(self) -> bool:
+    def reconnect_to_game(self, wait_for_ready: bool = True) -> bool:
         """Attempt to reconnect to the last Roblox game"""
         try:
             logger.info(f"Attempting reconnection (attempt {self.reconnect_attempts + 1})")
 
-            # Try to get the last game URL
-            game_url = self.get_last_game_url() or self.last_game_url
+            # A newly copied server takes over; otherwise the pool picks (and fails over)
+            copied_url = self.get_last_game_url()
+            if copied_url and parse_server_url(copied_url) not in self.server_pool.servers:
+                self.server_pool.add(copied_url, make_current=True)
+            server = self.server_pool.choose()
+            game_url = server.url if server else (copied_url or self.last_game_url)
+
+            # Clients already running are not the one we are about to launch
+            self.launch_pids = set(self.process_tracker.tracked)
+            self.launch_time = self.clock.time()
+            self.launch_url = game_url
+            self.launch_server = server
 
             if game_url and self.is_valid_roblox_url(game_url):
                 # Normalize the URL to ensure it works properly
@@ -243,8 +423,7 @@ class RobloxAntiLeave:
                 logger.info(f"Reconnecting to: {normalized_url}")
                 if "privateServerLinkCode=" in normalized_url:
                     logger.info("Detected private server URL")
-                webbrowser.open(normalized_url)
-                time.sleep(BROWSER_WAIT_TIME)  # Wait for browser to open
+                self.launcher.open_url(normalized_url)
 
                 # Private server URLs automatically open Roblox and join the server
                 logger.info("Private server URL will automatically open Roblox and join the server")
@@ -252,93 +431,257 @@ class RobloxAntiLeave:
             else:
                 # If no URL available, just try to open Roblox
                 logger.info("No game URL available, opening Roblox")
-                try:
-                    # Try to start Roblox directly
-                    subprocess.Popen(['start', 'roblox:'], shell=True)
-                except:
-                    # Fallback to opening Roblox website
-                    webbrowser.open('https://www.roblox.com/')
+                self.launcher.open_roblox()
 
             self.reconnect_attempts += 1
+            RECONNECTS.inc(outcome='launched')
+            if self.trace_recorder:
+                self.trace_recorder.mark('reconnect', url=game_url)
+            self.journal.record(RECONNECT_START, self.server_url, attempt=self.reconnect_attempts,
+                                via=server.code if server else None)
+
+            # A relaunched client gets a new PID, and should be watched closely
+            self.process_tracker.expect_new_instance()
+            self.scheduler.on_reconnect()
 
-            # Reset disconnection state after successful reconnection attempt
-            import time
-            self.last_disconnection_time = time.time()
+            # Probes are ignored until the cooldown after the launch has passed
+            self.connection.reconnecting()
 
+            if wait_for_ready:
+                self.wait_for_rejoin()
             return True
 
         except Exception as e:
             logger.error(f"Error during reconnection: {e}")
+            RECONNECTS.inc(outcome='failed')
+            self.launch_time = None
+            self.rejoin_failed = True
+            self.connection.reconnecting()
+            self.connection.rejoined()
+            self.journal.record(RECONNECT_FINISH, self.server_url, ok=False, error=str(e))
             return False
 
+    def rejoin_ready(self) -> bool:
+        """Check whether the relaunched client is back: a new PID and a Roblox window"""
+        probes = {}
+        if self.settings.ENABLE_PROCESS_MONITORING:
+            probes['processes'] = self.process_tracker.scan
+        if self.settings.ENABLE_WINDOW_MONITORING:
+            probes['windows'] = self.get_window_snapshot
+
+        results = {}
+        if self.settings.CONCURRENT_PROBES:
+            # Through the tick's workers, so a hung scan or window manager is skipped, not called twice
+            results = self.probe_runner.run(probes, self.settings.PROBE_TIMEOUT)
+            if len(results) != len(probes):
+                return False
 
+        new_pids = set()
+        if 'processes' in probes:
+            if 'processes' not in results:
+                self.process_tracker.scan()
+            new_pids = set(self.process_tracker.tracked) - self.launch_pids
+            if not new_pids:
+                return False
 
-    def send_notification(self, title: str, message: str):
-        """Send desktop notification"""
-        if not ENABLE_NOTIFICATIONS:
-            return
+        if 'windows' in probes:
+            snapshot = results['windows'] if 'windows' in results else self.get_window_snapshot()
+            windows = [w for w in snapshot.roblox_windows
+                       if w not in snapshot.disconnect_windows and
+                       (w.pid is None or not new_pids or w.pid in new_pids)]
+            if not windows:
+                return False
+
+        return True
+
+    def wait_for_rejoin(self) -> bool:
+        """Block until the client is back or REJOIN_TIMEOUT passes"""
+        deadline = self.launch_time + self.rejoin_timeout
+        while self.monitoring and self.clock.time() < deadline:
+            if self.rejoin_ready():
+                return self.record_rejoin(True)
+            self.clock.sleep(self.readiness_poll_interval)
+        return self.record_rejoin(self.rejoin_ready())
+
+    async def wait_for_rejoin_async(self) -> bool:
+        """Awaitable wait_for_rejoin()"""
+        import asyncio
+        deadline = self.launch_time + self.rejoin_timeout
+        while self.monitoring and self.clock.time() < deadline:
+            if await asyncio.to_thread(self.rejoin_ready):
+                return self.record_rejoin(True)
+            await self.clock.sleep_async(self.readiness_poll_interval)
+        return self.record_rejoin(await asyncio.to_thread(self.rejoin_ready))
+
+    def record_rejoin(self, ready: bool) -> bool:
+        """Store the measured time-to-rejoin for the current attempt"""
+        elapsed = self.clock.time() - self.launch_time
+        self.rejoin_history.append(RejoinAttempt(self.reconnect_attempts, self.launch_url,
+                                                 self.launch_time, elapsed, ready))
+        self.launch_time = None
+        self.server_pool.record(self.launch_server, ready, elapsed)
+        self.rejoin_failed = not ready
+        self.connection.rejoined()
+        RECONNECTS.inc(outcome='rejoined' if ready else 'timeout')
+        self.journal.record(RECONNECT_FINISH, self.server_url, ok=ready,
+                            secs=round(elapsed, 3), attempt=self.reconnect_attempts)
+        if ready:
+            logger.info(f"Rejoined in {elapsed:.1f}s")
+        else:
+            logger.warning(f"Roblox did not come back within {elapsed:.1f}s")
+        return ready
+
+    @property
+    def server_url(self) -> Optional[str]:
+        """The private server being played: the one last launched, else the one monitoring started with"""
+        return self.launch_url or self.last_game_url
+
+    @property
+    def reconnect_budget(self) -> int:
+        """MAX_RECONNECT_ATTEMPTS per pooled server, so failing over always has attempts left"""
+        return self.max_reconnect_attempts * max(1, len(self.server_pool))
+
+    def wait_for_next_check(self) -> list:
+        """Wait for the next check, waking early if a tracked Roblox process exits"""
+        interval = self.scheduler.next_interval()
+        if not (self.settings.ENABLE_EXIT_EVENTS and self.settings.ENABLE_PROCESS_MONITORING):
+            self.clock.sleep(interval)
+            return []
 
         try:
-            notification.notify(
-                title=title,
-                message=message,
-                app_name="Roblox Anti-Leave",
-                timeout=NOTIFICATION_TIMEOUT
-            )
+            exited = self.exit_watcher.wait(list(self.process_tracker.tracked), interval)
         except Exception as e:
-            logger.error(f"Error sending notification: {e}")
+            logger.error(f"Error waiting for Roblox process exit: {e}")
+            self.clock.sleep(interval)
+            return []
 
-    def start_monitoring(self, game_url: Optional[str] = None):
-        """Start monitoring for disconnections"""
+        return self.handle_exited(exited)
+
+    async def wait_for_next_check_async(self) -> list:
+        """Awaitable wait_for_next_check() that can be cancelled at any point, also waking on window changes"""
+        interval = self.scheduler.next_interval()
+        if not self.window_events_enabled():
+            return await self.wait_for_exit_async(interval)
+
+        import asyncio
+        exit_wait = asyncio.ensure_future(self.wait_for_exit_async(interval))
+        window_wait = asyncio.ensure_future(self.wait_for_window_change_async(interval))
+        try:
+            await asyncio.wait((exit_wait, window_wait), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for wait in (exit_wait, window_wait):
+                wait.cancel()
+            await asyncio.gather(exit_wait, window_wait, return_exceptions=True)
+        return exit_wait.result() if exit_wait.done() and not exit_wait.cancelled() else []
+
+    def window_events_enabled(self) -> bool:
+        """Whether the window backend can wake the monitor when a window changes"""
+        if not (self.settings.ENABLE_WINDOW_EVENTS and self.settings.ENABLE_WINDOW_MONITORING):
+            return False
+        fileno = getattr(self.window_backend, 'fileno', None)
+        return fileno is not None and fileno() is not None
+
+    def window_classification_changed(self) -> bool:
+        """Apply waiting window events; True if they changed which windows are Roblox or disconnect popups"""
+        if self.probe_runner.outstanding('windows'):
+            return False  # A stuck snapshot still holds the backend and tracker; the next tick's check covers it
+        return self.window_backend.pending_changes() and self.window_tracker.refresh()
+
+    async def wait_for_window_change_async(self, timeout: float) -> bool:
+        """Wait until a Roblox or disconnect window appears, goes or is retitled into or out of either; False once timeout elapses"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        backend = self.window_backend
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                # Also picks up events Xlib buffered during the last listing, which never make the socket readable
+                if await asyncio.to_thread(self.window_classification_changed):
+                    logger.debug("Roblox or disconnect window opened, closed or retitled, checking now")
+                    return True
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+
+                readable = loop.create_future()
+                fd = backend.fileno()
+                loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+                try:
+                    await asyncio.wait_for(readable, remaining)
+                except asyncio.TimeoutError:
+                    return False
+                finally:
+                    loop.remove_reader(fd)
+        except Exception as e:
+            logger.error(f"Error waiting for window events: {e}")
+            await self.clock.sleep_async(max(0.0, deadline - loop.time()))
+            return False
+
+    async def wait_for_exit_async(self, interval: float) -> list:
+        """Sleep for interval, waking early if a tracked Roblox process exits"""
+        if not (self.settings.ENABLE_EXIT_EVENTS and self.settings.ENABLE_PROCESS_MONITORING):
+            await self.clock.sleep_async(interval)
+            return []
+
+        try:
+            exited = await self.exit_watcher.wait_async(list(self.process_tracker.tracked), interval)
+        except Exception as e:
+            logger.error(f"Error waiting for Roblox process exit: {e}")
+            await self.clock.sleep_async(interval)
+            return []
+
+        return self.handle_exited(exited)
+
+    def handle_exited(self, exited: list) -> list:
+        """Record tracked Roblox processes that exited during a wait"""
+        if exited:
+            logger.info(f"Roblox process exited (PID {', '.join(str(pid) for pid in exited)})")
+            self.process_tracker.forget(exited)
+            self.process_exited = True
+        return exited
+
+    def send_notification(self, title: str, message: str):
+        """Queue a desktop notification (never blocks)"""
+        if not self.settings.ENABLE_NOTIFICATIONS or self.notifier is None:
+            return
+
+        self.notifications.submit(title, message)
+
+    def begin_monitoring(self, game_url: Optional[str] = None):
+        """Reset monitoring state for a new session"""
         self.last_game_url = game_url
+        self.launch_url = None
+        self.launch_server = None
         self.monitoring = True
         self.reconnect_attempts = 0
+        if game_url:
+            self.server_pool.add(game_url, make_current=True)
 
-        # Reset disconnection state when starting
-        import time
-        self.last_disconnection_time = 0
-        self.was_connected = True  # Assume connected when starting
+        # Reset disconnection state when starting (assume connected)
+        self.connection.reset()
+        self.rejoin_failed = False
         self.consecutive_disconnects = 0
+        self.process_tracker.reset()
+        self.journal.record(START, game_url)
+        if self.clipboard_watcher:
+            self.clipboard_watcher.start()
 
         logger.info("Starting Roblox disconnection monitoring...")
         if game_url:
             logger.info(f"Monitoring private server: {game_url}")
 
-        self.send_notification("Roblox Anti-Leave", "Monitoring started")
-
-        try:
-            while self.monitoring:
-                if self.detect_disconnection():
-                    logger.warning("Disconnection detected!")
-                    self.send_notification("Roblox Anti-Leave", "Disconnection detected! Attempting to reconnect...")
-
-                    if self.reconnect_attempts < self.max_reconnect_attempts:
-                        if self.reconnect_to_game():
-                            logger.info("Reconnection attempt completed")
-                            # Wait a bit longer after reconnection attempt
-                            time.sleep(self.reconnect_delay)
-                        else:
-                            logger.error("Reconnection attempt failed")
-                    else:
-                        logger.error(f"Max reconnection attempts ({self.max_reconnect_attempts}) reached")
-                        self.send_notification("Roblox Anti-Leave",
-                                             f"Max reconnection attempts reached. Stopping monitoring.")
-                        break
-
-                time.sleep(self.check_interval)
-
-        except KeyboardInterrupt:
-            logger.info("Monitoring stopped by user")
-        except Exception as e:
-            logger.error(f"Error during monitoring: {e}")
-        finally:
-            self.monitoring = False
-            logger.info("Monitoring stopped")
+    def start_monitoring(self, game_url: Optional[str] = None):
+        """Start monitoring for disconnections (blocks until stopped)"""
+        from engine import MonitorEngine
+        self.engine = MonitorEngine(self)
+        self.engine.run(game_url)
 
     def stop_monitoring(self):
         """Stop monitoring"""
         self.monitoring = False
         logger.info("Stopping monitoring...")
+        if self.engine:
+            self.engine.cancel()
 
 
 def main():
@@ -346,7 +689,26 @@ def main():
     print("Roblox Anti-Leave Script")
     print("=" * 30)
 
-    anti_leave = RobloxAntiLeave()
+    try:
+        current_settings()
+    except SettingsError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    # A running daemon does the monitoring; this console just drives it
+    from daemon import DaemonClient
+    client = DaemonClient()
+    attached = client.available()
+
+    missing = [] if attached else missing_dependencies()
+    if missing:
+        print(f"Missing required library: {', '.join(missing)}")
+        print("Please install required packages:")
+        print("pip install -r requirements.txt")
+        sys.exit(1)
+
+    if not attached:
+        configure_logging()
 
     # Get private server URL from user (optional)
     print("This script only works with private server URLs.")
@@ -355,7 +717,7 @@ def main():
     game_url = input("Enter private server URL (optional, press Enter to skip): ").strip()
     if not game_url:
         game_url = None
-    elif not anti_leave.is_valid_roblox_url(game_url):
+    elif parse_server_url(game_url) is None:
         print("Error: Invalid URL format!")
         print("Only private server URLs are supported:")
         print("- https://www.roblox.com/share?code=CODE&type=Server")
@@ -363,9 +725,17 @@ def main():
         return
     else:
         # Normalize the URL
-        game_url = anti_leave.normalize_roblox_url(game_url)
+        game_url = parse_server_url(game_url).url
         print("✓ Valid private server URL detected!")
 
+    if attached:
+        run_attached(client, game_url)
+        return
+
+    # Only a monitor running in this process needs the backends built
+    anti_leave = RobloxAntiLeave()
+    start_server(METRICS_PORT)
+
     print("\nStarting monitoring...")
     print("Press Ctrl+C to stop")
 
@@ -376,5 +746,26 @@ def main():
         anti_leave.stop_monitoring()
 
 
+def run_attached(client, game_url: Optional[str]):
+    """Start monitoring in the daemon and print its events until Ctrl+C"""
+    from daemon import RpcError, format_event
+    print(f"\nMonitor daemon found on {client.path}, starting monitoring there...")
+    try:
+        client.start(game_url)
+    except RpcError as e:
+        print(f"Error: {e.message}")
+        return
+    print("Press Ctrl+C to stop")
+
+    try:
+        for event in client.events():
+            print(format_event(event))
+    except KeyboardInterrupt:
+        print("\nStopping...")
+        client.stop()
+    except OSError as e:
+        print(f"Lost connection to the daemon: {e}")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,234 @@
+"""
+Metrics for Roblox Anti-Leave
+A small in-process registry of counters, gauges and histograms, rendered in
+Prometheus text exposition format and optionally served on localhost.
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+def _label_text(labelnames, values, extra=()):
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+    def total(self):
+        return sum(self._series.values())
+
+    def render(self):
+        with self._lock:
+            series = list(self._series.items())
+        lines = self.header()
+        for key, value in sorted(series):
+            lines.append(f"{self.name}{_label_text(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def mean(self, **labels):
+        series = self._series.get(self._key(labels))
+        return series[1] / series[2] if series and series[2] else 0.0
+
+    def count(self, **labels):
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self):
+        with self._lock:
+            # Copy the bucket lists too: observe() mutates them in place
+            series = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items()]
+        lines = self.header()
+        for key, (counts, total, count) in sorted(series):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _label_text(self.labelnames, key, [('le', _number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them for the exporter"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        self.metrics.setdefault(metric.name, metric)
+        return self.metrics[metric.name]
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """Text exposition format"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+# Monitor metrics
+PROBE_SECONDS = registry.histogram('roblox_antileave_probe_seconds',
+                                   'Duration of a single probe', ['probe'])
+PROBE_TIMEOUTS = registry.counter('roblox_antileave_probe_timeouts_total',
+                                  'Probes that missed their deadline in concurrent mode', ['probe'])
+TICK_SECONDS = registry.histogram('roblox_antileave_tick_seconds',
+                                  'Duration of a whole disconnection check')
+DETECTIONS = registry.counter('roblox_antileave_detections_total',
+                              'Disconnections detected', ['reason'])
+SUPPRESSIONS = registry.counter('roblox_antileave_suppressions_total',
+                                'Disconnect signals ignored as false positives', ['reason'])
+RECONNECTS = registry.counter('roblox_antileave_reconnects_total',
+                              'Reconnect attempts by outcome', ['outcome'])
+TRACKED_INSTANCES = registry.gauge('roblox_antileave_tracked_instances',
+                                   'Roblox clients currently tracked')
+
+
+def summary() -> dict:
+    """Compact numbers for the GUI stats panel"""
+    return {
+        'ticks': TICK_SECONDS.count(),
+        'tick_ms': TICK_SECONDS.mean() * 1000,
+        'window_probe_ms': PROBE_SECONDS.mean(probe='windows') * 1000,
+        'process_probe_ms': PROBE_SECONDS.mean(probe='processes') * 1000,
+        'detections': DETECTIONS.total(),
+        'suppressions': SUPPRESSIONS.total(),
+        'reconnects': RECONNECTS.value(outcome='launched'),
+        'rejoined': RECONNECTS.value(outcome='rejoined'),
+        'tracked': TRACKED_INSTANCES.value(),
+    }
+
+
+def _handler_class():
+    # http.server is only imported when the exporter is enabled
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep scrapes out of the activity log
+
+    return MetricsHandler
+
+
+_server = None
+
+
+def start_server(port: int, host: str = '127.0.0.1'):
+    """Serve /metrics on localhost from a daemon thread (once per process)"""
+    global _server
+    if _server is not None or not port:
+        return _server
+    from http.server import ThreadingHTTPServer
+    try:
+        _server = ThreadingHTTPServer((host, port), _handler_class())
+    except OSError as e:
+        logger.error(f"Could not start metrics exporter on {host}:{port}: {e}")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return _server
@@ -0,0 +1,130 @@
+"""
+Background notification dispatcher for Roblox Anti-Leave
+Queues desktop notifications for a worker thread so a slow notification
+backend never stalls detection, and coalesces repeats.
+"""
+
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """Bounded notification queue drained by a worker thread"""
+
+    def __init__(self, notifier, clock, timeout, queue_size=16, coalesce_window=120,
+                 overflow=DROP_OLDEST):
+        self.notifier = notifier
+        self.clock = clock
+        self.timeout = timeout
+        self.coalesce_window = coalesce_window
+        self.overflow = overflow
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.worker = None
+        self._lock = threading.Lock()
+
+        # (title, message) -> [last queued time, repeats folded in since then]
+        self._recent = {}
+
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, title: str, message: str) -> bool:
+        """Queue a notification without ever blocking; False if coalesced or dropped"""
+        now = self.clock.time()
+        key = (title, message)
+
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent and now - recent[0] < self.coalesce_window:
+                recent[1] += 1
+                self.coalesced += 1
+                return False
+            repeats = recent[1] if recent else 0
+            self._recent[key] = [now, 0]
+            self._prune(now)
+
+        if repeats:
+            message = f"{message} ({repeats} more since the last notice)"
+        self._ensure_worker()
+        return self._put((title, message))
+
+    def _put(self, item) -> bool:
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+
+        self.dropped += 1
+        if self.overflow == DROP_NEWEST:
+            logger.debug(f"Notification queue full, dropped: {item[1]}")
+            return False
+
+        try:
+            dropped = self.queue.get_nowait()
+            self.queue.task_done()
+            logger.debug(f"Notification queue full, dropped: {dropped[1]}")
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def _prune(self, now):
+        """Forget coalescing state older than the window"""
+        if len(self._recent) > 64:
+            self._recent = {key: value for key, value in self._recent.items()
+                            if now - value[0] < self.coalesce_window}
+
+    def _ensure_worker(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self._run, name="notifications", daemon=True)
+            self.worker.start()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                title, message = item
+                self.notifier.notify(title, message, self.timeout)
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error sending notification: {e}")
+            finally:
+                self.queue.task_done()
+
+    def close(self, timeout: float = 1.0):
+        """Let queued notifications go out, waiting at most timeout seconds"""
+        worker = self.worker
+        if worker is None:
+            return
+        self.worker = None
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        worker.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            'queued': self.queue.qsize(),
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
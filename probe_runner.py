@@ -0,0 +1,98 @@
+"""
+Concurrent probe execution for Roblox Anti-Leave
+Runs a tick's independent probes on small persistent worker threads, so the
+tick takes as long as the slowest probe rather than all of them added up,
+and gives up on a probe that hangs instead of freezing detection.
+"""
+
+import queue
+import logging
+import threading
+from concurrent.futures import Future, wait
+
+from metrics import PROBE_TIMEOUTS
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeWorker:
+    """A daemon thread running one probe's calls in order"""
+
+    def __init__(self, name):
+        self.jobs = queue.SimpleQueue()
+        # Daemon, unlike ThreadPoolExecutor workers, so a hung call can't block interpreter exit
+        self.thread = threading.Thread(target=self._run, name=f"probe-{name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, probe) -> Future:
+        future = Future()
+        self.jobs.put((probe, future))
+        return future
+
+    def stop(self):
+        self.jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            probe, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(probe())
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class ProbeRunner:
+    """Runs named probes concurrently with a shared deadline"""
+
+    def __init__(self):
+        # One worker per probe: a hung probe holds its own worker, never another probe's
+        self.workers = {}
+        self.hung = {}  # name -> call still running past its deadline
+        self.timeouts = 0
+
+    def run(self, probes: dict, timeout: float) -> dict:
+        """Run {name: callable} and return {name: result} for the probes that finished in time"""
+        futures = {}
+        for name, probe in probes.items():
+            hung = self.hung.get(name)
+            if hung is not None:
+                if not hung.done():
+                    continue  # Still stuck from an earlier tick; don't queue more calls behind it
+                del self.hung[name]
+                logger.info(f"{name} probe is responding again")
+            worker = self.workers.get(name)
+            if worker is None:
+                worker = self.workers[name] = ProbeWorker(name)
+            futures[name] = worker.submit(probe)
+
+        if futures:
+            wait(futures.values(), timeout)
+
+        results = {}
+        for name in probes:
+            future = futures.get(name)
+            if future is not None and future.done():
+                results[name] = future.result()
+                continue
+            if future is not None:
+                self.hung[name] = future
+                self.timeouts += 1
+                PROBE_TIMEOUTS.inc(probe=name)
+                logger.warning(f"{name} probe did not answer within {timeout:g}s, skipping it until it does")
+        return results
+
+    def outstanding(self, name) -> bool:
+        """Whether a probe's call from an earlier run is still stuck"""
+        future = self.hung.get(name)
+        return future is not None and not future.done()
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.stop()
+        self.workers.clear()
+        self.hung.clear()
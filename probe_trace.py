@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Probe traces for Roblox Anti-Leave
+Records the process lists and window titles the monitor sees as a compact
+delta-encoded JSON-lines file, and replays them through the real detection
+loop on a virtual clock to measure detection latency, false positives and
+reconnect decisions under different settings.
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import bisect
+import random
+import logging
+import argparse
+import threading
+
+from backends import WindowInfo, ProcessInfo, FakeClock, FakeClipboard, FakeLauncher, FakeNotifier
+from classifier import DISCONNECT
+
+TRACE_VERSION = 1
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def session_path(path, start: float) -> str:
+    """TRACE_FILE with the session's start time added, e.g. probe_trace-20240101-120000.jsonl.gz"""
+    directory, name = os.path.split(path)
+    stem, dot, extension = name.partition('.')
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(start))
+    candidate, n = os.path.join(directory, f"{stem}-{stamp}{dot}{extension}"), 1
+    while os.path.exists(candidate):
+        n += 1
+        candidate = os.path.join(directory, f"{stem}-{stamp}-{n}{dot}{extension}")
+    return candidate
+
+
+# Recording -----------------------------------------------------------------
+
+class TraceRecorder:
+    """Writes probe results as deltas against the previous probe, one file per monitoring session"""
+
+    def __init__(self, path, clock, process_names=()):
+        self.path = path  # TRACE_FILE; each session's file gets its start time added
+        self.session_file = None
+        self.clock = clock
+        self.process_names = list(process_names)
+        self.start = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._windows = {}  # handle -> (title, pid)
+        self._processes = {}  # pid -> name
+
+    def _write(self, entry: dict):
+        with self._lock:
+            if self._file is None:
+                self.start = self.clock.time()
+                # Never truncate an earlier session's trace
+                self.session_file = session_path(self.path, self.start)
+                self._file = _open(self.session_file, 'x')
+                self._file.write(json.dumps({'trace': TRACE_VERSION, 'start': self.start,
+                                             'process_names': self.process_names}) + '\n')
+            entry = dict(t=round(self.clock.time() - self.start, 3), **entry)
+            self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            self._file.flush()
+
+    def windows(self, windows):
+        current = {w.handle: (w.title, w.pid) for w in windows}
+        added = [[handle, title, pid] for handle, (title, pid) in current.items()
+                 if self._windows.get(handle) != (title, pid)]
+        removed = [handle for handle in self._windows if handle not in current]
+        self._windows = current
+        if added or removed:
+            self._write({'w+': added, 'w-': removed})
+
+    def processes(self, processes):
+        current = {p.pid: p.name for p in processes}
+        added = [[pid, name] for pid, name in current.items() if self._processes.get(pid) != name]
+        removed = [pid for pid in self._processes if pid not in current]
+        self._processes = current
+        if added or removed:
+            self._write({'p+': added, 'p-': removed})
+
+    def mark(self, event: str, **fields):
+        """Note what the live monitor decided (or a hand-made 'disconnect' label)"""
+        self._write(dict(mark=event, **fields))
+
+    def close(self):
+        """End the session (writing the gzip trailer); the next probe starts a new file"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            # The next file starts from a full listing, not deltas against this one
+            self._windows = {}
+            self._processes = {}
+
+
+class RecordingWindowBackend:
+    """Window backend wrapper that records every listing"""
+
+    def __init__(self, inner, recorder: TraceRecorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        # fileno, pending_changes and close come from the real backend
+        return getattr(self.inner, name)
+
+    def list_windows(self):
+        windows = self.inner.list_windows()
+        self.recorder.windows(windows)
+        return windows
+
+
+class RecordingProcessBackend:
+    """Process backend wrapper that records every listing"""
+
+    def __init__(self, inner, recorder: TraceRecorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        # create_time, wait_for_exit and capability flags come from the real backend
+        return getattr(self.inner, name)
+
+    def list_processes(self):
+        processes = self.inner.list_processes()
+        self.recorder.processes(processes)
+        return processes
+
+
+# Replay --------------------------------------------------------------------
+
+class TraceSource:
+    """World state of a trace at any point in virtual time, streamed forward
+
+    Ground-truth disconnects (labels) come from the last Roblox client exiting, a
+    window taking a disconnect title (with classify), a live reconnect and
+    hand-made 'disconnect' marks. Evidence within label_window seconds of a
+    labelled disconnect, such as the old client exiting once the live run
+    relaunched it, belongs to that same disconnect.
+    """
+
+    def __init__(self, path, classify=None, label_window=120.0):
+        self.classify = classify  # title -> classifier label
+        self.label_window = label_window
+        self._file = _open(path, 'r')
+        header = json.loads(self._file.readline() or '{}')
+        if header.get('trace') != TRACE_VERSION:
+            raise ValueError(f"{path} is not a probe trace")
+        self.process_names = [name.lower() for name in header.get('process_names', [])]
+        self.start = header.get('start', 0.0)  # entries are relative to this wall-clock time
+        self.windows = {}
+        self.processes = {}
+        self.marks = []
+        self.labels = []  # ground-truth disconnect times
+        self._roblox = set()  # live Roblox client PIDs
+        self._flagged = set()  # handles of windows showing a disconnect title
+        self._last_label = None  # time of the latest labelled disconnect
+        self.last_time = 0.0
+        self.exhausted = False
+        self._next = None
+        self._read()
+
+    def _read(self):
+        for line in self._file:
+            try:
+                self._next = json.loads(line)
+                return
+            except ValueError:
+                continue
+        self._next = None
+        self.exhausted = True
+        self._file.close()
+
+    def advance(self, now: float):
+        """Apply every change recorded at or before clock time now"""
+        t = now - self.start
+        while self._next is not None and self._next['t'] <= t:
+            self._apply(self._next)
+            self._read()
+
+    def next_time(self):
+        """Clock time of the next recorded change"""
+        return None if self._next is None else self.start + self._next['t']
+
+    def _apply(self, entry):
+        t = self.last_time = entry['t']
+        for handle, title, pid in entry.get('w+', ()):
+            self.windows[handle] = (title, pid)
+            if self.classify and self.classify(title) == DISCONNECT:
+                if handle not in self._flagged:
+                    self._flagged.add(handle)
+                    self._disconnect(t)
+            else:
+                self._flagged.discard(handle)
+        for handle in entry.get('w-', ()):
+            self.windows.pop(handle, None)
+            self._flagged.discard(handle)
+
+        had_roblox = bool(self._roblox)
+        for pid, name in entry.get('p+', ()):
+            self.processes[pid] = name
+            if name.lower() in self.process_names:
+                self._roblox.add(pid)
+        for pid in entry.get('p-', ()):
+            self.processes.pop(pid, None)
+            self._roblox.discard(pid)
+        # Losing the last Roblox client is a disconnect even without a hand-made label
+        if had_roblox and not self._roblox:
+            self._disconnect(t)
+
+        if 'mark' in entry:
+            if entry['mark'] == 'disconnect':
+                self._disconnect(t)
+            else:
+                self.marks.append(entry)
+                if entry['mark'] == 'reconnect':
+                    # The live run reconnecting means it saw a disconnect, even one the trace shows no evidence of
+                    self._disconnect(t)
+
+    def _disconnect(self, t):
+        if self._last_label is not None and t - self._last_label <= self.label_window:
+            return  # More evidence of the disconnect already labelled
+        self.labels.append(t)
+        self._last_label = t
+
+class ReplayWindowBackend:
+    def __init__(self, source: TraceSource, clock):
+        self.source = source
+        self.clock = clock
+
+    def list_windows(self):
+        self.source.advance(self.clock.time())
+        return [WindowInfo(handle, title, pid) for handle, (title, pid) in self.source.windows.items()]
+
+
+class ReplayProcessBackend:
+    """Process backend over a trace; waits jump the virtual clock to the next exit"""
+
+    virtual_wait = True
+
+    def __init__(self, source: TraceSource, clock):
+        self.source = source
+        self.clock = clock
+
+    def list_processes(self):
+        self.source.advance(self.clock.time())
+        return [ProcessInfo(pid, name) for pid, name in self.source.processes.items()]
+
+    def create_time(self, pid):
+        self.source.advance(self.clock.time())
+        return 0.0 if pid in self.source.processes else None
+
+    def wait_for_exit(self, pids, timeout):
+        source = self.source
+        source.advance(self.clock.time())
+        gone = [pid for pid in pids if pid not in source.processes]
+        deadline = self.clock.time() + timeout
+        # Step through recorded changes until one of pids exits or the wait times out
+        while not gone and source.next_time() is not None and source.next_time() <= deadline:
+            self.clock.now = source.next_time()
+            source.advance(self.clock.now)
+            gone = [pid for pid in pids if pid not in source.processes]
+        return gone
+
+
+class ReplayJournal:
+    """Collects the monitor's journal events in memory, in trace time"""
+
+    def __init__(self, source: TraceSource, clock):
+        self.source = source
+        self.clock = clock
+        self.events = []
+
+    def record(self, event, server=None, **fields):
+        self.events.append(dict(t=self.clock.time() - self.source.start, ev=event, **fields))
+
+    def close(self):
+        pass
+
+
+def replay(path, url=None, overrides=None, match_window=120.0) -> dict:
+    """Run a trace through the monitor and score its decisions"""
+    import main
+    from journal import DETECT, RECONNECT_START, RECONNECT_FINISH
+
+    # Settings under test start from config.py, with the desktop-only features off
+    # Jitter is off so one trace always scores the same
+    changes = dict(ENABLE_JOURNAL=False, CLIPBOARD_WATCHER=False, ENABLE_CLIPBOARD_DETECTION=False,
+                   ENABLE_PROCESS_MONITORING=True, ENABLE_WINDOW_MONITORING=True, TRACE_FILE=None, POLL_JITTER=0)
+    changes.update(overrides or {})
+    settings = main.SETTINGS.replace(**changes)
+
+    # Popup ground truth uses config.py's indicators, so --indicators runs are scored against the same labels
+    source = TraceSource(path, main.SETTINGS.title_classifier.classify, match_window)
+    if not source.process_names:
+        source.process_names = list(settings.process_names)
+
+    # Keep probing after the last change for long enough to confirm a disconnect right at the end
+    tail = settings.CONFIRMATION_WINDOW * (settings.MAX_CHECK_INTERVAL if settings.ADAPTIVE_POLLING
+                                           else settings.CHECK_INTERVAL)
+
+    def on_sleep(clock):
+        if source.exhausted and clock.now - source.start >= source.last_time + tail:
+            anti_leave.monitoring = False
+
+    decisions = []
+    clock = FakeClock(source.start, on_sleep)
+    launcher = FakeLauncher(lambda opened_url: decisions.append((clock.now - source.start, opened_url)))
+    wall_start = time.perf_counter()
+    anti_leave = main.RobloxAntiLeave(ReplayWindowBackend(source, clock), ReplayProcessBackend(source, clock),
+                                      FakeClipboard(), launcher, FakeNotifier(), clock, settings)
+    anti_leave.journal = ReplayJournal(source, clock)
+    anti_leave.max_reconnect_attempts = 10 ** 6  # score every decision, never give up mid-trace
+    anti_leave.scheduler.rng = random.Random(0)  # jitter asked for in overrides is repeatable too
+    source.advance(clock.now)
+    anti_leave.start_monitoring(url)
+    wall = time.perf_counter() - wall_start
+
+    events = anti_leave.journal.events
+    detections = [e for e in events if e['ev'] == DETECT]
+    labels = sorted(source.labels)
+    matched = set()
+    latencies = []
+    false_positives = []
+    end = source.last_time  # scoring stops here, or at a late detection confirming a disconnect
+    for detection in detections:
+        # Latest unmatched disconnect at or before the detection, within the window
+        index = bisect.bisect_right(labels, detection['t'] + 1e-6) - 1
+        while index >= 0 and index in matched:
+            index -= 1
+        if index >= 0 and detection['t'] - labels[index] <= match_window:
+            matched.add(index)
+            latencies.append(detection['t'] - labels[index])
+            end = max(end, detection['t'])
+        elif detection['t'] <= source.last_time:
+            false_positives.append(detection)
+        # After the trace ends the world is frozen; other detections there say nothing about the settings
+
+    events = [e for e in events if e['t'] <= end + 1e-6]
+    decisions = [(t, opened) for t, opened in decisions if t <= end + 1e-6]
+
+    latencies.sort()
+    rejoins = [e for e in events if e['ev'] == RECONNECT_FINISH]
+    live = [mark for mark in source.marks if mark['mark'] == 'reconnect']
+    agreed = match_times([t for t, _ in decisions], [mark['t'] for mark in live], match_window)
+    return {
+        'trace_seconds': source.last_time,
+        'replay_seconds': wall,
+        'speedup': source.last_time / wall if wall else None,
+        'disconnects': len(labels),
+        'detections': len([e for e in events if e['ev'] == DETECT]),
+        'detected': len(matched),
+        'missed': len(labels) - len(matched),
+        'false_positives': len(false_positives),
+        'false_positive_reasons': [e.get('reason') for e in false_positives],
+        'latency_mean': sum(latencies) / len(latencies) if latencies else None,
+        'latency_p50': latencies[len(latencies) // 2] if latencies else None,
+        'latency_max': latencies[-1] if latencies else None,
+        'reconnects': len([e for e in events if e['ev'] == RECONNECT_START]),
+        'rejoined': len([e for e in rejoins if e.get('ok')]),
+        'decisions': [{'t': round(t, 3), 'url': opened} for t, opened in decisions],
+        'live_decisions': [{'t': mark['t'], 'url': mark.get('url')} for mark in live],
+        'agreed_with_live': len(agreed),
+        'replay_only': len(decisions) - len(agreed),
+        'live_only': len(live) - len(agreed),
+    }
+
+
+def match_times(times, targets, window) -> list:
+    """Pair each time with the nearest unpaired target within window seconds; returns (time, target) pairs"""
+    pairs = []
+    free = sorted(targets)
+    for t in sorted(times):
+        candidates = [target for target in free if abs(target - t) <= window]
+        if candidates:
+            target = min(candidates, key=lambda target: abs(target - t))
+            free.remove(target)
+            pairs.append((t, target))
+    return pairs
+
+
+def _fmt(value, suffix='s'):
+    return '-' if value is None else f"{value:.2f}{suffix}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a probe trace through the disconnection monitor")
+    parser.add_argument('trace', help="trace file recorded with TRACE_FILE in config.py")
+    parser.add_argument('--url', help="private server URL to monitor (default: none)")
+    parser.add_argument('--check-interval', type=float)
+    parser.add_argument('--cooldown', type=float, help="DISCONNECTION_COOLDOWN")
+    parser.add_argument('--indicators', help="comma-separated DISCONNECT_INDICATORS")
+    parser.add_argument('--fixed-interval', action='store_true', help="disable adaptive polling")
+    parser.add_argument('--no-exit-events', action='store_true', help="only notice exits at the next check")
+    parser.add_argument('--match-window', type=float, default=120.0,
+                        help="seconds after a disconnect in which a detection counts (default: %(default)s)")
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--verbose', action='store_true', help="show the monitor's log")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+    else:
+        logging.disable(logging.CRITICAL)
+
+    overrides = {}
+    if args.check_interval is not None:
+        overrides['CHECK_INTERVAL'] = args.check_interval
+    if args.cooldown is not None:
+        overrides['DISCONNECTION_COOLDOWN'] = args.cooldown
+    if args.indicators:
+        overrides['DISCONNECT_INDICATORS'] = [i.strip() for i in args.indicators.split(',') if i.strip()]
+    if args.fixed_interval:
+        overrides['ADAPTIVE_POLLING'] = False
+    if args.no_exit_events:
+        overrides['ENABLE_EXIT_EVENTS'] = False
+
+    try:
+        result = replay(args.trace, args.url, overrides, args.match_window)
+    except (OSError, ValueError) as e:
+        print(f"Could not replay trace: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"Replayed {result['trace_seconds']:.0f}s of trace in {result['replay_seconds']:.2f}s "
+          f"({_fmt(result['speedup'], 'x')})")
+    print(f"Disconnects: {result['disconnects']}  detected: {result['detected']}  missed: {result['missed']}  "
+          f"false positives: {result['false_positives']}")
+    print(f"Detection latency: mean {_fmt(result['latency_mean'])}  p50 {_fmt(result['latency_p50'])}  "
+          f"max {_fmt(result['latency_max'])}")
+    print(f"Reconnects: {result['reconnects']} (live run: {len(result['live_decisions'])}), "
+          f"rejoined: {result['rejoined']}")
+    print(f"Against the live run: {result['agreed_with_live']} same, {result['replay_only']} only in replay, "
+          f"{result['live_only']} only live")
+    for decision in result['decisions']:
+        print(f"  {decision['t']:10.1f}s  reconnect -> {decision['url']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+PID-pinned process tracking for Roblox Anti-Leave
+Remembers matched Roblox PIDs with their create times so each tick only
+checks those PIDs instead of walking the whole process table.
+"""
+
+
+class ProcessTracker:
+    """Tracks running Roblox client PIDs between ticks"""
+
+    def __init__(self, backend, process_names):
+        self.backend = backend
+        self.process_names = [name.lower() for name in process_names]
+
+        self.tracked = {}  # pid -> create time
+        self.rescan_needed = True
+        self.full_scans = 0
+
+    def expect_new_instance(self):
+        """Force a full scan on the next check (e.g. after a relaunch)"""
+        self.rescan_needed = True
+
+    def forget(self, pids):
+        """Drop PIDs known to have exited and rescan on the next check"""
+        for pid in pids:
+            self.tracked.pop(pid, None)
+        self.rescan_needed = True
+
+    def reset(self):
+        self.tracked.clear()
+        self.rescan_needed = True
+
+    def is_running(self) -> bool:
+        """Check whether any Roblox client is running"""
+        # Nothing tracked means a client could appear at any time, so keep scanning
+        if self.rescan_needed or not self.tracked:
+            return self.scan()
+
+        for pid, create_time in self.tracked.items():
+            # A different create time means the PID was reused by another process
+            if self.backend.create_time(pid) != create_time:
+                return self.scan()
+
+        return True
+
+    def scan(self) -> bool:
+        """Walk the full process table and re-pin matching PIDs"""
+        self.full_scans += 1
+        self.rescan_needed = False
+        self.tracked = {}
+
+        for proc in self.backend.list_processes():
+            proc_name = proc.name.lower()
+            if any(roblox_name in proc_name for roblox_name in self.process_names):
+                create_time = self.backend.create_time(proc.pid)
+                if create_time is not None:
+                    self.tracked[proc.pid] = create_time
+
+        return bool(self.tracked)
@@ -0,0 +1,79 @@
+"""
+Adaptive polling scheduler for Roblox Anti-Leave
+Polls fast right after a reconnect or when something looks suspicious, and
+backs off towards a ceiling while the connection is steady.
+"""
+
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveScheduler:
+    """Chooses the wait before the next disconnection check"""
+
+    def __init__(self, clock, base_interval, min_interval, max_interval,
+                 backoff=1.5, jitter=0.0, fast_window=60, rng=None):
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        self.interval = base_interval
+        self.effective_interval = base_interval
+        self.fast_until = 0
+        self.configure(base_interval, min_interval, max_interval, backoff, jitter, fast_window)
+
+        # Stats for judging CPU use against detection latency
+        self.checks = 0
+        self.total_interval = 0.0
+
+    def configure(self, base_interval, min_interval, max_interval, backoff=1.5, jitter=0.0, fast_window=60):
+        """Set the bounds; the current interval is kept within them"""
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.backoff = max(backoff, 1.0)
+        self.jitter = jitter  # fraction of the interval, spreads monitors sharing a host
+        self.fast_window = fast_window
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+    def on_reconnect(self):
+        """Poll at the floor for a while after relaunching the client"""
+        self.fast_until = self.clock.time() + self.fast_window
+        self._set_interval(self.min_interval)
+
+    def observe(self, suspicious: bool):
+        """Feed back the result of a check"""
+        if suspicious or self.clock.time() < self.fast_until:
+            self._set_interval(self.min_interval)
+        else:
+            self._set_interval(min(self.max_interval, self.interval * self.backoff))
+
+    def next_interval(self) -> float:
+        """Return the wait before the next check, jitter included"""
+        interval = self.interval
+        if self.jitter:
+            interval += interval * self.jitter * self.rng.uniform(-1, 1)
+        self.effective_interval = max(interval, 0.0)
+        self.checks += 1
+        self.total_interval += self.effective_interval
+        logger.debug(f"Next check in {self.effective_interval:.2f}s")
+        return self.effective_interval
+
+    def _set_interval(self, interval: float):
+        if interval == self.interval:
+            return
+        if interval == self.max_interval:
+            logger.info(f"Connection steady, polling every {interval:g}s")
+        elif interval == self.min_interval and self.interval > self.min_interval:
+            logger.info(f"Polling fast (every {interval:g}s)")
+        self.interval = interval
+
+    def stats(self) -> dict:
+        """Effective interval and averages; the interval bounds worst-case detection latency"""
+        return {
+            'effective_interval': self.effective_interval,
+            'mean_interval': self.total_interval / self.checks if self.checks else self.interval,
+            'min_interval': self.min_interval,
+            'max_interval': self.max_interval,
+            'checks': self.checks,
+        }
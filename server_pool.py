@@ -0,0 +1,130 @@
+"""
+Private server pool for Roblox Anti-Leave
+Parses share URLs into canonical servers once, keeps a rolling join score per
+server and fails reconnects over to the best one when a server keeps failing.
+"""
+
+import logging
+from collections import deque, namedtuple
+from typing import Optional
+from urllib.parse import urlparse, parse_qsl
+
+logger = logging.getLogger(__name__)
+
+# A private server share link reduced to what identifies it
+PrivateServer = namedtuple('PrivateServer', ['code', 'url'])
+
+
+def parse_server_url(url) -> Optional[PrivateServer]:
+    """Parse a private server share URL, or return None if it isn't one"""
+    if not url:
+        return None
+    text = url.strip()
+    if not text.lower().startswith(('http://', 'https://')):
+        text = "https://" + text
+
+    parts = urlparse(text)
+    host = (parts.hostname or '').lower()
+    if host != 'roblox.com' and not host.endswith('.roblox.com'):
+        return None
+    if parts.path.rstrip('/').lower() != '/share':
+        return None
+
+    query = {key.lower(): value for key, value in parse_qsl(parts.query)}
+    code = query.get('code', '').strip()
+    if not code or query.get('type', '').lower() != 'server':
+        return None
+    return PrivateServer(code, f"https://www.roblox.com/share?code={code}&type=Server")
+
+
+class ServerScore:
+    """Rolling join results for one server"""
+
+    def __init__(self, window):
+        self.results = deque(maxlen=window)  # (rejoined, seconds)
+        self.consecutive_failures = 0
+
+    def record(self, rejoined: bool, seconds: float):
+        self.results.append((rejoined, seconds))
+        self.consecutive_failures = 0 if rejoined else self.consecutive_failures + 1
+
+    def success_rate(self) -> float:
+        # Smoothed so an untried server starts at 0.5 rather than 0 or 1
+        successes = sum(1 for rejoined, _ in self.results if rejoined)
+        return (successes + 1) / (len(self.results) + 2)
+
+    def mean_rejoin_time(self, default: float) -> float:
+        times = [seconds for rejoined, seconds in self.results if rejoined]
+        return sum(times) / len(times) if times else default
+
+
+class ServerPool:
+    """Private servers to reconnect to, best-scoring first once one keeps failing"""
+
+    def __init__(self, urls=(), window=10, failover_after=2, rejoin_timeout=60):
+        self.window = window
+        self.failover_after = failover_after
+        self.rejoin_timeout = rejoin_timeout
+        self.servers = []
+        self.scores = {}
+        self.current = None
+        for url in urls:
+            self.add(url)
+
+    def configure(self, window, failover_after, rejoin_timeout):
+        self.window = window
+        self.failover_after = failover_after
+        self.rejoin_timeout = rejoin_timeout
+        for stats in self.scores.values():
+            stats.results = deque(stats.results, maxlen=window)
+
+    def __len__(self):
+        return len(self.servers)
+
+    def add(self, url, make_current=False) -> Optional[PrivateServer]:
+        """Add a server by URL (once per share code) and return it"""
+        server = parse_server_url(url)
+        if server is None:
+            return None
+        if server.code not in self.scores:
+            self.servers.append(server)
+            self.scores[server.code] = ServerScore(self.window)
+        else:
+            server = next(s for s in self.servers if s.code == server.code)
+        if make_current or self.current is None:
+            self.current = server
+        return server
+
+    def score(self, server: PrivateServer) -> float:
+        """Higher is better: join success rate, discounted by time-to-rejoin"""
+        stats = self.scores[server.code]
+        latency = stats.mean_rejoin_time(self.rejoin_timeout / 2)
+        return stats.success_rate() / (1 + latency / self.rejoin_timeout)
+
+    def record(self, server: Optional[PrivateServer], rejoined: bool, seconds: float):
+        if server is not None and server.code in self.scores:
+            self.scores[server.code].record(rejoined, seconds)
+
+    def choose(self) -> Optional[PrivateServer]:
+        """Server for the next reconnect, failing over if the current one keeps failing"""
+        current = self.current
+        if current is None or len(self.servers) < 2:
+            return current
+        if self.scores[current.code].consecutive_failures < self.failover_after:
+            return current
+
+        best = max((s for s in self.servers if s != current), key=self.score)
+        if self.score(best) > self.score(current) or self.scores[best.code].consecutive_failures < self.failover_after:
+            logger.warning(f"Private server {current.code} failed {self.scores[current.code].consecutive_failures} "
+                           f"times in a row, failing over to {best.code}")
+            self.current = best
+        return self.current
+
+    def stats(self) -> list:
+        return [{
+            'code': server.code,
+            'current': server == self.current,
+            'score': self.score(server),
+            'success_rate': self.scores[server.code].success_rate(),
+            'attempts': len(self.scores[server.code].results),
+        } for server in self.servers]
@@ -0,0 +1,337 @@
+"""
+Typed settings for Roblox Anti-Leave
+Loads config.py into a validated, read-only Settings object, builds the
+structures derived from it (lowercased process names, the compiled title
+classifier) once per load, and watches the file so edits apply without a
+restart.
+"""
+
+import os
+import re
+import runpy
+import hashlib
+import logging
+import tempfile
+
+from classifier import TitleClassifier
+from connection_state import DEFAULT_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(APP_DIR, "config.py")
+
+
+def app_path(path):
+    """Resolve a relative file setting against the app directory, so it doesn't depend on the working directory"""
+    return os.path.join(APP_DIR, os.path.expanduser(path))
+
+
+# Longest Unix socket path every platform accepts (sun_path is 108 bytes on Linux, 104 on macOS and the BSDs)
+SOCKET_PATH_MAX = 103
+
+
+def socket_path(path):
+    """Resolve the daemon socket like app_path, falling back to a short hashed name when that is too long to bind"""
+    resolved = app_path(path)
+    if len(os.fsencode(resolved)) <= SOCKET_PATH_MAX:
+        return resolved
+    # Same install, same name: clients find the daemon without any shared state
+    digest = hashlib.sha1(os.fsencode(resolved)).hexdigest()[:12]
+    directory = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(directory, f"roblox_antileave-{digest}.sock")
+
+
+class SettingsError(ValueError):
+    """config.py has values that fail validation"""
+
+    def __init__(self, errors, path=None):
+        self.errors = list(errors)
+        where = f" in {path}" if path else ""
+        super().__init__(f"Invalid settings{where}:\n" + '\n'.join(f"  - {error}" for error in self.errors))
+
+
+class Field:
+    """Type, default and constraints of one setting"""
+
+    def __init__(self, kind, default, check=None, reloadable=True):
+        self.kind = kind  # int, float, bool, str, 'str?', 'str_list', 'weights' or 'instances'
+        self.default = default
+        self.check = check  # (predicate, message) applied after the type check
+        self.reloadable = reloadable  # False: read once at startup, edits need a restart
+
+    def convert(self, value):
+        """Return the value in its canonical (immutable where it matters) form, or raise ValueError"""
+        kind = self.kind
+        if kind is bool:
+            if not isinstance(value, bool):
+                raise ValueError("must be True or False")
+        elif kind is int:
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError("must be a whole number")
+        elif kind is float:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError("must be a number")
+            value = float(value)
+        elif kind is str:
+            if not isinstance(value, str):
+                raise ValueError("must be a string")
+        elif kind == 'str?':
+            if value is not None and not isinstance(value, str):
+                raise ValueError("must be a string or None")
+        elif kind == 'str_list':
+            if not isinstance(value, (list, tuple)) or not all(isinstance(item, str) for item in value):
+                raise ValueError("must be a list of strings")
+            value = tuple(value)
+        elif kind == 'weights':
+            if not isinstance(value, dict):
+                raise ValueError("must be a dict of signal name to weight")
+            unknown = sorted(set(value) - set(DEFAULT_WEIGHTS))
+            if unknown:
+                raise ValueError(f"unknown signal(s) {', '.join(map(str, unknown))} "
+                                 f"(known: {', '.join(DEFAULT_WEIGHTS)})")
+            if not all(isinstance(w, (int, float)) and not isinstance(w, bool) and w >= 0 for w in value.values()):
+                raise ValueError("weights must be numbers >= 0")
+            value = dict(DEFAULT_WEIGHTS, **{name: float(w) for name, w in value.items()})
+        elif kind == 'instances':
+            if not isinstance(value, (list, tuple)) or not all(isinstance(item, dict) for item in value):
+                raise ValueError("must be a list of dicts")
+            value = tuple(dict(item) for item in value)
+
+        if self.check and not self.check[0](value):
+            raise ValueError(self.check[1])
+        return value
+
+
+def _positive():
+    return (lambda value: value > 0, "must be greater than 0")
+
+
+def _at_least(minimum):
+    return (lambda value: value >= minimum, f"must be at least {minimum}")
+
+
+def _one_of(*choices):
+    return (lambda value: value in choices, f"must be one of {', '.join(map(repr, choices))}")
+
+
+def _regexes():
+    def valid(patterns):
+        try:
+            for pattern in patterns:
+                re.compile(pattern)
+        except re.error:
+            return False
+        return True
+    return (valid, "must be valid regular expressions")
+
+
+FIELDS = {
+    # Monitoring
+    'CHECK_INTERVAL': Field(float, 5, _positive()),
+    'MAX_RECONNECT_ATTEMPTS': Field(int, 3, _at_least(1)),
+    'REJOIN_TIMEOUT': Field(float, 60, _positive()),
+    'READINESS_POLL_INTERVAL': Field(float, 0.5, _positive()),
+    'DISCONNECTION_COOLDOWN': Field(float, 30, _at_least(0)),
+
+    'CONCURRENT_PROBES': Field(bool, False),
+    'PROBE_TIMEOUT': Field(float, 2.0, _positive()),
+
+    # Disconnect confirmation
+    'DISCONNECT_CONFIRMATIONS': Field(int, 2, _at_least(1)),
+    'CONFIRMATION_WINDOW': Field(int, 3, _at_least(1)),
+    'SIGNAL_WEIGHTS': Field('weights', dict(DEFAULT_WEIGHTS)),
+    'SIGNAL_THRESHOLD': Field(float, 1.0, _positive()),
+
+    # Failover servers
+    'SERVER_POOL': Field('str_list', ()),
+    'SERVER_FAILOVER_AFTER': Field(int, 2, _at_least(1)),
+    'SERVER_SCORE_WINDOW': Field(int, 10, _at_least(1)),
+
+    # Adaptive polling
+    'ADAPTIVE_POLLING': Field(bool, True),
+    'MIN_CHECK_INTERVAL': Field(float, 1, _positive()),
+    'MAX_CHECK_INTERVAL': Field(float, 30, _positive()),
+    'POLL_BACKOFF': Field(float, 1.5, _at_least(1)),
+    'POLL_JITTER': Field(float, 0.1, (lambda value: 0 <= value < 1, "must be between 0 and 1")),
+    'FAST_POLL_DURATION': Field(float, 60, _at_least(0)),
+
+    # Detection
+    'DISCONNECT_INDICATORS': Field('str_list', ("disconnected", "connection lost", "unable to connect",
+                                                "kicked for being afk", "kicked for inactivity",
+                                                "lost connection", "connection failed", "session expired",
+                                                "you have been removed", "removed from the game")),
+    'TITLE_CACHE_SIZE': Field(int, 1024, _at_least(0)),
+    'ROBLOX_PATTERNS': Field('str_list', (r"Roblox", r".*- Roblox", r"Roblox Player"), _regexes()),
+    'ROBLOX_PROCESS_NAMES': Field('str_list', ("robloxplayerbeta.exe", "roblox.exe", "robloxplayer.exe")),
+
+    # Notifications
+    'ENABLE_NOTIFICATIONS': Field(bool, True, reloadable=False),
+    'NOTIFICATION_TIMEOUT': Field(float, 10, _positive(), reloadable=False),
+    'NOTIFICATION_QUEUE_SIZE': Field(int, 16, _at_least(1), reloadable=False),
+    'NOTIFICATION_COALESCE_WINDOW': Field(float, 120, _at_least(0), reloadable=False),
+    'NOTIFICATION_OVERFLOW': Field(str, "drop_oldest", _one_of("drop_oldest", "drop_newest"), reloadable=False),
+
+    # Logging
+    'LOG_LEVEL': Field(str, "INFO", (lambda value: value.upper() in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"),
+                                     "must be DEBUG, INFO, WARNING, ERROR or CRITICAL"), reloadable=False),
+    'LOG_FILE': Field('str?', "roblox_antileave.log", reloadable=False),
+    'ENABLE_CONSOLE_LOGGING': Field(bool, True, reloadable=False),
+    'LOG_MAX_BYTES': Field(int, 5 * 1024 * 1024, _positive(), reloadable=False),
+    'LOG_ROTATE_INTERVAL': Field(float, 0, _at_least(0), reloadable=False),
+    'LOG_MAX_TOTAL_BYTES': Field(int, 50 * 1024 * 1024, _positive(), reloadable=False),
+    'LOG_QUEUE_SIZE': Field(int, 10000, _at_least(1), reloadable=False),
+    'LOG_FLUSH_INTERVAL': Field(float, 1.0, _positive(), reloadable=False),
+    'GUI_LOG_MAX_LINES': Field(int, 1000, _at_least(1), reloadable=False),
+
+    # Metrics, daemon, recording
+    'METRICS_PORT': Field(int, 0, (lambda value: 0 <= value < 65536, "must be a port number or 0"),
+                          reloadable=False),
+    'DAEMON_SOCKET': Field(str, "roblox_antileave.sock", reloadable=False),
+    'DAEMON_PORT': Field(int, 47642, (lambda value: 0 < value < 65536, "must be a port number"), reloadable=False),
+    'DAEMON_EVENT_BUFFER': Field(int, 1000, _at_least(1), reloadable=False),
+    'TRACE_FILE': Field('str?', None, reloadable=False),
+    'ENABLE_JOURNAL': Field(bool, True, reloadable=False),
+    'JOURNAL_FILE': Field(str, "roblox_antileave.journal", reloadable=False),
+    'CONFIG_HOT_RELOAD': Field(bool, True, reloadable=False),
+    'CONFIG_RELOAD_INTERVAL': Field(float, 2.0, _positive(), reloadable=False),
+
+    # Advanced
+    'PLAY_BUTTON_IMAGE': Field(str, "play_button.png"),
+    'PLAY_BUTTON_CONFIDENCE': Field(float, 0.8, (lambda value: 0 <= value <= 1, "must be between 0 and 1")),
+    'ENABLE_CLIPBOARD_DETECTION': Field(bool, True, reloadable=False),
+    'CLIPBOARD_WATCHER': Field(bool, True, reloadable=False),
+    'CLIPBOARD_POLL_INTERVAL': Field(float, 1.0, _positive(), reloadable=False),
+    'CLIPBOARD_MAX_POLL_INTERVAL': Field(float, 30.0, _positive(), reloadable=False),
+    'ENABLE_PROCESS_MONITORING': Field(bool, True, reloadable=False),
+    'PROCESS_BACKEND': Field(str, "auto", _one_of("auto", "psutil", "procfs"), reloadable=False),
+    'ENABLE_WINDOW_MONITORING': Field(bool, True, reloadable=False),
+    'WINDOW_BACKEND': Field(str, "pygetwindow", _one_of("pygetwindow", "x11"), reloadable=False),
+    'ENABLE_EXIT_EVENTS': Field(bool, True),
+    'ENABLE_WINDOW_EVENTS': Field(bool, True),
+
+    # Multi-instance supervisor
+    'INSTANCES': Field('instances', (), reloadable=False),
+}
+
+
+class Settings:
+    """Validated, read-only settings plus the structures derived from them"""
+
+    def __init__(self, values=None, path=None, mtime=None):
+        values = dict(values or {})
+        errors = []
+        converted = {}
+        for name, field in FIELDS.items():
+            try:
+                converted[name] = field.convert(values[name]) if name in values else field.default
+            except ValueError as e:
+                errors.append(f"{name} {e}")
+        if not errors:
+            errors.extend(self._cross_checks(converted))
+        if errors:
+            raise SettingsError(errors, path)
+
+        self.__dict__.update(converted)
+        self.__dict__.update(
+            path=path,
+            mtime=mtime,
+            unknown=tuple(sorted(name for name in values if name not in FIELDS)),
+            # Derived once per load instead of on every tick
+            process_names=tuple(name.lower() for name in converted['ROBLOX_PROCESS_NAMES']),
+            journal_file=app_path(converted['JOURNAL_FILE']),
+            daemon_socket=socket_path(converted['DAEMON_SOCKET']),
+            title_classifier=TitleClassifier(converted['ROBLOX_PATTERNS'], converted['DISCONNECT_INDICATORS'],
+                                             converted['TITLE_CACHE_SIZE']),
+        )
+
+    @staticmethod
+    def _cross_checks(values):
+        if values['MIN_CHECK_INTERVAL'] > values['MAX_CHECK_INTERVAL']:
+            yield "MIN_CHECK_INTERVAL must not be greater than MAX_CHECK_INTERVAL"
+        if values['DISCONNECT_CONFIRMATIONS'] > values['CONFIRMATION_WINDOW']:
+            yield "DISCONNECT_CONFIRMATIONS must not be greater than CONFIRMATION_WINDOW"
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are read-only; use replace()")
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def replace(self, **changes) -> 'Settings':
+        """A copy with some values changed (validated like a fresh load)"""
+        return Settings(dict(self.as_dict(), **changes), self.path, self.mtime)
+
+    def diff(self, other: 'Settings') -> list:
+        """Names whose values differ from other"""
+        return [name for name in FIELDS if getattr(self, name) != getattr(other, name)]
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_settings(path=CONFIG_FILE) -> Settings:
+    """Read and validate a config file; a missing file gives the defaults"""
+    mtime = _stat(path)
+    if mtime is None:
+        return Settings(path=None)
+    namespace = runpy.run_path(path)
+    values = {name: value for name, value in namespace.items() if name.isupper() and not name.startswith('_')}
+    return Settings(values, path, mtime)
+
+
+class SettingsWatcher:
+    """Polls a settings file's mtime and reloads it when it changes"""
+
+    def __init__(self, settings: Settings, clock, interval=2.0):
+        self.settings = settings
+        self.clock = clock
+        self.interval = interval
+        self.next_check = clock.time() + interval
+        self.reloads = 0
+        self.failures = 0
+        self._failed_mtime = None
+
+    def poll(self):
+        """Return newly loaded settings if the file changed, else None (at most once per interval)"""
+        now = self.clock.time()
+        if now < self.next_check or not self.settings.path:
+            return None
+        self.next_check = now + self.interval
+
+        mtime = _stat(self.settings.path)
+        if mtime is None or mtime == self.settings.mtime or mtime == self._failed_mtime:
+            return None
+
+        try:
+            loaded = load_settings(self.settings.path)
+        except SettingsError as e:
+            # Keep running on the last good settings until the file is fixed
+            self._failed_mtime = mtime
+            self.failures += 1
+            logger.error(f"{e}\nKeeping the previous settings")
+            return None
+        except Exception as e:
+            self._failed_mtime = mtime
+            self.failures += 1
+            logger.error(f"Could not reload {self.settings.path}: {e}")
+            return None
+
+        if loaded.unknown:
+            logger.warning(f"Unknown settings in {loaded.path} ignored: {', '.join(loaded.unknown)}")
+
+        # Settings read once at startup keep their running values
+        frozen = {name: getattr(self.settings, name) for name, field in FIELDS.items()
+                  if not field.reloadable and getattr(loaded, name) != getattr(self.settings, name)}
+        if frozen:
+            logger.warning(f"Restart to apply changes to: {', '.join(frozen)}")
+            loaded = loaded.replace(**frozen)
+
+        self.settings = loaded
+        self.reloads += 1
+        return loaded
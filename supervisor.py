@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Multi-instance supervisor for Roblox Anti-Leave
+Watches many Roblox clients, each pinned to its own private server, with one
+shared process/window scan per tick routed to per-instance state.
+"""
+
+import re
+import sys
+import logging
+from collections import deque
+from typing import List, Optional
+
+from main import (RobloxAntiLeave, RejoinAttempt, INSTANCES, METRICS_PORT,
+                  configure_logging, missing_dependencies, current_settings)
+from settings import SettingsError
+from window_tracker import WindowSnapshot
+from connection_state import ConnectionStateMachine, SUSPECT, CONNECTED as STATE_CONNECTED, \
+    EXITED, NO_PROCESS, NO_WINDOW, POPUP
+from journal import START, DETECT, RECONNECT_START, RECONNECT_FINISH, CONNECTED, STOP
+from metrics import TICK_SECONDS, DETECTIONS, RECONNECTS, SUPPRESSIONS, TRACKED_INSTANCES, start_server
+
+logger = logging.getLogger(__name__)
+
+
+class MonitoredInstance:
+    """One Roblox client and the private server it belongs to"""
+
+    def __init__(self, name: str, url: str, title_pattern: Optional[str] = None,
+                 pid: Optional[int] = None):
+        self.name = name
+        self.url = url
+        self.title_regex = re.compile(title_pattern, re.IGNORECASE) if title_pattern else None
+        self.pinned_pid = pid
+
+        # Per-instance connection state
+        self.pids = set()
+        self.connection = None  # ConnectionStateMachine, set by the supervisor
+        self.was_connected = True  # Assume connected when starting
+        self.reconnect_attempts = 0
+        self.consecutive_disconnects = 0
+        self.failed = False
+
+        # Readiness of the last relaunch
+        self.launch_time = None
+        self.rejoin_history = deque(maxlen=100)
+
+    @classmethod
+    def from_config(cls, index: int, entry: dict) -> 'MonitoredInstance':
+        return cls(entry.get('name') or f"instance{index + 1}",
+                   entry['url'],
+                   entry.get('title_pattern'),
+                   entry.get('pid'))
+
+    def owns_window(self, window) -> bool:
+        if window.pid is not None and window.pid in self.pids:
+            return True
+        return bool(self.title_regex and self.title_regex.search(window.title))
+
+
+class RobloxSupervisor(RobloxAntiLeave):
+    """Runs one shared probe per tick for many monitored instances"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances = []
+        self.pid_queue = []  # instances waiting to claim the next new Roblox PID
+        self.retired_pids = set()  # clients left behind by a relaunch, never reassigned
+
+    def add_instance(self, instance: MonitoredInstance):
+        settings = self.settings
+        instance.connection = ConnectionStateMachine(
+            self.clock, settings.DISCONNECT_CONFIRMATIONS, settings.CONFIRMATION_WINDOW,
+            settings.SIGNAL_WEIGHTS, settings.SIGNAL_THRESHOLD, self.disconnection_cooldown,
+            lambda previous, state, confirmed=True: self.on_instance_state(instance, state, confirmed))
+        self.instances.append(instance)
+        if instance.pinned_pid is None:
+            self.pid_queue.append(instance)
+
+    def assign_pids(self, live_pids: set, snapshot: WindowSnapshot):
+        """Route live Roblox PIDs to instances and drop the ones that exited"""
+        self.retired_pids &= live_pids
+        claimed = set(self.retired_pids)
+        for instance in self.instances:
+            instance.pids &= live_pids
+            claimed |= instance.pids
+
+        for pid in sorted(live_pids - claimed):
+            owner = next((i for i in self.instances if i.pinned_pid == pid), None)
+            if owner is None:
+                owner = next((i for i in self.instances if i.title_regex and
+                              any(w.pid == pid and i.title_regex.search(w.title)
+                                  for w in snapshot.roblox_windows)), None)
+            if owner is None and self.pid_queue:
+                owner = self.pid_queue.pop(0)
+            if owner is None:
+                continue
+            if owner in self.pid_queue:
+                self.pid_queue.remove(owner)
+            owner.pids.add(pid)
+            logger.info(f"[{owner.name}] Tracking Roblox process {pid}")
+
+    def check_instances(self, exited_pids=()) -> List[MonitoredInstance]:
+        """Probe once and return the instances that were disconnected"""
+        with TICK_SECONDS.time():
+            return self._check_instances(exited_pids)
+
+    def _check_instances(self, exited_pids) -> List[MonitoredInstance]:
+        self.reload_settings()
+        settings = self.settings
+        current_time = self.clock.time()
+
+        # One shared scan for every instance, on the probe workers when CONCURRENT_PROBES is on
+        running, snapshot, complete = self.run_probes()
+        windows_probed = snapshot is not None
+        if snapshot is None:
+            snapshot = WindowSnapshot([], [], 0)
+
+        # Instances whose own client just exited skip the cooldown
+        exited_instances = [i for i in self.instances if i.pids.intersection(exited_pids)]
+
+        # A process scan that timed out may still be rewriting the tracked PIDs, so keep each instance's as they were
+        if running is not None or not settings.ENABLE_PROCESS_MONITORING:
+            self.assign_pids(set(self.process_tracker.tracked), snapshot)
+        TRACKED_INSTANCES.set(sum(1 for instance in self.instances if instance.pids))
+        windows_attributable = any(w.pid is not None for w in snapshot.roblox_windows)
+        suspicious = bool(exited_instances or snapshot.roblox_changed or snapshot.disconnect_windows)
+
+        disconnected = []
+        for instance in self.instances:
+            if instance.failed:
+                continue
+
+            # The same weighted signals RobloxAntiLeave.check_connection feeds its state machine
+            signals = set()
+            if instance in exited_instances:
+                signals.add(EXITED)
+            if settings.ENABLE_PROCESS_MONITORING and running is not None and not instance.pids:
+                signals.add(NO_PROCESS)
+            popup = None
+            if windows_probed:
+                windows = [w for w in snapshot.roblox_windows if instance.owns_window(w)]
+                popup = next((w for w in snapshot.disconnect_windows if instance.owns_window(w)), None)
+                # Unattributable windows could belong to anyone, so only having none at all counts then
+                if not windows and (instance.title_regex is not None or windows_attributable or
+                                    not snapshot.roblox_windows):
+                    signals.add(NO_WINDOW)
+                elif popup is not None:
+                    signals.add(POPUP)
+
+            if instance.launch_time is not None:
+                ready = complete and not signals.intersection((NO_PROCESS, NO_WINDOW, POPUP))
+                self.check_rejoin(instance, ready, current_time)
+
+            if not signals and complete and not instance.connection.cooling_down():
+                if not instance.was_connected and instance.launch_time is None:
+                    self.journal.record(CONNECTED, instance.url, instance=instance.name)
+                instance.was_connected = True
+                instance.consecutive_disconnects = 0
+            suspicious = suspicious or instance.connection.state == SUSPECT
+
+            if not instance.connection.observe(signals):
+                continue
+
+            kind = 'popup' if instance.connection.reason == POPUP else 'closed'
+            if kind == 'popup':
+                title = popup.title if popup is not None else ''
+                logger.info(f"[{instance.name}] Disconnection detected: disconnection message in window: {title}")
+            else:
+                logger.info(f"[{instance.name}] Disconnection detected: Roblox was running but now stopped/closed")
+            DETECTIONS.inc(reason=kind)
+            self.journal.record(DETECT, instance.url, instance=instance.name, reason=kind,
+                                exited=(EXITED in instance.connection.signals) or None)
+            instance.was_connected = False
+            instance.consecutive_disconnects += 1
+            disconnected.append(instance)
+
+        self.scheduler.observe(suspicious or bool(disconnected))
+        return disconnected
+
+    def on_instance_state(self, instance: MonitoredInstance, state: str, confirmed: bool = True):
+        """Log one instance's state machine transitions worth knowing about"""
+        connection = instance.connection
+        if state == SUSPECT:
+            logger.info(f"[{instance.name}] Possible disconnection ({', '.join(sorted(connection.signals))}), "
+                        f"waiting for {connection.confirmations} of {connection.window} probes to confirm")
+        elif state == STATE_CONNECTED and not confirmed:
+            logger.info(f"[{instance.name}] Disconnect signals were not confirmed, still connected")
+            SUPPRESSIONS.inc(reason='unconfirmed')
+
+    def apply_settings(self, settings):
+        """Point the supervisor and every instance's state machine at new settings"""
+        super().apply_settings(settings)
+        for instance in self.instances:
+            instance.connection.configure(settings.DISCONNECT_CONFIRMATIONS, settings.CONFIRMATION_WINDOW,
+                                          settings.SIGNAL_WEIGHTS, settings.SIGNAL_THRESHOLD,
+                                          self.disconnection_cooldown)
+
+    def check_rejoin(self, instance: MonitoredInstance, ready: bool, current_time: float):
+        """Record time-to-rejoin once a relaunched instance is back, or give up at the deadline"""
+        elapsed = current_time - instance.launch_time
+        if not ready and elapsed < self.rejoin_timeout:
+            return
+
+        instance.rejoin_history.append(RejoinAttempt(instance.reconnect_attempts, instance.url,
+                                                     instance.launch_time, elapsed, ready))
+        instance.launch_time = None
+        instance.connection.rejoined()
+        RECONNECTS.inc(outcome='rejoined' if ready else 'timeout')
+        self.journal.record(RECONNECT_FINISH, instance.url, instance=instance.name, ok=ready,
+                            secs=round(elapsed, 3), attempt=instance.reconnect_attempts)
+        if ready:
+            logger.info(f"[{instance.name}] Rejoined in {elapsed:.1f}s")
+            instance.was_connected = True
+        else:
+            logger.warning(f"[{instance.name}] Roblox did not come back within {elapsed:.1f}s")
+
+    def reconnect_instance(self, instance: MonitoredInstance) -> bool:
+        """Relaunch one instance's private server without blocking the others"""
+        if instance.reconnect_attempts >= self.max_reconnect_attempts:
+            logger.error(f"[{instance.name}] Max reconnection attempts ({self.max_reconnect_attempts}) reached")
+            self.send_notification("Roblox Anti-Leave",
+                                   f"{instance.name}: max reconnection attempts reached. Giving up on this instance.")
+            instance.failed = True
+            RECONNECTS.inc(outcome='gave_up')
+            self.journal.record(STOP, instance.url, instance=instance.name, reason='gave_up')
+            if instance in self.pid_queue:
+                self.pid_queue.remove(instance)
+            return False
+
+        try:
+            logger.info(f"[{instance.name}] Attempting reconnection (attempt {instance.reconnect_attempts + 1})")
+            url = self.normalize_roblox_url(instance.url)
+            logger.info(f"[{instance.name}] Reconnecting to: {url}")
+            self.launcher.open_url(url)
+        except Exception as e:
+            logger.error(f"[{instance.name}] Error during reconnection: {e}")
+            instance.connection.reconnecting()
+            instance.connection.rejoined()
+            RECONNECTS.inc(outcome='failed')
+            self.journal.record(RECONNECT_FINISH, instance.url, instance=instance.name, ok=False, error=str(e))
+            return False
+
+        instance.reconnect_attempts += 1
+        RECONNECTS.inc(outcome='launched')
+        self.journal.record(RECONNECT_START, instance.url, instance=instance.name,
+                            attempt=instance.reconnect_attempts)
+        self.retired_pids |= instance.pids
+        instance.pids.clear()
+        instance.launch_time = self.clock.time()
+        # Probes of this instance are ignored until the cooldown after the launch has passed
+        instance.connection.reconnecting()
+        if instance not in self.pid_queue:
+            self.pid_queue.append(instance)
+
+        # The relaunched client gets a new PID, and should be watched closely
+        self.process_tracker.expect_new_instance()
+        self.scheduler.on_reconnect()
+        return True
+
+    def start_monitoring(self, instances: List[MonitoredInstance]):
+        """Monitor every instance until stopped or all of them give up"""
+        self.instances = []
+        self.pid_queue = []
+        self.retired_pids = set()
+        for instance in instances:
+            self.add_instance(instance)
+        self.monitoring = True
+        self.process_tracker.reset()
+
+        logger.info(f"Starting supervisor for {len(self.instances)} instance(s)...")
+        for instance in self.instances:
+            logger.info(f"[{instance.name}] Monitoring private server: {instance.url}")
+            self.journal.record(START, instance.url, instance=instance.name)
+        self.send_notification("Roblox Anti-Leave", f"Supervising {len(self.instances)} instance(s)")
+
+        exited = []
+        try:
+            while self.monitoring:
+                for instance in self.check_instances(exited):
+                    self.send_notification("Roblox Anti-Leave",
+                                           f"{instance.name}: disconnection detected! Attempting to reconnect...")
+                    self.reconnect_instance(instance)
+
+                if all(instance.failed for instance in self.instances):
+                    logger.error("Every instance has given up. Stopping supervisor.")
+                    break
+
+                exited = self.wait_for_next_check()
+
+        except KeyboardInterrupt:
+            logger.info("Supervisor stopped by user")
+        except Exception as e:
+            logger.error(f"Error during supervision: {e}")
+        finally:
+            self.monitoring = False
+            if self.clipboard_watcher:
+                self.clipboard_watcher.stop()
+            for instance in self.instances:
+                if not instance.failed:
+                    self.journal.record(STOP, instance.url, instance=instance.name)
+            self.journal.close()
+            if self.trace_recorder:
+                self.trace_recorder.close()
+            self.exit_watcher.close()
+            self.probe_runner.close()
+            self.notifications.close()
+            logger.info("Supervisor stopped")
+
+
+def main():
+    """Main function"""
+    print("Roblox Anti-Leave Supervisor")
+    print("=" * 30)
+
+    try:
+        current_settings()
+    except SettingsError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if not INSTANCES:
+        print("No instances configured. Add entries to INSTANCES in config.py.")
+        return
+
+    missing = missing_dependencies()
+    if missing:
+        print(f"Missing required library: {', '.join(missing)}")
+        print("Please install required packages:")
+        print("pip install -r requirements.txt")
+        sys.exit(1)
+
+    configure_logging()
+    supervisor = RobloxSupervisor()
+
+    instances = []
+    for index, entry in enumerate(INSTANCES):
+        instance = MonitoredInstance.from_config(index, entry)
+        if not supervisor.is_valid_roblox_url(instance.url):
+            print(f"Error: Invalid URL for {instance.name}: {instance.url}")
+            print("Only private server URLs are supported:")
+            print("- https://www.roblox.com/share?code=CODE&type=Server")
+            return
+        instances.append(instance)
+
+    start_server(METRICS_PORT)
+    print(f"Supervising {len(instances)} instance(s)")
+    print("Press Ctrl+C to stop")
+    supervisor.start_monitoring(instances)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from clipboard_watcher import ClipboardWatcher
+
+URL = "https://www.roblox.com/share?code=AAA&type=Server"
+
+
+class BlockingClipboard:
+    """Clipboard without a change counter whose reads can be held up, like a slow xclip"""
+
+    def __init__(self):
+        self.text = ""
+        self.pastes = 0
+        self.released = threading.Event()
+        self.released.set()
+
+    def change_count(self):
+        return None
+
+    def paste(self):
+        self.pastes += 1
+        self.released.wait(5)
+        return self.text
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_backs_off_while_the_clipboard_is_unchanged():
+    clipboard = BlockingClipboard()
+    watcher = ClipboardWatcher(clipboard, lambda url: url == URL, interval=1, max_interval=8)
+    delays = [watcher.next_delay(watcher.poll()) for _ in range(5)]
+    assert delays == [1, 2, 4, 8, 8]
+    clipboard.text = URL
+    assert watcher.next_delay(watcher.poll()) == 1
+    assert watcher.current_url() == URL
+
+
+def test_current_url_never_reads_the_clipboard():
+    clipboard = BlockingClipboard()
+    watcher = ClipboardWatcher(clipboard, lambda url: url == URL, interval=0.01, max_interval=10)
+    watcher.start()
+    try:
+        assert wait_until(lambda: watcher.delay >= 0.16)
+        clipboard.released.clear()  # the next read hangs
+        clipboard.text = URL
+        watcher.refresh()
+        assert wait_until(lambda: not clipboard.released.is_set() and clipboard.pastes > 0)
+        pastes = clipboard.pastes
+        started = time.perf_counter()
+        assert watcher.current_url() is None
+        assert time.perf_counter() - started < 0.1
+        assert clipboard.pastes == pastes
+        clipboard.released.set()
+        assert wait_until(lambda: watcher.current_url() == URL)
+    finally:
+        clipboard.released.set()
+        watcher.stop()
+
+
+def test_refresh_polls_without_waiting_out_the_delay():
+    clipboard = BlockingClipboard()
+    watcher = ClipboardWatcher(clipboard, lambda url: url == URL, interval=5, max_interval=60)
+    watcher.start()
+    try:
+        assert wait_until(lambda: clipboard.pastes >= 1)
+        clipboard.text = URL
+        watcher.refresh()
+        assert wait_until(lambda: watcher.current_url() == URL, timeout=1.0)
+    finally:
+        watcher.stop()
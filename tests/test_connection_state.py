@@ -0,0 +1,104 @@
+from backends import FakeClock, FakeWindowBackend, FakeProcessBackend, FakeClipboard, FakeLauncher, FakeNotifier
+from connection_state import (ConnectionStateMachine, CONNECTED, SUSPECT, DISCONNECTED, RECONNECTING, COOLDOWN,
+                              EXITED, NO_PROCESS, NO_WINDOW, POPUP)
+
+
+def make(clock=None, **kwargs):
+    transitions = []
+    machine = ConnectionStateMachine(clock or FakeClock(), on_transition=lambda previous, state, **info:
+                                     transitions.append((previous, state, info)), **kwargs)
+    return machine, transitions
+
+
+def test_one_odd_probe_is_not_a_disconnect():
+    machine, transitions = make(confirmations=2, window=3)
+    assert not machine.observe({NO_WINDOW})
+    assert machine.state == SUSPECT
+    assert not machine.observe(set())
+    assert not machine.observe(set())
+    assert not machine.observe(set())
+    # The vote aged out of the window unconfirmed
+    assert machine.state == CONNECTED
+    assert transitions[-1] == (SUSPECT, CONNECTED, {'confirmed': False})
+
+
+def test_two_of_three_probes_confirm():
+    machine, _ = make(confirmations=2, window=3)
+    assert not machine.observe({POPUP})
+    assert not machine.observe(set())
+    assert machine.observe({POPUP})
+    assert machine.state == DISCONNECTED
+    assert machine.reason == POPUP
+
+
+def test_overwhelming_evidence_confirms_at_once():
+    machine, _ = make(confirmations=2, window=3)
+    assert machine.observe({NO_PROCESS, NO_WINDOW})
+    assert machine.reason == NO_PROCESS
+
+
+def test_weights_below_the_threshold_need_backing_up():
+    machine, _ = make(confirmations=1, window=1, weights={NO_WINDOW: 0.5})
+    assert not machine.observe({NO_WINDOW})
+    assert machine.state == CONNECTED
+    assert machine.observe({NO_WINDOW, POPUP})
+
+
+def test_probes_are_ignored_until_the_cooldown_after_a_reconnect():
+    clock = FakeClock()
+    machine, _ = make(clock, confirmations=1, window=1, cooldown=30)
+    assert machine.observe({NO_PROCESS})
+    machine.reconnecting()
+    assert machine.state == RECONNECTING
+    assert not machine.observe({NO_PROCESS})
+    machine.rejoined()
+    assert machine.state == COOLDOWN
+    clock.sleep(29)
+    assert not machine.observe({NO_PROCESS})
+    clock.sleep(2)
+    assert machine.observe({NO_PROCESS})
+
+
+def test_exited_client_cuts_the_cooldown_short():
+    clock = FakeClock()
+    machine, _ = make(clock, confirmations=1, window=1, cooldown=30)
+    machine.reconnecting()
+    machine.rejoined()
+    assert machine.observe({EXITED})
+    assert machine.reason == EXITED
+
+
+def test_configure_keeps_recent_votes():
+    machine, _ = make(confirmations=3, window=3)
+    machine.observe({POPUP})
+    machine.configure(2, 3)
+    assert machine.observe({POPUP})
+
+
+def test_monitor_ignores_a_single_missed_window():
+    import main
+
+    windows = FakeWindowBackend()
+    processes = FakeProcessBackend()
+    pid = processes.spawn("RobloxPlayerBeta.exe")
+    handle = windows.open_window("Roblox", pid)
+    checks = []
+
+    def on_sleep(clock):
+        checks.append(clock.now)
+        if len(checks) == 2:
+            windows.close_window(handle)  # the window manager drops the window for one listing
+        elif len(checks) == 3:
+            windows.open_window("Roblox", pid)
+        if len(checks) > 10:
+            anti_leave.monitoring = False
+
+    settings = main.SETTINGS.replace(DISCONNECT_CONFIRMATIONS=2, CONFIRMATION_WINDOW=3,
+                                     ENABLE_CLIPBOARD_DETECTION=False)
+    launcher = FakeLauncher()
+    anti_leave = main.RobloxAntiLeave(windows, processes, FakeClipboard(), launcher, FakeNotifier(),
+                                      FakeClock(0, on_sleep), settings)
+    anti_leave.start_monitoring("https://www.roblox.com/share?code=AAA&type=Server")
+
+    assert launcher.opened == []
+    assert anti_leave.connection.state == CONNECTED
@@ -0,0 +1,134 @@
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backends import FakeWindowBackend, FakeProcessBackend, FakeClipboard, FakeLauncher, FakeNotifier, FakeClock
+from connection_state import CONNECTED
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="control API tests use a Unix socket")
+
+URL = "https://www.roblox.com/share?code=AAA&type=Server"
+
+
+def fake_monitor():
+    """A monitor with one healthy Roblox client, checking every few milliseconds of real time"""
+    import main
+
+    windows, processes = FakeWindowBackend(), FakeProcessBackend()
+    windows.open_window("Roblox", processes.spawn("RobloxPlayerBeta.exe"))
+    settings = main.SETTINGS.replace(ENABLE_CLIPBOARD_DETECTION=False)
+    return main.RobloxAntiLeave(windows, processes, FakeClipboard(), FakeLauncher(), FakeNotifier(),
+                                FakeClock(0, lambda clock: time.sleep(0.005)), settings)
+
+
+def wait_for_status(client, predicate, timeout=5.0):
+    """Poll status until predicate(status) holds; the monitor comes up on its own thread"""
+    deadline = time.monotonic() + timeout
+    status = client.status()
+    while not predicate(status) and time.monotonic() < deadline:
+        time.sleep(0.01)
+        status = client.status()
+    return status
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """A control server on its own event loop thread; yields (service, client)"""
+    from daemon import MonitorService, ControlServer, DaemonClient
+
+    service = MonitorService(factory=fake_monitor)
+    server = ControlServer(service, path=str(tmp_path / 'daemon.sock'))
+    ready = threading.Event()
+    tasks = []
+
+    async def serve():
+        tasks.append(asyncio.current_task())
+        await server.serve(ready)
+
+    def run():
+        try:
+            asyncio.run(serve())
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield service, DaemonClient(server.path)
+
+    service.stop()
+    server.loop.call_soon_threadsafe(tasks[0].cancel)
+    thread.join(5)
+    assert not (tmp_path / 'daemon.sock').exists()
+
+
+def test_start_status_stop(daemon):
+    service, client = daemon
+    assert client.available()
+    assert client.status()['running'] is False
+
+    assert client.start(URL)['running'] is True
+    status = wait_for_status(client, lambda status: status['tracked_pids'])
+    assert status['url'] == URL
+    assert status['state'] == CONNECTED
+    assert status['tracked_pids'] == [1000]
+    assert status['notifications']['failed'] == 0
+
+    assert client.stop()['running'] is False
+    assert not service.engine.running
+
+
+def test_start_rejects_invalid_url_with_invalid_params(daemon):
+    from daemon import RpcError, INVALID_PARAMS
+
+    service, client = daemon
+    with pytest.raises(RpcError) as error:
+        client.start("https://example.com/not-roblox")
+    assert error.value.code == INVALID_PARAMS
+    assert client.status()['running'] is False
+
+
+def test_events_stream_start_and_stop(daemon):
+    service, client = daemon
+    stop = threading.Event()
+    events = []
+
+    def follow():
+        for event in client.events(stop):
+            events.append(event)
+            if event.get('ev') == 'stop':
+                return
+
+    follower = threading.Thread(target=follow, daemon=True)
+    follower.start()
+    deadline = time.monotonic() + 5
+    while not service.listeners and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert service.listeners
+
+    client.start(URL)
+    client.stop()
+    follower.join(5)
+    stop.set()
+    kinds = [event['ev'] for event in events if event['ev'] != 'log']
+    assert kinds[0] == 'start' and kinds[-1] == 'stop'
+
+
+def test_concurrent_status_calls(daemon):
+    from daemon import DaemonClient
+
+    service, client = daemon
+    client.start(URL)
+    wait_for_status(client, lambda status: status['url'])
+
+    def status(_):
+        return DaemonClient(client.path).status()
+
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        replies = list(pool.map(status, range(200)))
+    assert len(replies) == 200
+    assert all(reply['running'] and reply['url'] == URL for reply in replies)
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from backends import FakeWindowBackend, FakeProcessBackend, FakeClipboard, FakeLauncher, FakeNotifier, FakeClock
+
+
+class StuckWindowBackend(FakeWindowBackend):
+    """Event-driven window backend whose listing blocks until released, like a hung window manager"""
+
+    def __init__(self, titles=None):
+        super().__init__(titles)
+        self.release = threading.Event()
+        self.polled = 0
+
+    def list_windows(self):
+        self.release.wait()
+        return super().list_windows()
+
+    def pending_changes(self):
+        self.polled += 1
+        return True
+
+    def fileno(self):
+        return None
+
+
+class StuckProcessBackend(FakeProcessBackend):
+    def __init__(self, names=None):
+        super().__init__(names)
+        self.release = threading.Event()
+
+    def list_processes(self):
+        self.release.wait()
+        return super().list_processes()
+
+
+@pytest.fixture
+def monitor():
+    import main
+
+    def build(windows, processes):
+        settings = main.SETTINGS.replace(CONCURRENT_PROBES=True, PROBE_TIMEOUT=0.05, ENABLE_CLIPBOARD_DETECTION=False)
+        anti_leave = main.RobloxAntiLeave(windows, processes, FakeClipboard(), FakeLauncher(), FakeNotifier(),
+                                          FakeClock(0), settings)
+        built.append(anti_leave)
+        return anti_leave
+
+    built = []
+    yield build
+    for anti_leave in built:
+        for backend in (anti_leave.window_backend, anti_leave.process_backend):
+            if hasattr(backend, 'release'):
+                backend.release.set()
+        anti_leave.probe_runner.close()
+
+
+def test_event_refresh_is_skipped_while_the_window_probe_hangs(monitor):
+    windows = StuckWindowBackend(["Roblox"])
+    anti_leave = monitor(windows, FakeProcessBackend(["RobloxPlayerBeta.exe"]))
+
+    running, snapshot, complete = anti_leave.run_probes()
+    assert snapshot is None and not complete
+    assert anti_leave.probe_runner.outstanding('windows')
+    # Would block on the tracker behind the stuck snapshot
+    assert not anti_leave.window_classification_changed()
+    assert windows.polled == 0
+
+    windows.release.set()
+    anti_leave.probe_runner.workers['windows'].submit(lambda: None).result(1)
+    assert not anti_leave.probe_runner.outstanding('windows')
+    windows.set_title(1, "Disconnected - Roblox")
+    assert anti_leave.window_classification_changed()
+
+
+def test_rejoin_ready_scans_processes_through_the_probe_runner(monitor):
+    processes = StuckProcessBackend()
+    anti_leave = monitor(FakeWindowBackend(), processes)
+    processes.spawn("RobloxPlayerBeta.exe")
+    anti_leave.window_backend.open_window("Roblox", 1000)
+
+    assert not anti_leave.rejoin_ready()
+    assert anti_leave.probe_runner.outstanding('processes')
+    assert not anti_leave.rejoin_ready()  # no second scan queued behind the stuck one
+    assert processes.calls == 0
+
+    processes.release.set()
+    anti_leave.probe_runner.workers['processes'].submit(lambda: None).result(1)
+    assert anti_leave.rejoin_ready()
+    assert processes.calls == 2
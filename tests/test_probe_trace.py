@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from backends import FakeClock, FakeWindowBackend, FakeProcessBackend
+from classifier import TitleClassifier
+from probe_trace import (TraceRecorder, RecordingWindowBackend, RecordingProcessBackend, TraceSource, match_times,
+                         replay)
+
+ROBLOX = [0, {'p+': [[10, 'RobloxPlayerBeta.exe']], 'p-': []}, {'w+': [[1, 'Roblox', 10]], 'w-': []}]
+# Fixed one-second polling, so detection times are predictable
+FAST = {'ADAPTIVE_POLLING': False, 'CHECK_INTERVAL': 1, 'POLL_JITTER': 0}
+
+
+def write_trace(path, *entries):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'trace': 1, 'start': 1000.0, 'process_names': ['robloxplayerbeta.exe']}) + '\n')
+        for t, *changes in entries:
+            for change in changes:
+                f.write(json.dumps(dict(t=t, **change)) + '\n')
+    return str(path)
+
+
+def read_source(path, **kwargs):
+    source = TraceSource(path, **kwargs)
+    source.advance(float('inf'))
+    return source
+
+
+@pytest.fixture
+def classify():
+    return TitleClassifier(["roblox"], ["disconnected", "kicked"]).classify
+
+
+def score(result):
+    return {key: result[key] for key in ('disconnects', 'detected', 'missed', 'false_positives',
+                                         'agreed_with_live', 'replay_only', 'live_only')}
+
+
+def test_recorder_writes_deltas_one_file_per_session(tmp_path):
+    clock = FakeClock(1000)
+    recorder = TraceRecorder(str(tmp_path / "trace.jsonl"), clock, ['robloxplayerbeta.exe'])
+    windows = RecordingWindowBackend(FakeWindowBackend(["Roblox"]), recorder)
+    processes = RecordingProcessBackend(FakeProcessBackend(["RobloxPlayerBeta.exe"]), recorder)
+
+    windows.list_windows()
+    processes.list_processes()
+    clock.sleep(5)
+    windows.list_windows()  # unchanged: nothing written
+    windows.inner.set_title(1, "Disconnected")
+    windows.list_windows()
+    recorder.mark('reconnect', url=None)
+    recorder.close()
+    first = recorder.session_file
+
+    windows.list_windows()
+    recorder.close()
+
+    assert recorder.session_file != first
+    lines = [json.loads(line) for line in open(first, encoding='utf-8')]
+    assert lines[0]['start'] == 1000
+    assert [line.get('w+') for line in lines[1:]] == [[[1, 'Roblox', None]], None, [[1, 'Disconnected', None]], None]
+    assert lines[-1] == {'t': 5.0, 'mark': 'reconnect', 'url': None}
+
+
+def test_losing_the_last_client_is_a_disconnect(tmp_path):
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX, [50, {'p+': [], 'p-': [10]}])
+    assert read_source(path).labels == [50]
+
+
+def test_popup_and_live_reconnect_are_one_disconnect(tmp_path, classify):
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX,
+                       [100, {'w+': [[2, 'Disconnected - Roblox', 10]], 'w-': []}],
+                       [103, {'mark': 'reconnect', 'url': None}],
+                       [104, {'p+': [], 'p-': [10]}])
+    assert read_source(path, classify=classify).labels == [100]
+
+
+def test_popups_are_only_labels_with_a_classifier(tmp_path):
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX, [100, {'w+': [[2, 'Disconnected - Roblox', 10]], 'w-': []}])
+    assert read_source(path).labels == []
+
+
+def test_live_reconnect_without_evidence_is_a_label(tmp_path, classify):
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX, [100, {'mark': 'reconnect', 'url': None}])
+    assert read_source(path, classify=classify).labels == [100]
+
+
+def test_evidence_after_the_window_is_a_new_disconnect(tmp_path, classify):
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX,
+                       [100, {'mark': 'disconnect'}],
+                       [300, {'mark': 'disconnect'}])
+    assert read_source(path, classify=classify, label_window=120).labels == [100, 300]
+
+
+def test_match_times_pairs_nearest_within_the_window():
+    assert match_times([10, 50, 200], [12, 49], 5) == [(10, 12), (50, 49)]
+    assert match_times([10, 11], [10.5], 5) == [(10, 10.5)]
+
+
+def test_replay_detects_a_popup_and_agrees_with_the_live_run(tmp_path):
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX,
+                       [100, {'w+': [[2, 'Disconnected - Roblox', 10]], 'w-': []}],
+                       [103, {'mark': 'reconnect', 'url': None}],
+                       [104, {'w+': [], 'w-': [2]}],
+                       [300, {'w+': [[3, 'Notepad', None]], 'w-': []}])
+    result = replay(path, overrides=FAST)
+    assert score(result) == {'disconnects': 1, 'detected': 1, 'missed': 0, 'false_positives': 0,
+                             'agreed_with_live': 1, 'replay_only': 0, 'live_only': 0}
+    assert 0 <= result['latency_max'] <= 3
+
+
+def test_replay_confirms_a_disconnect_at_the_end_of_the_trace(tmp_path):
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX, [200, {'p+': [], 'p-': [10]}, {'w+': [], 'w-': [1]}])
+    result = replay(path, overrides=FAST)
+    assert score(result)['detected'] == 1
+    assert result['false_positives'] == 0
+    assert len(result['decisions']) == 1
+
+
+def test_replay_counts_a_popup_gone_before_the_next_check_as_missed(tmp_path):
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX,
+                       [100.2, {'w+': [[2, 'Disconnected - Roblox', 10]], 'w-': []}],
+                       [100.4, {'w+': [], 'w-': [2]}],
+                       [103, {'mark': 'reconnect', 'url': None}],
+                       [300, {'w+': [[3, 'Notepad', None]], 'w-': []}])
+    result = replay(path, overrides=FAST)
+    assert score(result) == {'disconnects': 1, 'detected': 0, 'missed': 1, 'false_positives': 0,
+                             'agreed_with_live': 0, 'replay_only': 0, 'live_only': 1}
+
+
+def test_replay_reports_false_positives(tmp_path):
+    # The window manager loses the Roblox window for a moment; the client never went anywhere
+    path = write_trace(tmp_path / "t.jsonl", ROBLOX,
+                       [100, {'w+': [], 'w-': [1]}],
+                       [100.5, {'w+': [[1, 'Roblox', 10]], 'w-': []}],
+                       [300, {'w+': [[3, 'Notepad', None]], 'w-': []}])
+    strict = replay(path, overrides=dict(FAST, DISCONNECT_CONFIRMATIONS=1, CONFIRMATION_WINDOW=1))
+    assert strict['disconnects'] == 0
+    assert strict['false_positives'] == 1
+    assert strict['false_positive_reasons'] == ['closed']
+    assert strict['replay_only'] == 1
+    debounced = replay(path, overrides=dict(FAST, DISCONNECT_CONFIRMATIONS=2, CONFIRMATION_WINDOW=3))
+    assert debounced['false_positives'] == 0
@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+from backends import ProcfsProcessBackend
+
+linux_only = pytest.mark.skipif(not ProcfsProcessBackend.available(), reason="needs Linux /proc")
+
+
+def make_process(root, pid, comm, starttime, cmdline=None):
+    path = os.path.join(root, str(pid))
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, 'stat'), 'w') as f:
+        f.write(f"{pid} ({comm}) S 1 {pid} {pid} 0 -1 4194304 " + "0 " * 12 + f"{starttime} " + "0 " * 30 + "\n")
+    with open(os.path.join(path, 'cmdline'), 'w') as f:
+        f.write((cmdline or comm) + '\0')
+
+
+def names(backend):
+    return {process.pid: process.name for process in backend.list_processes()}
+
+
+def wait_for_name(backend, pid, name, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if names(backend).get(pid) == name:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_truncated_comm_uses_the_command_line(tmp_path):
+    make_process(tmp_path, 10, "RobloxPlayerBet", 100, r"C:\Roblox\Versions\v1\RobloxPlayerBeta.exe")
+    make_process(tmp_path, 11, "bash", 100)
+    assert names(ProcfsProcessBackend(str(tmp_path))) == {10: "RobloxPlayerBeta.exe", 11: "bash"}
+
+
+def test_steady_listing_reads_one_file_per_process(tmp_path):
+    make_process(tmp_path, 10, "RobloxPlayerBet", 100, "RobloxPlayerBeta.exe")
+    make_process(tmp_path, 11, "bash", 100)
+    backend = ProcfsProcessBackend(str(tmp_path))
+    backend.list_processes()
+    backend.reads = 0
+    backend.list_processes()
+    assert backend.reads == 2
+
+
+def test_reused_pid_is_read_again(tmp_path):
+    make_process(tmp_path, 10, "RobloxPlayerBet", 100, "RobloxPlayerBeta.exe")
+    backend = ProcfsProcessBackend(str(tmp_path))
+    assert names(backend) == {10: "RobloxPlayerBeta.exe"}
+    # Same PID and comm, but a different process: the start time gives it away
+    make_process(tmp_path, 10, "RobloxPlayerBet", 200, "RobloxPlayerBeta-old.exe")
+    assert names(backend) == {10: "RobloxPlayerBeta-old.exe"}
+
+
+def test_exited_process_is_dropped(tmp_path):
+    make_process(tmp_path, 10, "bash", 100)
+    make_process(tmp_path, 11, "sshd", 100)
+    backend = ProcfsProcessBackend(str(tmp_path))
+    names(backend)
+    for name in os.listdir(tmp_path / "11"):
+        os.unlink(tmp_path / "11" / name)
+    os.rmdir(tmp_path / "11")
+    assert names(backend) == {10: "bash"}
+
+
+@linux_only
+def test_renamed_child_process_is_seen():
+    child = subprocess.Popen([sys.executable, '-c',
+                              "import sys\n"
+                              "sys.stdin.readline()\n"
+                              "open('/proc/self/comm', 'w').write('RobloxPlayer')\n"
+                              "sys.stdin.readline()\n"],
+                             stdin=subprocess.PIPE, text=True)
+    try:
+        backend = ProcfsProcessBackend()
+        assert names(backend)[child.pid] != "RobloxPlayer"
+        child.stdin.write("\n")
+        child.stdin.flush()
+        assert wait_for_name(backend, child.pid, "RobloxPlayer")
+    finally:
+        child.kill()
+        child.wait()
+
+
+@linux_only
+def test_exec_in_place_is_seen():
+    child = subprocess.Popen(['sh', '-c', 'read line; exec sleep 30'], stdin=subprocess.PIPE, text=True)
+    try:
+        backend = ProcfsProcessBackend()
+        assert names(backend)[child.pid] == "sh"
+        child.stdin.write("\n")
+        child.stdin.flush()
+        assert wait_for_name(backend, child.pid, "sleep")
+    finally:
+        child.kill()
+        child.wait()
@@ -0,0 +1,64 @@
+import random
+
+from backends import FakeClock
+from scheduler import AdaptiveScheduler
+
+
+def make(clock=None, **kwargs):
+    options = dict(base_interval=5, min_interval=1, max_interval=30, backoff=2, jitter=0.0, fast_window=60)
+    options.update(kwargs)
+    return AdaptiveScheduler(clock or FakeClock(), **options)
+
+
+def test_backs_off_to_the_ceiling_while_steady():
+    scheduler = make()
+    intervals = []
+    for _ in range(6):
+        scheduler.observe(False)
+        intervals.append(scheduler.next_interval())
+    assert intervals == [10, 20, 30, 30, 30, 30]
+
+
+def test_suspicious_check_drops_to_the_floor():
+    scheduler = make()
+    for _ in range(5):
+        scheduler.observe(False)
+    scheduler.observe(True)
+    assert scheduler.next_interval() == 1
+
+
+def test_polls_fast_for_the_window_after_a_reconnect():
+    clock = FakeClock()
+    scheduler = make(clock)
+    scheduler.on_reconnect()
+    clock.sleep(59)
+    scheduler.observe(False)
+    assert scheduler.next_interval() == 1
+    clock.sleep(2)
+    scheduler.observe(False)
+    assert scheduler.next_interval() == 2
+
+
+def test_jitter_stays_within_its_fraction():
+    scheduler = make(jitter=0.1, rng=random.Random(1))
+    waits = [scheduler.next_interval() for _ in range(200)]
+    assert all(4.5 <= wait <= 5.5 for wait in waits)
+    assert len(set(waits)) > 1
+
+
+def test_configure_clamps_the_current_interval():
+    scheduler = make()
+    for _ in range(5):
+        scheduler.observe(False)
+    scheduler.configure(5, 1, 10, 2)
+    assert scheduler.next_interval() == 10
+
+
+def test_stats_average_the_waits():
+    scheduler = make()
+    scheduler.next_interval()
+    scheduler.observe(False)
+    scheduler.next_interval()
+    stats = scheduler.stats()
+    assert stats['checks'] == 2
+    assert stats['mean_interval'] == 7.5
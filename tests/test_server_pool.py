@@ -0,0 +1,88 @@
+from backends import FakeWindowBackend, FakeProcessBackend, FakeClipboard, FakeLauncher, FakeNotifier, FakeClock
+from server_pool import ServerPool, parse_server_url
+
+A = "https://www.roblox.com/share?code=AAA&type=Server"
+B = "https://www.roblox.com/share?code=BBB&type=Server"
+C = "https://www.roblox.com/share?code=CCC&type=Server"
+
+
+def test_parse_server_url_canonicalizes_share_links():
+    assert parse_server_url("roblox.com/share?type=server&code=AAA").url == A
+    assert parse_server_url("https://web.roblox.com/share/?code=AAA&type=Server").code == "AAA"
+    assert parse_server_url("https://www.roblox.com/games/123") is None
+    assert parse_server_url("https://evil.example/share?code=AAA&type=Server") is None
+    assert parse_server_url("https://www.roblox.com/share?code=AAA&type=Profile") is None
+
+
+def test_add_is_once_per_share_code():
+    pool = ServerPool([A, B])
+    assert pool.add("roblox.com/share?code=AAA&type=Server").url == A
+    assert len(pool) == 2
+    assert pool.current.code == "AAA"
+
+
+def test_stays_on_the_current_server_below_the_failover_threshold():
+    pool = ServerPool([A, B], failover_after=2)
+    pool.record(pool.choose(), False, 60)
+    assert pool.choose().code == "AAA"
+
+
+def test_fails_over_after_consecutive_failures():
+    pool = ServerPool([A, B], failover_after=2)
+    pool.record(pool.choose(), False, 60)
+    pool.record(pool.choose(), False, 60)
+    assert pool.choose().code == "BBB"
+
+
+def test_a_success_resets_the_failure_streak():
+    pool = ServerPool([A, B], failover_after=2)
+    pool.record(pool.choose(), False, 60)
+    pool.record(pool.choose(), True, 10)
+    pool.record(pool.choose(), False, 60)
+    assert pool.choose().code == "AAA"
+
+
+def test_fails_over_to_the_best_scoring_backup():
+    pool = ServerPool([A, B, C], failover_after=1, rejoin_timeout=60)
+    servers = {server.code: server for server in pool.servers}
+    pool.record(servers["BBB"], True, 50)
+    pool.record(servers["CCC"], True, 5)
+    pool.record(servers["AAA"], False, 60)
+    assert pool.choose().code == "CCC"
+
+
+def test_single_server_never_fails_over():
+    pool = ServerPool([A], failover_after=1)
+    pool.record(pool.choose(), False, 60)
+    pool.record(pool.choose(), False, 60)
+    assert pool.choose().code == "AAA"
+
+
+def test_monitor_reconnects_to_a_backup_when_its_server_keeps_failing():
+    import main
+
+    windows, processes = FakeWindowBackend(), FakeProcessBackend()
+    pid = processes.spawn("RobloxPlayerBeta.exe")
+    windows.open_window("Roblox", pid)
+    opened = []
+
+    def on_open(url):
+        opened.append(url)
+        if "BBB" in url:
+            # Only the backup server lets the client back in
+            windows.open_window("Roblox", processes.spawn("RobloxPlayerBeta.exe"))
+            anti_leave.monitoring = False
+
+    def on_sleep(clock):
+        if clock.now > 10 and not opened and processes.processes:
+            processes.kill(pid)
+            windows.windows = []
+        if clock.now > 5000:
+            anti_leave.monitoring = False
+
+    settings = main.SETTINGS.replace(SERVER_POOL=[B], SERVER_FAILOVER_AFTER=2, ENABLE_CLIPBOARD_DETECTION=False)
+    anti_leave = main.RobloxAntiLeave(windows, processes, FakeClipboard(), FakeLauncher(on_open), FakeNotifier(),
+                                      FakeClock(0, on_sleep), settings)
+    anti_leave.start_monitoring(A)
+
+    assert opened == [A, A, B]
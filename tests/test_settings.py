@@ -0,0 +1,134 @@
+import os
+
+import pytest
+
+import settings
+from backends import FakeClock
+from settings import Settings, SettingsError, SettingsWatcher, load_settings
+
+
+def write_config(path, text):
+    path.write_text(text)
+    # Make every write visible to the watcher, even within one mtime tick
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_defaults_are_valid():
+    values = Settings()
+    assert values.CHECK_INTERVAL > 0
+    assert values.process_names == tuple(name.lower() for name in values.ROBLOX_PROCESS_NAMES)
+
+
+def test_every_error_is_reported_with_its_name():
+    with pytest.raises(SettingsError) as error:
+        Settings({'CHECK_INTERVAL': -1, 'ENABLE_NOTIFICATIONS': 'yes', 'WINDOW_BACKEND': 'wayland'})
+    assert len(error.value.errors) == 3
+    message = str(error.value)
+    assert "CHECK_INTERVAL must be greater than 0" in message
+    assert "ENABLE_NOTIFICATIONS must be True or False" in message
+    assert "WINDOW_BACKEND must be one of" in message
+
+
+def test_types_are_checked_strictly():
+    with pytest.raises(SettingsError):
+        Settings({'MAX_RECONNECT_ATTEMPTS': True})
+    with pytest.raises(SettingsError):
+        Settings({'MAX_RECONNECT_ATTEMPTS': 2.5})
+    assert Settings({'CHECK_INTERVAL': 3}).CHECK_INTERVAL == 3.0
+
+
+def test_cross_checks():
+    with pytest.raises(SettingsError, match="DISCONNECT_CONFIRMATIONS must not be greater"):
+        Settings({'DISCONNECT_CONFIRMATIONS': 4, 'CONFIRMATION_WINDOW': 3})
+    with pytest.raises(SettingsError, match="MIN_CHECK_INTERVAL must not be greater"):
+        Settings({'MIN_CHECK_INTERVAL': 10, 'MAX_CHECK_INTERVAL': 5})
+
+
+def test_signal_weights_are_merged_with_the_defaults():
+    weights = Settings({'SIGNAL_WEIGHTS': {'no_window': 0.5}}).SIGNAL_WEIGHTS
+    assert weights['no_window'] == 0.5
+    assert weights['popup'] == 1.0
+    with pytest.raises(SettingsError, match="unknown signal"):
+        Settings({'SIGNAL_WEIGHTS': {'lag': 1}})
+
+
+def test_settings_are_read_only_and_replace_validates():
+    values = Settings()
+    with pytest.raises(AttributeError):
+        values.CHECK_INTERVAL = 1
+    assert values.replace(CHECK_INTERVAL=2).CHECK_INTERVAL == 2.0
+    with pytest.raises(SettingsError):
+        values.replace(CHECK_INTERVAL=0)
+
+
+def test_relative_files_resolve_against_the_app_directory():
+    values = Settings({'JOURNAL_FILE': "sessions.journal", 'DAEMON_SOCKET': "control.sock"})
+    assert values.journal_file == os.path.join(settings.APP_DIR, "sessions.journal")
+    assert values.daemon_socket == os.path.join(settings.APP_DIR, "control.sock")
+
+
+def test_overlong_socket_path_falls_back_to_a_short_stable_name(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    long_path = "/" + "d" * 200 + "/control.sock"
+    resolved = settings.socket_path(long_path)
+    assert os.path.dirname(resolved) == str(tmp_path)
+    assert resolved == settings.socket_path(long_path)
+    assert resolved != settings.socket_path(long_path + "2")
+
+
+def test_load_settings_reports_the_file(tmp_path):
+    config = tmp_path / "config.py"
+    config.write_text("CHECK_INTERVAL = 0\nSOMETHING_ELSE = 1\n")
+    with pytest.raises(SettingsError, match="config.py"):
+        load_settings(str(config))
+    config.write_text("CHECK_INTERVAL = 2\nSOMETHING_ELSE = 1\n")
+    loaded = load_settings(str(config))
+    assert loaded.CHECK_INTERVAL == 2.0
+    assert loaded.unknown == ('SOMETHING_ELSE',)
+
+
+def test_missing_file_gives_the_defaults(tmp_path):
+    assert load_settings(str(tmp_path / "missing.py")).path is None
+
+
+def test_watcher_applies_valid_edits_and_keeps_the_last_good_settings(tmp_path):
+    config = tmp_path / "config.py"
+    write_config(config, "CHECK_INTERVAL = 2\n")
+    clock = FakeClock()
+    watcher = SettingsWatcher(load_settings(str(config)), clock, interval=1)
+
+    write_config(config, "CHECK_INTERVAL = 3\n")
+    assert watcher.poll() is None  # not due yet
+    clock.sleep(1)
+    assert watcher.poll().CHECK_INTERVAL == 3.0
+
+    write_config(config, "CHECK_INTERVAL = -1\n")
+    clock.sleep(1)
+    assert watcher.poll() is None
+    assert watcher.failures == 1
+    assert watcher.settings.CHECK_INTERVAL == 3.0
+
+
+def test_watcher_keeps_settings_that_need_a_restart(tmp_path):
+    config = tmp_path / "config.py"
+    write_config(config, "WINDOW_BACKEND = 'pygetwindow'\nCHECK_INTERVAL = 2\n")
+    clock = FakeClock()
+    watcher = SettingsWatcher(load_settings(str(config)), clock, interval=1)
+
+    write_config(config, "WINDOW_BACKEND = 'x11'\nCHECK_INTERVAL = 4\n")
+    clock.sleep(1)
+    reloaded = watcher.poll()
+    assert reloaded.CHECK_INTERVAL == 4.0
+    assert reloaded.WINDOW_BACKEND == 'pygetwindow'
+
+
+def test_invalid_config_surfaces_when_a_monitor_is_built(monkeypatch):
+    import main
+
+    error = SettingsError(["CHECK_INTERVAL must be greater than 0"])
+    monkeypatch.setattr(main, 'SETTINGS_ERROR', error)
+    with pytest.raises(SettingsError):
+        main.current_settings()
+    with pytest.raises(SettingsError):
+        main.RobloxAntiLeave()
@@ -0,0 +1,91 @@
+import threading
+
+from backends import FakeWindowBackend, FakeProcessBackend, FakeClipboard, FakeLauncher, FakeNotifier, FakeClock
+from connection_state import CONNECTED
+
+A = "https://www.roblox.com/share?code=AAA&type=Server"
+B = "https://www.roblox.com/share?code=BBB&type=Server"
+
+
+def supervise(script, checks=20, processes=None, **overrides):
+    """Run a two-instance supervisor, calling script(check number, windows, processes, handles) before each check"""
+    import main
+    from supervisor import RobloxSupervisor, MonitoredInstance
+
+    windows, processes = FakeWindowBackend(), processes or FakeProcessBackend()
+    pids = [processes.spawn("RobloxPlayerBeta.exe") for _ in range(2)]
+    handles = [windows.open_window("Roblox", pid) for pid in pids]
+    count = []
+
+    def on_sleep(clock):
+        count.append(clock.now)
+        script(len(count), windows, processes, handles)
+        if len(count) >= checks:
+            supervisor.monitoring = False
+
+    settings = main.SETTINGS.replace(DISCONNECT_CONFIRMATIONS=2, CONFIRMATION_WINDOW=3,
+                                     ENABLE_CLIPBOARD_DETECTION=False, **overrides)
+    launcher = FakeLauncher()
+    supervisor = RobloxSupervisor(windows, processes, FakeClipboard(), launcher, FakeNotifier(),
+                                  FakeClock(0, on_sleep), settings)
+    supervisor.start_monitoring([MonitoredInstance("a", A), MonitoredInstance("b", B)])
+    return supervisor, launcher
+
+
+def test_single_popup_probe_is_not_confirmed():
+    def script(check, windows, processes, handles):
+        if check == 2:
+            windows.set_title(handles[0], "Disconnected - Roblox")
+        elif check == 3:
+            windows.set_title(handles[0], "Roblox")
+
+    supervisor, launcher = supervise(script)
+    assert launcher.opened == []
+    assert all(instance.connection.state == CONNECTED for instance in supervisor.instances)
+
+
+def test_confirmed_popup_relaunches_only_its_instance():
+    def script(check, windows, processes, handles):
+        if check == 2:
+            windows.set_title(handles[0], "Disconnected - Roblox")
+
+    supervisor, launcher = supervise(script, checks=4)
+    assert launcher.opened == [A]
+    assert supervisor.instances[1].connection.state == CONNECTED
+
+
+class HangingProcessBackend(FakeProcessBackend):
+    """Process backend that blocks every call while unresponsive is set"""
+
+    def __init__(self):
+        super().__init__()
+        self.unresponsive = threading.Event()
+        self.released = threading.Event()
+
+    def list_processes(self):
+        if self.unresponsive.is_set():
+            self.released.wait()
+        return super().list_processes()
+
+    def create_time(self, pid):
+        if self.unresponsive.is_set():
+            self.released.wait()
+        return super().create_time(pid)
+
+
+def test_hung_process_scan_is_skipped_with_concurrent_probes():
+    processes = HangingProcessBackend()
+
+    def script(check, windows, processes, handles):
+        if check == 2:
+            processes.unresponsive.set()
+
+    try:
+        supervisor, launcher = supervise(script, checks=6, processes=processes,
+                                         CONCURRENT_PROBES=True, PROBE_TIMEOUT=0.05)
+    finally:
+        processes.released.set()
+    assert supervisor.probe_runner.timeouts == 1  # the stuck scan was not queued again every check
+    assert launcher.opened == []
+    assert all(instance.pids for instance in supervisor.instances)
+    assert all(instance.connection.state == CONNECTED for instance in supervisor.instances)
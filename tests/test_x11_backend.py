@@ -0,0 +1,121 @@
+import os
+import shutil
+import importlib.util
+import select
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(importlib.util.find_spec('Xlib') is None or shutil.which('Xvfb') is None,
+                                reason="needs python-xlib and Xvfb")
+
+from backends import X11WindowBackend, SelectionOwnerCounter  # noqa: E402
+from window_tracker import WindowTracker  # noqa: E402
+from classifier import TitleClassifier  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def xvfb():
+    from bench_windows import start_xvfb
+    server, name = start_xvfb()
+    try:
+        yield name
+    finally:
+        server.terminate()
+        server.wait()
+
+
+@pytest.fixture
+def client(xvfb):
+    from bench_windows import TestClient
+    client = TestClient(xvfb)
+    yield client
+    client.display.close()
+
+
+@pytest.fixture
+def backend(xvfb):
+    backend = X11WindowBackend(xvfb)
+    yield backend
+    backend.close()
+
+
+def wait_for(backend, predicate, timeout=5.0):
+    """Poll the backend's events, woken by its X connection, until predicate(windows) holds"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        backend.pending_changes()
+        windows = backend.list_windows()
+        if predicate(windows):
+            return windows
+        select.select([backend.fileno()], [], [], 0.05)
+    raise AssertionError(f"timed out; index is {backend.list_windows()}")
+
+
+def titles(windows):
+    return sorted(window.title for window in windows)
+
+
+def test_initial_index_has_titles_and_pids(client, backend):
+    client.open("Notepad")
+    client.open("Roblox", pid=os.getpid())
+    windows = wait_for(backend, lambda ws: len(ws) == 2)
+    assert titles(windows) == ["Notepad", "Roblox"]
+    assert next(w for w in windows if w.title == "Roblox").pid == os.getpid()
+    assert not backend.ewmh  # a bare Xvfb has no window manager keeping _NET_CLIENT_LIST
+
+
+def test_property_notify_updates_the_title(client, backend):
+    window = client.open("Roblox")
+    wait_for(backend, lambda ws: titles(ws) == ["Roblox"])
+    version = backend.version
+    unchanged = backend.list_windows()
+    assert backend.list_windows() is unchanged  # nothing new: the same listing, no rebuild
+
+    client.set_title(window, "Disconnected - Roblox")
+    windows = wait_for(backend, lambda ws: titles(ws) == ["Disconnected - Roblox"])
+    assert backend.version > version
+    assert windows is not unchanged
+    assert backend.events > 0
+
+
+def test_closed_and_new_windows_follow_substructure_events(client, backend):
+    first = client.open("Roblox")
+    wait_for(backend, lambda ws: titles(ws) == ["Roblox"])
+    second = client.open("Notepad")
+    wait_for(backend, lambda ws: titles(ws) == ["Notepad", "Roblox"])
+    client.close(first)
+    windows = wait_for(backend, lambda ws: titles(ws) == ["Notepad"])
+    assert windows[0].handle == second.id
+
+
+def test_tracker_refresh_wakes_only_on_classification_changes(client, backend):
+    window = client.open("Roblox")
+    tracker = WindowTracker(backend, TitleClassifier(["roblox"], ["disconnected"]).classify)
+    wait_for(backend, lambda ws: titles(ws) == ["Roblox"])
+    tracker.snapshot()
+
+    client.set_title(window, "Roblox - Jailbreak")
+    wait_for(backend, lambda ws: titles(ws) == ["Roblox - Jailbreak"])
+    assert not tracker.refresh()
+
+    client.set_title(window, "Roblox - Disconnected")
+    wait_for(backend, lambda ws: titles(ws) == ["Roblox - Disconnected"])
+    assert tracker.refresh()
+    assert [w.title for w in tracker.snapshot().disconnect_windows] == ["Roblox - Disconnected"]
+
+
+def test_selection_owner_changes_are_counted(xvfb, client):
+    from Xlib import X
+
+    counter = SelectionOwnerCounter(xvfb)
+    clipboard = client.display.intern_atom('CLIPBOARD')
+    assert counter() == 0
+    for expected, title in enumerate(["first copy", "second copy"], start=1):
+        owner = client.open(title)
+        owner.set_selection_owner(clipboard, X.CurrentTime)
+        client.display.sync()
+        deadline = time.monotonic() + 5
+        while counter() < expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert counter() == expected
@@ -0,0 +1,106 @@
+"""
+Incremental window tracking for Roblox Anti-Leave
+Takes one window snapshot per tick and only re-classifies windows whose
+handle/title pair changed since the previous snapshot.
+"""
+
+import threading
+from collections import namedtuple
+
+from classifier import NON_ROBLOX, DISCONNECT
+
+WindowSnapshot = namedtuple('WindowSnapshot', ['roblox_windows', 'disconnect_windows', 'changed', 'roblox_changed'],
+                            defaults=(0,))
+
+
+class WindowTracker:
+    """Keeps classified windows keyed by handle between ticks"""
+
+    def __init__(self, backend, classify):
+        self.backend = backend
+        self.classify = classify  # title -> classifier label
+
+        self._titles = {}      # handle -> title
+        self._roblox = {}      # handle -> WindowInfo
+        self._flagged = {}     # handle -> WindowInfo
+        self._changes = 0  # running count of windows opened, closed or retitled
+        self._roblox_changes = 0  # running count of Roblox windows opened, closed or retitled
+        self._label_changes = 0  # running count of windows becoming or ceasing to be Roblox or a disconnect popup
+        self._reported = (0, 0)  # (_changes, _roblox_changes) at the last snapshot
+        self._windows = None   # last listing, for backends that return the same list while nothing changed
+        # snapshot() runs on a probe worker while refresh() runs on the event wait's thread
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget everything seen so far"""
+        with self._lock:
+            self._titles.clear()
+            self._roblox.clear()
+            self._flagged.clear()
+            self._windows = None
+
+    def snapshot(self) -> WindowSnapshot:
+        """Enumerate windows once and fold the changes into the index"""
+        with self._lock:
+            self._fold(self.backend.list_windows())
+            changes, roblox_changes = self._reported
+            self._reported = (self._changes, self._roblox_changes)
+            return WindowSnapshot(list(self._roblox.values()), list(self._flagged.values()), self._changes - changes,
+                                  self._roblox_changes - roblox_changes)
+
+    def refresh(self) -> bool:
+        """Fold the latest listing in between snapshots; True if the Roblox or disconnect windows changed
+
+        Retitles that keep a window's classification (e.g. a game updating its
+        title) don't count. The changes are still reported by the next snapshot().
+        """
+        with self._lock:
+            before = self._label_changes
+            self._fold(self.backend.list_windows())
+            return self._label_changes != before
+
+    def _fold(self, windows):
+        if windows is self._windows:
+            # Event-driven backend (X11WindowBackend) reporting nothing new: skip the diff
+            return
+        self._windows = windows
+
+        for window in windows:
+            if self._titles.get(window.handle) == window.title:
+                continue
+            self._update(window)
+            self._changes += 1
+
+        # Every current handle is indexed now, so extra entries are closed windows
+        if len(self._titles) != len(windows):
+            seen = {window.handle for window in windows}
+            for handle in [h for h in self._titles if h not in seen]:
+                self._forget(handle)
+                self._changes += 1
+
+    def _update(self, window):
+        self._titles[window.handle] = window.title
+        label = self.classify(window.title)
+        was_roblox = window.handle in self._roblox
+        was_flagged = window.handle in self._flagged
+
+        if label != NON_ROBLOX:
+            self._roblox[window.handle] = window
+            self._roblox_changes += 1
+        elif self._roblox.pop(window.handle, None) is not None:
+            self._roblox_changes += 1
+
+        if label == DISCONNECT:
+            self._flagged[window.handle] = window
+        else:
+            self._flagged.pop(window.handle, None)
+
+        if (label != NON_ROBLOX, label == DISCONNECT) != (was_roblox, was_flagged):
+            self._label_changes += 1
+
+    def _forget(self, handle):
+        self._titles.pop(handle, None)
+        if self._roblox.pop(handle, None) is not None:
+            self._roblox_changes += 1
+            self._label_changes += 1
+        self._flagged.pop(handle, None)